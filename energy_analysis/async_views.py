@@ -0,0 +1,153 @@
+# async_views.py
+"""
+Async versions of the per-day energy endpoints, for ASGI deployments.
+
+Same query params and payloads as the EnergyDataViewSet actions, served under
+api/async/energy/. Stored days are read with the async ORM on the event loop.
+Anything that may go upstream (ESIOS, gridstatus, the BESS analysis) runs in
+a worker thread, with at most ASYNC_UPSTREAM_CONCURRENCY such calls in
+flight per process; slow upstreams then park coroutines, not server workers.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework.utils.encoders import JSONEncoder
+import asyncio
+import functools
+import logging
+import weakref
+from .models import BESSConfig
+from .services.bess_decision_service import BESSDecisionService
+from .services.cache_warming_service import CacheWarmingService
+from .services.region_service import RegionService
+from .services.response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# One semaphore per event loop (asyncio primitives are loop-bound)
+_upstream_slots = weakref.WeakKeyDictionary()
+
+
+def _slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _upstream_slots:
+        _upstream_slots[loop] = asyncio.Semaphore(getattr(settings, 'ASYNC_UPSTREAM_CONCURRENCY', 8))
+    return _upstream_slots[loop]
+
+
+def _closing_connections(func):
+    """Worker threads outside the request cycle must close their own DB connections"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+    return wrapper
+
+
+async def offload(func, *args, **kwargs):
+    """Run a blocking (upstream-bound) call in a bounded pool of worker threads"""
+    async with _slots():
+        return await sync_to_async(_closing_connections(func), thread_sensitive=False)(*args, **kwargs)
+
+
+# Fire-and-forget tasks; referenced here so they aren't garbage collected mid-run
+_background_tasks = set()
+
+
+def _schedule_adjacent(kind: str, region: str, date: str):
+    """Queue neighbouring-day prefetches without delaying the response"""
+    task = asyncio.create_task(
+        sync_to_async(CacheWarmingService.schedule_adjacent)(kind, region, date)
+    )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _error(message: str, status: int) -> JsonResponse:
+    return JsonResponse({'error': message}, status=status)
+
+
+# =============================================================================
+# Views
+# =============================================================================
+
+async def chart_data(request):
+    """Async chart_data: ?date=YYYY-MM-DD&region=california|spain"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    date = request.GET.get('date', '2024-06-20')
+    region = request.GET.get('region', 'california')
+
+    async def produce():
+        payload = await RegionService.aget_stored_chart_data(region, date)
+        if payload is None:
+            payload = await offload(RegionService.get_chart_data, region, date)
+        return {'region': region, **payload}
+
+    try:
+        response = await ResponseCache.arespond(request, 'chart_data', region, date, produce)
+        _schedule_adjacent('chart_data', region, date)
+        return response
+    except ValueError as e:
+        logger.error(f"Chart data validation error for {date}: {e}")
+        return _error(str(e), 400)
+    except Exception as e:
+        logger.error(f"Chart data error for {date} ({region}): {e}")
+        return _error('Failed to fetch energy data', 500)
+
+
+async def curtailment_data(request):
+    """Async curtailment_data: ?date=YYYY-MM-DD&region=california|spain"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    date = request.GET.get('date', '2024-06-20')
+    region = request.GET.get('region', 'california')
+
+    async def produce():
+        payload = await RegionService.aget_stored_curtailment_data(region, date)
+        if payload is None:
+            payload = await offload(RegionService.get_curtailment_data, region, date)
+        return {'region': region, **payload}
+
+    try:
+        response = await ResponseCache.arespond(request, 'curtailment_data', region, date, produce)
+        _schedule_adjacent('curtailment_data', region, date)
+        return response
+    except ValueError as e:
+        return _error(str(e), 400)
+    except Exception as e:
+        logger.error(f"Curtailment error for {date} ({region}): {e}")
+        return _error('Failed to fetch curtailment data', 500)
+
+
+async def bess_analysis(request):
+    """Async bess_analysis: ?date, power_mw, duration_hours, efficiency, optimizer"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    date = request.GET.get('date', '2024-05-11')
+    optimizer = request.GET.get('optimizer', 'greedy')
+
+    if optimizer not in BESSDecisionService.OPTIMIZERS:
+        return _error(f"optimizer must be one of {', '.join(BESSDecisionService.OPTIMIZERS)}", 400)
+
+    try:
+        config = BESSConfig(
+            power_mw=int(request.GET.get('power_mw', 100)),
+            duration_hours=int(request.GET.get('duration_hours', 4)),
+            efficiency=float(request.GET.get('efficiency', 0.87)),
+        )
+        # The analysis itself is CPU-bound numpy work, and a cold date fetches
+        # from ESIOS: either way it leaves the event loop
+        analysis = await offload(BESSDecisionService.analyze_day, date, config, optimizer=optimizer)
+        return JsonResponse(analysis, encoder=JSONEncoder)
+    except ValueError as e:
+        return _error(str(e), 400)
+    except Exception as e:
+        logger.error(f"BESS analysis error for {date}: {e}")
+        return _error('Failed to run BESS analysis', 500)
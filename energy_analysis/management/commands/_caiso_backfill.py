@@ -0,0 +1,101 @@
+# management/commands/_caiso_backfill.py
+"""Shared CLI for the CAISO backfill commands (underscore: not a command itself)."""
+from django.core.management.base import BaseCommand
+from energy_analysis.services.backfill_engine import BackfillEngine
+from energy_analysis.services.gridstatus_service import GridStatusService
+from datetime import datetime
+import signal
+import threading
+
+
+class CaisoBackfillCommand(BaseCommand):
+    """
+    Subclasses set job/model/label and implement fetch() and build().
+    Missing dates are computed up front, fetched on a worker pool and
+    checkpointed, so re-running the same command resumes automatically.
+    """
+    job = None
+    model = None
+    label = 'CAISO'
+    default_workers = 4
+
+    def add_arguments(self, parser):
+        parser.add_argument('start_date', type=str, help='YYYY-MM-DD')
+        parser.add_argument('end_date', type=str, help='YYYY-MM-DD')
+        parser.add_argument('--workers', type=int, default=self.default_workers,
+                            help='Concurrent gridstatus fetches')
+        parser.add_argument('--batch-size', type=int, default=20, help='Days per bulk write')
+        parser.add_argument('--retry-empty', action='store_true',
+                            help='Refetch dates previously recorded as having no upstream data')
+
+    def handle(self, *args, **options):
+        # SIGTERM behaves like Ctrl+C so the current batch gets flushed
+        signal.signal(signal.SIGTERM, self.handle_interrupt)
+
+        self._local = threading.local()
+        start = datetime.fromisoformat(options['start_date']).date()
+        end = datetime.fromisoformat(options['end_date']).date()
+
+        engine = BackfillEngine(
+            job=self.job,
+            model=self.model,
+            data_source='caiso',
+            fetch=self.fetch,
+            build=self.build,
+            max_workers=options['workers'],
+            batch_size=options['batch_size'],
+            retry_empty=options['retry_empty'],
+            report=self.report,
+        )
+
+        self.stdout.write(f"Starting {self.label} load: {start} to {end} ({options['workers']} workers)")
+        self.stdout.write(f"Start time: {datetime.now()}")
+        self.stdout.write("-" * 50)
+
+        try:
+            engine.run(start, end)
+        except KeyboardInterrupt:
+            self.stdout.write("\n" + "=" * 50)
+            self.stdout.write(self.style.WARNING("INTERRUPTED!"))
+            self.print_summary("INTERRUPTED", engine.stats)
+            self.stdout.write("Progress is checkpointed - re-run the same command to resume.")
+            return
+
+        self.print_summary("COMPLETED", engine.stats)
+        self.after_run(start, end)
+
+    def service(self) -> GridStatusService:
+        """One client per worker thread"""
+        if not hasattr(self._local, 'svc'):
+            self._local.svc = GridStatusService('caiso')
+        return self._local.svc
+
+    def fetch(self, date_str):
+        raise NotImplementedError
+
+    def build(self, day, data):
+        raise NotImplementedError
+
+    def after_run(self, start, end):
+        """Hook for post-backfill work"""
+
+    def report(self, day, status, detail):
+        if status == 'done':
+            self.stdout.write(self.style.SUCCESS(f"  Saved {day}"))
+        elif status == 'no_data':
+            self.stdout.write(self.style.WARNING(f"  No data for {day}"))
+        else:
+            self.stdout.write(self.style.ERROR(f"  Failed {day}: {detail}"))
+
+    def handle_interrupt(self, signum, frame):
+        raise KeyboardInterrupt
+
+    def print_summary(self, status, stats):
+        self.stdout.write("=" * 50)
+        self.stdout.write(f"Status: {status}")
+        self.stdout.write(f"End time: {datetime.now()}")
+        self.stdout.write(f"Created: {stats['created']}")
+        self.stdout.write(f"Skipped: {stats['skipped']}")
+        self.stdout.write(f"No data: {stats['no_data']}")
+        self.stdout.write(f"Errors: {stats['errors']}")
+        self.stdout.write("=" * 50)
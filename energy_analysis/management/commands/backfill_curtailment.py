@@ -40,7 +40,9 @@ class Command(BaseCommand):
             f'Daily backfill complete: {created} created, {skipped} skipped, {errors} errors'
         ))
 
+        # New days were added to their months as they were created; this only
+        # catches months left stale by rewrites or earlier runs
         if not options['skip_monthly']:
-            self.stdout.write('Building monthly summaries...')
-            MonthlyCurtailmentService.build_all(years=(2024, 2025))
-            self.stdout.write(self.style.SUCCESS('Monthly summaries complete'))
\ No newline at end of file
+            self.stdout.write('Rebuilding dirty monthly summaries...')
+            rebuilt = MonthlyCurtailmentService.build_all(years=range(start.year, end.year + 1), region='spain')
+            self.stdout.write(self.style.SUCCESS(f'Monthly summaries complete ({len(rebuilt)} rebuilt)'))
\ No newline at end of file
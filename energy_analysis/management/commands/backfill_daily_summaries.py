@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import date
+import time
+from energy_analysis.services.daily_summary_service import DailySummaryService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailyEnergySummary rows from stored EnergyData in one set-based pass'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=str, default='2024-01-01')
+        parser.add_argument('--end',   type=str, default='2024-12-31')
+        parser.add_argument('--overwrite', action='store_true',
+                            help='Recompute days that already have a database summary')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start'])
+            end   = date.fromisoformat(options['end'])
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        if end < start:
+            raise CommandError('--end must not be before --start')
+
+        started = time.monotonic()
+        stats = DailySummaryService.rebuild_database_summaries(
+            start, end, overwrite=options['overwrite'], batch_size=options['batch_size']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {time.monotonic() - started:.1f}s: {stats['created']} created, {stats['updated']} updated, "
+            f"{stats['skipped']} skipped, {stats['no_data']} without data"
+        ))
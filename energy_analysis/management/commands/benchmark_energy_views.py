@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from unittest import mock
+import asyncio
+import statistics
+import threading
+import time
+from energy_analysis.services.cache_warming_service import CacheWarmingService
+from energy_analysis.services.region_service import RegionService
+from energy_analysis.services.response_cache import ResponseCache
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare sync (gunicorn-style worker pool) vs async (single event loop) chart_data '
+        'throughput with the upstream fetch replaced by a fixed-latency stub. Writes nothing to the DB.'
+    )
+
+    SYNC_PATH = '/api/energy/chart_data/'
+    ASYNC_PATH = '/api/async/energy/chart_data/'
+
+    # Far from any real data, so every request is a cold miss that hits the stub
+    FIRST_DATE = date(1900, 1, 1)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per run')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent clients')
+        parser.add_argument('--sync-workers', type=int, default=2,
+                            help='Sync worker count to emulate (the Dockerfile runs 2)')
+        parser.add_argument('--latency', type=float, default=0.5, help='Stubbed upstream latency (seconds)')
+        parser.add_argument('--region', choices=RegionService.SUPPORTED_REGIONS, default='california')
+        parser.add_argument('--host', default='localhost', help='Host header (must be in ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        region = options['region']
+        sync_dates = [self.FIRST_DATE + timedelta(days=i) for i in range(count)]
+        async_dates = [self.FIRST_DATE + timedelta(days=count + i) for i in range(count)]
+
+        stub = classmethod(self._stub(options['latency']))
+        try:
+            with mock.patch.object(RegionService, '_get_california_data', stub), \
+                 mock.patch.object(RegionService, '_get_spain_data', stub), \
+                 mock.patch.object(CacheWarmingService, 'schedule_adjacent', return_value=[]):
+                sync_result = self._run_sync(sync_dates, region, options)
+                async_result = asyncio.run(self._run_async(async_dates, region, options))
+        finally:
+            cache.delete_many([
+                ResponseCache.key('chart_data', region, day.isoformat()) for day in sync_dates + async_dates
+            ])
+
+        self.stdout.write(
+            f"{count} cold chart_data requests, {options['concurrency']} concurrent clients, "
+            f"{options['latency']:.2f}s upstream"
+        )
+        self._report(f"sync  ({options['sync_workers']} workers)", sync_result)
+        self._report('async (1 event loop)', async_result)
+
+        speedup = sync_result['elapsed'] / async_result['elapsed'] if async_result['elapsed'] else 0
+        self.stdout.write(self.style.SUCCESS(f'Async throughput: {speedup:.1f}x sync'))
+
+    @staticmethod
+    def _stub(latency: float):
+        def fetch(cls, date_str):
+            time.sleep(latency)
+            return {
+                'date': date_str,
+                'hourly_data': [
+                    {'hour': f'{h:02d}:00', 'demand': 25000.0, 'solar': 5000.0, 'wind': 4000.0,
+                     'vre_total': 9000.0, 'vre_pct': 36.0, 'net_load': 16000.0}
+                    for h in range(24)
+                ],
+                'daily_insights': {},
+                'data_source': 'stub',
+                'was_cached': False,
+            }
+        return fetch
+
+    def _run_sync(self, dates, region, options):
+        # Clients queue for one of the sync workers, so latency includes that wait
+        workers = threading.Semaphore(options['sync_workers'])
+
+        def request(day):
+            started = time.monotonic()
+            with workers:
+                # async=false: measure the inline path even if ENERGY_BACKGROUND_FETCH is on
+                response = Client().get(self.SYNC_PATH, {'date': day.isoformat(), 'region': region, 'async': 'false'},
+                                        HTTP_HOST=options['host'])
+            return response.status_code, time.monotonic() - started
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(request, dates))
+        return self._summarize(results, time.monotonic() - started)
+
+    async def _run_async(self, dates, region, options):
+        client = AsyncClient()
+        gate = asyncio.Semaphore(options['concurrency'])
+
+        async def request(day):
+            async with gate:
+                started = time.monotonic()
+                response = await client.get(self.ASYNC_PATH, {'date': day.isoformat(), 'region': region},
+                                            HTTP_HOST=options['host'])
+                return response.status_code, time.monotonic() - started
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(request(day) for day in dates))
+        return self._summarize(results, time.monotonic() - started)
+
+    @staticmethod
+    def _summarize(results, elapsed: float):
+        latencies = sorted(latency for _, latency in results)
+        return {
+            'elapsed': elapsed,
+            'ok': sum(1 for status, _ in results if status == 200),
+            'total': len(results),
+            'p50': statistics.median(latencies) if latencies else 0,
+            'p95': latencies[int(len(latencies) * 0.95) - 1] if latencies else 0,
+        }
+
+    def _report(self, label: str, result):
+        throughput = result['total'] / result['elapsed'] if result['elapsed'] else 0
+        self.stdout.write(
+            f"{label:<22} {throughput:7.1f} req/s   p50 {result['p50']:.2f}s   p95 {result['p95']:.2f}s   "
+            f"{result['ok']}/{result['total']} OK   {result['elapsed']:.1f}s total"
+        )
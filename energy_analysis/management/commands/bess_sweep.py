@@ -0,0 +1,48 @@
+# management/commands/bess_sweep.py
+from django.core.management.base import BaseCommand, CommandError
+from energy_analysis.services.bess_sweep_service import BESSSweepService
+import json
+import os
+
+
+class Command(BaseCommand):
+    help = 'Evaluate a grid of BESS configurations over a date range and print the profit surface'
+
+    def add_arguments(self, parser):
+        parser.add_argument('start_date', type=str, help='YYYY-MM-DD')
+        parser.add_argument('end_date', type=str, help='YYYY-MM-DD')
+        parser.add_argument('--region', default='spain', choices=['spain', 'california'])
+        parser.add_argument('--power', type=int, nargs='+', default=[50, 100, 150, 200])
+        parser.add_argument('--duration', type=int, nargs='+', default=[2, 4, 6])
+        parser.add_argument('--efficiency', type=float, nargs='+', default=[0.85, 0.87, 0.9, 0.92])
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--output', type=str, help='Write the full result as JSON to this file')
+
+    def handle(self, *args, **options):
+        try:
+            result = BESSSweepService.sweep(
+                options['region'], options['start_date'], options['end_date'],
+                options['power'], options['duration'], options['efficiency'],
+                workers=options['workers'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{result['days_analyzed']} days analyzed, {len(result['missing_dates'])} missing")
+        self.stdout.write(f"{'MW':>5} {'h':>3} {'eff':>5} {'profit EUR':>14} {'cycles':>8} {'util %':>7}")
+        for r in sorted(result['results'], key=lambda r: -r['gross_profit_eur']):
+            self.stdout.write(
+                f"{r['power_mw']:>5} {r['duration_hours']:>3} {r['efficiency']:>5.2f} "
+                f"{r['gross_profit_eur']:>14,.0f} {r['cycles_completed']:>8.1f} {r['avg_utilization_pct']:>7.1f}"
+            )
+
+        best = result['best']
+        self.stdout.write(self.style.SUCCESS(
+            f"Best: {best['power_mw']} MW / {best['duration_hours']} h @ {best['efficiency']} "
+            f"-> €{best['gross_profit_eur']:,.0f}"
+        ))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(result, f, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from datetime import date
+from energy_analysis.utils.partitioning import EnergyDataPartitioner
+
+
+class Command(BaseCommand):
+    help = 'Manage monthly EnergyData partitions on PostgreSQL (convert | create | detach | status)'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+
+        subparsers.add_parser('convert', help='Convert the table to monthly partitions (copies every row)')
+
+        create = subparsers.add_parser('create', help='Create partitions up to N months ahead')
+        create.add_argument('--from', dest='first', type=str, help='First month (YYYY-MM-DD), default today')
+        create.add_argument('--months-ahead', type=int,
+                            default=getattr(settings, 'ENERGYDATA_PARTITION_MONTHS_AHEAD', 3))
+
+        detach = subparsers.add_parser('detach', help='Detach partitions that end on or before a date')
+        detach.add_argument('--before', type=str, required=True, help='Cutoff date (YYYY-MM-DD)')
+        detach.add_argument('--drop', action='store_true', help='Drop detached partitions instead of keeping them')
+
+        subparsers.add_parser('status', help='List partitions with estimated row counts')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('EnergyData partitioning requires PostgreSQL')
+
+        action = options['action']
+        if action != 'convert' and not EnergyDataPartitioner.is_partitioned(connection):
+            raise CommandError('EnergyData is not partitioned yet - run `energydata_partitions convert` first')
+
+        with transaction.atomic():
+            if action == 'convert':
+                months_ahead = getattr(settings, 'ENERGYDATA_PARTITION_MONTHS_AHEAD', 3)
+                if EnergyDataPartitioner.convert(connection, months_ahead=months_ahead):
+                    self.stdout.write(self.style.SUCCESS('EnergyData converted to monthly partitions'))
+                else:
+                    self.stdout.write('EnergyData is already partitioned')
+
+            elif action == 'create':
+                first = date.fromisoformat(options['first']) if options['first'] else date.today()
+                created = EnergyDataPartitioner.create_partitions(
+                    connection, first, months_ahead=options['months_ahead']
+                )
+                self.stdout.write(self.style.SUCCESS(f'Created {len(created)} partitions'))
+                for name in created:
+                    self.stdout.write(f'  {name}')
+
+            elif action == 'detach':
+                detached = EnergyDataPartitioner.detach_before(
+                    connection, date.fromisoformat(options['before']), drop=options['drop']
+                )
+                verb = 'Dropped' if options['drop'] else 'Detached'
+                self.stdout.write(self.style.SUCCESS(f'{verb} {len(detached)} partitions'))
+                for name in detached:
+                    self.stdout.write(f'  {name}')
+
+            else:
+                for name, bound, rows in EnergyDataPartitioner.partitions(connection):
+                    self.stdout.write(f'{name:<45} {rows:>12,}  {bound}')
@@ -1,10 +1,12 @@
 # management/commands/load_esios_data.py
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from energy_analysis.models import EnergyIndicator, EnergyData
+from energy_analysis.services.esios_scheduler import EsiosFetchScheduler
 import esios
 from datetime import datetime, timedelta
+from functools import partial
 import pandas as pd
-import time
 
 
 class Command(BaseCommand):
@@ -13,34 +15,62 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('start_date', type=str, help='Start date (YYYY-MM-DD)')
         parser.add_argument('end_date', type=str, help='End date (YYYY-MM-DD)')
-        parser.add_argument('--indicator', type=int)
+        parser.add_argument('--indicator', type=int, nargs='+', required=True,
+                            help='One or more indicator ids, e.g. --indicator 600 720 721 1293')
         parser.add_argument('--resolution', choices=['fifteen_minutes', 'hour', 'day', 'month', 'year'])
         parser.add_argument('--chunk-days', type=int, default=7)
+        parser.add_argument('--bulk', action='store_true',
+                            help='Upsert each chunk with batched INSERT ... ON CONFLICT instead of per-row get_or_create')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent ESIOS requests')
+        parser.add_argument('--rate', type=float, default=settings.ESIOS_RATE_LIMIT_PER_SECOND,
+                            help='Max ESIOS requests per second (default: ESIOS_RATE_LIMIT_PER_SECOND)')
+        parser.add_argument('--burst', type=int, default=settings.ESIOS_RATE_LIMIT_BURST,
+                            help='Requests allowed back to back before --rate applies (default: ESIOS_RATE_LIMIT_BURST)')
+        parser.add_argument('--retries', type=int, default=3)
 
     def handle(self, *args, **options):
         # Parse arguments
         start_date = datetime.fromisoformat(options['start_date'])
         end_date = datetime.fromisoformat(options['end_date'])
-        indicator_id = options['indicator']
+        indicator_ids = options['indicator']
         resolution = options['resolution']
         chunk_days = options['chunk_days']
+        self.bulk = options['bulk']
+        self.batch_size = options['batch_size']
+
+        self.stdout.write(f"Loading ESIOS indicators {', '.join(map(str, indicator_ids))} ({resolution}) "
+                          f"from {start_date.date()} to {end_date.date()}")
+
+        indicator_objs = {}
+        for indicator_id in indicator_ids:
+            indicator_obj = self._get_or_create_indicator(indicator_id)
+            if indicator_obj is None:
+                return
+            indicator_objs[indicator_id] = indicator_obj
 
-        self.stdout.write(f"Loading ESIOS indicator {indicator_id} ({resolution}) from {start_date.date()} to {end_date.date()}")
-        
-        indicator_obj = self._get_or_create_indicator(indicator_id)
-            
         # Initialize ESIOS client
         try:
             client = esios.ESIOSClient()
-            esios_indicator = client.endpoint('indicators').select(indicator_id)
+            esios_indicators = {
+                indicator_id: client.endpoint('indicators').select(indicator_id)
+                for indicator_id in indicator_ids
+            }
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Failed to connect to ESIOS: {e}'))
             return
 
+        scheduler = EsiosFetchScheduler(
+            rate_per_second=options['rate'],
+            burst=options['burst'],
+            max_workers=options['workers'],
+            max_retries=options['retries'],
+        )
+
         # Process data in chunks
         total_created, total_updated = self._process_date_range(
-            esios_indicator, indicator_obj, indicator_id, 
-            start_date, end_date, chunk_days, options['resolution']
+            scheduler, esios_indicators, indicator_objs,
+            start_date, end_date, chunk_days, resolution
         )
 
         # Summary
@@ -74,46 +104,69 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'Database error: {e}'))
             return None
 
-    def _process_date_range(self, esios_indicator, indicator_obj, indicator_id, 
+    def _process_date_range(self, scheduler, esios_indicators, indicator_objs,
                            start_date, end_date, chunk_days, resolution):
-        """Process the full date range in chunks"""
-        current_start = start_date
+        """
+        Fetch every (indicator, chunk) pair concurrently through the scheduler.
+        Rows are saved on this thread as each chunk arrives.
+        """
+        jobs = {}
+        for start, end in self._chunk_ranges(start_date, end_date, chunk_days):
+            for indicator_id, esios_indicator in esios_indicators.items():
+                jobs[(indicator_id, start, end)] = partial(
+                    self._fetch_chunk, esios_indicator, indicator_id, start, end, resolution
+                )
+
+        resolution_display = resolution or "native"
+        self.stdout.write(f"Fetching {len(jobs)} {resolution_display} chunks")
+
         total_created = total_updated = 0
 
-        while current_start <= end_date:
-            chunk_end = min(current_start + timedelta(days=chunk_days - 1, hours=23, minutes=59, seconds=59),
-            end_date
-        )
-            
-            resolution_display = resolution or "native"
-            self.stdout.write(f"Fetching {resolution_display} chunk: {current_start.date()} to {chunk_end.date()}")
+        for (indicator_id, start, end), data, error in scheduler.run(jobs):
+            label = f"{indicator_id} {start.date()} to {end.date()}"
+
+            if error is not None:
+                self.stdout.write(self.style.WARNING(f"  {label}: chunk failed: {error}"))
+                continue
 
             try:
-                chunk_created, chunk_updated = self._process_chunk(
-                    esios_indicator, indicator_obj, indicator_id,
-                    current_start, chunk_end, resolution
-                )
-                
-                total_created += chunk_created
-                total_updated += chunk_updated
-                
-                if chunk_created > 0 or chunk_updated > 0:
-                    self.stdout.write(f"  {chunk_created} created, {chunk_updated} updated")
+                if self.bulk:
+                    chunk_created, chunk_updated = self._bulk_save_data_points(
+                        data, indicator_objs[indicator_id], indicator_id, resolution or 'hour'
+                    )
                 else:
-                    self.stdout.write(f"  No new data")
-
-                time.sleep(0.5)
-                
+                    chunk_created, chunk_updated = self._save_data_points(
+                        data, indicator_objs[indicator_id], indicator_id, resolution or 'hour'
+                    )
             except Exception as e:
-                self.stdout.write(self.style.WARNING(f"  Chunk failed: {e}"))
-                
-            current_start = chunk_end + timedelta(seconds=1)
+                self.stdout.write(self.style.WARNING(f"  {label}: save failed: {e}"))
+                continue
+
+            total_created += chunk_created
+            total_updated += chunk_updated
+
+            if chunk_created > 0 or chunk_updated > 0:
+                self.stdout.write(f"  {label}: {chunk_created} created, {chunk_updated} updated")
+            else:
+                self.stdout.write(f"  {label}: no new data")
 
         return total_created, total_updated
 
-    def _process_chunk(self, esios_indicator, indicator_obj, indicator_id, 
-                      start, end, resolution):
-        """Process a single date chunk"""
+    def _chunk_ranges(self, start_date, end_date, chunk_days):
+        """Split the date range into [start, end] chunks of chunk_days"""
+        ranges = []
+        current_start = start_date
+
+        while current_start <= end_date:
+            chunk_end = min(current_start + timedelta(days=chunk_days - 1, hours=23, minutes=59, seconds=59),
+                            end_date)
+            ranges.append((current_start, chunk_end))
+            current_start = chunk_end + timedelta(seconds=1)
+
+        return ranges
+
+    def _fetch_chunk(self, esios_indicator, indicator_id, start, end, resolution):
+        """Fetch a single date chunk from ESIOS (runs on a scheduler thread)"""
         
         api_params = {
             'start': start.isoformat(),
@@ -141,8 +194,7 @@ class Command(BaseCommand):
                 'time_agg': 'average'
             })
         
-        data = esios_indicator.historical(**api_params)
-        return self._save_data_points(data, indicator_obj, indicator_id, resolution or 'hour')
+        return esios_indicator.historical(**api_params)
 
     def _save_data_points(self, data, indicator_obj, indicator_id, resolution):
         """Save data points to database"""
@@ -165,4 +217,60 @@ class Command(BaseCommand):
                 obj.save(update_fields=['value'])
                 updated_count += 1
                 
-        return created_count, updated_count
\ No newline at end of file
+        return created_count, updated_count
+
+    def _bulk_save_data_points(self, data, indicator_obj, indicator_id, resolution):
+        """
+        Upsert a chunk in batches against the EnergyData unique key.
+        One query loads the existing values for the chunk window so created/updated
+        counts can be reported and unchanged rows skipped; the rest are written with
+        bulk_create(update_conflicts=True), i.e. INSERT ... ON CONFLICT DO UPDATE.
+        """
+        if data is None or data.empty:
+            return 0, 0
+
+        series = data[str(indicator_id)]
+        # ON CONFLICT cannot touch the same row twice in one statement - last value wins,
+        # same as the per-row path
+        series = series[~series.index.duplicated(keep='last')]
+
+        existing = dict(
+            EnergyData.objects.filter(
+                indicator=indicator_obj,
+                resolution=resolution,
+                timestamp__gte=series.index.min().to_pydatetime(),
+                timestamp__lte=series.index.max().to_pydatetime(),
+            ).values_list('timestamp', 'value')
+        )
+
+        rows = []
+        created_count = updated_count = 0
+
+        for timestamp, value in series.items():
+            timestamp = timestamp.to_pydatetime()
+            value = float(value)
+
+            if timestamp not in existing:
+                created_count += 1
+            elif existing[timestamp] != value:
+                updated_count += 1
+            else:
+                continue
+
+            rows.append(EnergyData(
+                indicator=indicator_obj,
+                timestamp=timestamp,
+                resolution=resolution,
+                value=value
+            ))
+
+        if rows:
+            EnergyData.objects.bulk_create(
+                rows,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=['indicator', 'timestamp', 'resolution'],
+                update_fields=['value'],
+            )
+
+        return created_count, updated_count
@@ -0,0 +1,40 @@
+# management/commands/migrate_hourly_storage.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from energy_analysis.services.hourly_store import HourlyStore
+from energy_analysis.services.summary_repository import SummaryRepository
+from datetime import date
+
+
+class Command(BaseCommand):
+    help = 'Move daily summary hourly arrays between the JSON blob and the hourly record tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', choices=['table', 'json'], required=True)
+        parser.add_argument('--kind', choices=['energy', 'curtailment', 'all'], default='all')
+        parser.add_argument('--start', type=str, help='YYYY-MM-DD')
+        parser.add_argument('--end', type=str, help='YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        kinds = [HourlyStore.ENERGY, HourlyStore.CURTAILMENT] if options['kind'] == 'all' else [options['kind']]
+
+        for kind in kinds:
+            summaries = SummaryRepository.queryset(
+                kind, SummaryRepository.HOURLY,
+                start=date.fromisoformat(options['start']) if options['start'] else None,
+                end=date.fromisoformat(options['end']) if options['end'] else None,
+            ).order_by('date')
+
+            moved = unchanged = 0
+            for summary in summaries.iterator(chunk_size=200):
+                with transaction.atomic():
+                    if HourlyStore.convert(kind, summary, options['to']):
+                        moved += 1
+                    else:
+                        unchanged += 1
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{kind}: {moved} summaries moved to {options['to']}, {unchanged} unchanged"
+            ))
+
+        self.stdout.write(f"Set HOURLY_STORAGE_BACKEND={options['to']} so new summaries use the same layout.")
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import os
+import socket
+import time
+from energy_analysis.services.fetch_job_service import FetchJobService
+
+
+class Command(BaseCommand):
+    help = 'Run queued cold-date fetch jobs (see ENERGY_BACKGROUND_FETCH). Safe to run several at once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit instead of polling')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (0 = no limit)')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        stale_after = getattr(settings, 'FETCH_JOB_STALE_SECONDS', 600)
+        retention_hours = getattr(settings, 'FETCH_JOB_RETENTION_HOURS', 24)
+        processed = 0
+
+        self.stdout.write(f'Fetch worker {worker} started')
+
+        while True:
+            FetchJobService.requeue_stale(stale_after)
+            job = FetchJobService.claim(worker)
+
+            if job is None:
+                FetchJobService.prune(retention_hours)
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            started = time.monotonic()
+            job = FetchJobService.run(job)
+            processed += 1
+
+            message = f'Job {job.id} {job.key}: {job.status} in {time.monotonic() - started:.1f}s'
+            if job.status == 'done':
+                self.stdout.write(self.style.SUCCESS(message))
+            else:
+                self.stdout.write(self.style.WARNING(f'{message} ({job.last_error})'))
+
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
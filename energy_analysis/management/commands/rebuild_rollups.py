@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import date
+from energy_analysis.services.region_service import RegionService
+from energy_analysis.services.rollup_service import RollupService
+
+
+class Command(BaseCommand):
+    help = 'Recompute weekly/monthly/yearly EnergyRollup rows from DailyEnergySummary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--region', choices=RegionService.SUPPORTED_REGIONS,
+                            help='Default: every region')
+        parser.add_argument('--start', type=str, help='YYYY-MM-DD (periods containing it are rebuilt whole)')
+        parser.add_argument('--end',   type=str, help='YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end   = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        regions = [options['region']] if options['region'] else RegionService.SUPPORTED_REGIONS
+        for region in regions:
+            written = RollupService.rebuild(region, start, end)
+            self.stdout.write(self.style.SUCCESS(f'{region}: {written} rollups written'))
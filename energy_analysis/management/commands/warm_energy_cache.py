@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import date, timedelta
+from energy_analysis.services.cache_warming_service import CacheWarmingService
+from energy_analysis.services.region_service import RegionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-build daily energy and curtailment summaries (default: the latest settled day per region - "
+        "yesterday for Spain, the day before for CAISO - every region). Run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=str, help='Last day to build, YYYY-MM-DD (default: per region)')
+        parser.add_argument('--days', type=int, default=1, help='Number of days ending at --date')
+        parser.add_argument('--region', choices=RegionService.SUPPORTED_REGIONS,
+                            help='Default: every region')
+
+    def handle(self, *args, **options):
+        try:
+            last = date.fromisoformat(options['date']) if options['date'] else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        regions = [options['region']] if options['region'] else RegionService.SUPPORTED_REGIONS
+        failures = 0
+
+        for region in regions:
+            region_last = last or CacheWarmingService.default_day(region)
+            days = [region_last - timedelta(days=offset) for offset in range(options['days'] - 1, -1, -1)]
+            for day in days:
+                results = CacheWarmingService.build_day(region, day)
+                line = f"{region} {day}: " + ', '.join(f'{kind} {status}' for kind, status in results.items())
+
+                if 'failed' in results.values():
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(line))
+                elif 'no_data' in results.values() or 'not_settled' in results.values():
+                    self.stdout.write(self.style.WARNING(line))
+                else:
+                    self.stdout.write(self.style.SUCCESS(line))
+
+        if failures:
+            raise CommandError(f'{failures} region-days failed')
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('energy_analysis', '0006_alter_dailycurtailmentsummary_data_source_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('done', 'Done'), ('no_data', 'No data upstream'), ('failed', 'Failed')], max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['job', 'date'],
+                'unique_together': {('job', 'date')},
+            },
+        ),
+    ]
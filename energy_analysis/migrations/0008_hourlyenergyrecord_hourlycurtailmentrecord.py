@@ -0,0 +1,52 @@
+# Generated by Django 4.2.11 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('energy_analysis', '0007_backfillcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyCurtailmentRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('data_source', models.CharField(max_length=20)),
+                ('hour', models.TimeField()),
+                ('curtailed_mwh', models.FloatField(null=True)),
+                ('redispatch_up', models.FloatField(null=True)),
+                ('spot_price', models.FloatField(null=True)),
+                ('revenue_lost', models.FloatField(null=True)),
+            ],
+            options={
+                'ordering': ['date', 'hour'],
+                'unique_together': {('data_source', 'date', 'hour')},
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyEnergyRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('data_source', models.CharField(max_length=20)),
+                ('hour', models.TimeField()),
+                ('demand', models.FloatField(null=True)),
+                ('solar', models.FloatField(null=True)),
+                ('wind', models.FloatField(null=True)),
+                ('vre_total', models.FloatField(null=True)),
+                ('net_load', models.FloatField(null=True)),
+                ('solar_pct', models.FloatField(null=True)),
+                ('wind_pct', models.FloatField(null=True)),
+                ('vre_pct', models.FloatField(null=True)),
+                ('price', models.FloatField(null=True)),
+            ],
+            options={
+                'ordering': ['date', 'hour'],
+                'unique_together': {('data_source', 'date', 'hour')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('energy_analysis', '0008_hourlyenergyrecord_hourlycurtailmentrecord'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='energydata',
+            index=models.Index(fields=['indicator', 'resolution', 'timestamp'], include=('value',), name='energydata_ind_res_ts_cover'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:20
+
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_energydata(apps, schema_editor):
+    """
+    Opt-in: only on PostgreSQL with ENERGYDATA_PARTITIONING enabled.
+    Can also be run later with `manage.py energydata_partitions convert`.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql' or not getattr(settings, 'ENERGYDATA_PARTITIONING', False):
+        return
+
+    from energy_analysis.utils.partitioning import EnergyDataPartitioner
+    EnergyDataPartitioner.convert(
+        connection, months_ahead=getattr(settings, 'ENERGYDATA_PARTITION_MONTHS_AHEAD', 3)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('energy_analysis', '0009_energydata_covering_index'),
+    ]
+
+    operations = [
+        # Model state is unchanged; converting back is a manual restore
+        migrations.RunPython(partition_energydata, migrations.RunPython.noop, elidable=True),
+    ]
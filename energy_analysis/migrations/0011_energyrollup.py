@@ -0,0 +1,39 @@
+# Generated by Django 4.2.11 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('energy_analysis', '0010_partition_energydata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnergyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(max_length=20)),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month'), ('year', 'Year')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('days_count', models.IntegerField(default=0)),
+                ('peak_vre_pct_sum', models.FloatField(default=0)),
+                ('peak_vre_pct_max', models.FloatField(null=True)),
+                ('vre_pct_sum', models.FloatField(default=0)),
+                ('sustained_high_vre_hours', models.IntegerField(default=0)),
+                ('total_vre_gwh', models.FloatField(default=0)),
+                ('total_demand_gwh', models.FloatField(default=0)),
+                ('max_ramp_gw_sum', models.FloatField(default=0)),
+                ('max_ramp_gw_max', models.FloatField(null=True)),
+                ('ramp_histogram', models.JSONField(default=dict)),
+                ('price_hours', models.IntegerField(default=0)),
+                ('negative_price_hours', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['region', 'period', 'period_start'],
+                'unique_together': {('region', 'period', 'period_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.11 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+def count_days(apps, schema_editor):
+    """Existing rows were built from every daily summary of the month"""
+    MonthlyCurtailmentSummary = apps.get_model('energy_analysis', 'MonthlyCurtailmentSummary')
+    DailyCurtailmentSummary = apps.get_model('energy_analysis', 'DailyCurtailmentSummary')
+
+    for monthly in MonthlyCurtailmentSummary.objects.all():
+        monthly.days_count = DailyCurtailmentSummary.objects.filter(
+            date__year=monthly.year, date__month=monthly.month, data_source__in=['database', 'esios']
+        ).count()
+        monthly.save(update_fields=['days_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('energy_analysis', '0011_energyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlycurtailmentsummary',
+            name='region',
+            field=models.CharField(default='spain', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='monthlycurtailmentsummary',
+            name='days_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterUniqueTogether(
+            name='monthlycurtailmentsummary',
+            unique_together={('region', 'year', 'month')},
+        ),
+        migrations.AlterModelOptions(
+            name='monthlycurtailmentsummary',
+            options={'ordering': ['region', 'year', 'month'], 'verbose_name': 'Monthly Curtailment Summary', 'verbose_name_plural': 'Monthly Curtailment Summaries'},
+        ),
+        migrations.RunPython(count_days, migrations.RunPython.noop),
+    ]
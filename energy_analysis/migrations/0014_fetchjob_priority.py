@@ -0,0 +1,26 @@
+# Generated by Django 4.2.11 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('energy_analysis', '0013_fetchjob'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='fetchjob',
+            name='fetchjob_status_created',
+        ),
+        migrations.AddField(
+            model_name='fetchjob',
+            name='priority',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='fetchjob',
+            index=models.Index(fields=['status', 'priority', 'created_at'], name='fetchjob_status_prio_created'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from rest_framework.utils.encoders import JSONEncoder
 from dataclasses import dataclass
 from typing import Literal
 class EnergyIndicator(models.Model):
@@ -29,6 +30,12 @@ class EnergyData(models.Model):
         unique_together = ['indicator', 'timestamp', 'resolution']
         indexes = [
             models.Index(fields=['indicator', 'timestamp']),
+            # Covers the per-day summary reads (indicator_id IN, resolution =, timestamp range)
+            models.Index(
+                fields=['indicator', 'resolution', 'timestamp'],
+                include=['value'],
+                name='energydata_ind_res_ts_cover',
+            ),
         ]
         ordering = ['timestamp']
     
@@ -73,10 +80,8 @@ class DailyEnergySummary(models.Model):
     
     def set_total_hours(self):
         """Calculate and store total hours of data available"""
-        if not self.hourly_data_json or not self.hourly_data_json.get('hourly_data'):
-            self.total_hours = 0
-        else:
-            self.total_hours = len(self.hourly_data_json['hourly_data'])
+        from .services.hourly_store import HourlyStore
+        self.total_hours = len(HourlyStore.hourly(self))
         
         self.save(update_fields=['total_hours'])
     class Meta:
@@ -123,6 +128,7 @@ class DailyCurtailmentSummary(models.Model):
     def __str__(self):
         return f"{self.date}: {self.total_curtailed_mwh:.1f} MWh, €{self.estimated_revenue_lost_eur:.0f} lost"
 class MonthlyCurtailmentSummary(models.Model):
+    region = models.CharField(max_length=20, default='spain')
     year = models.IntegerField()
     month = models.IntegerField()  # 1-12
 
@@ -130,6 +136,7 @@ class MonthlyCurtailmentSummary(models.Model):
     total_curtailed_mwh = models.FloatField()
     total_revenue_lost_eur = models.FloatField()
     avg_daily_curtailed_mwh = models.FloatField()
+    days_count = models.IntegerField(default=0)  # daily summaries rolled in
     days_with_curtailment = models.IntegerField()
 
     # Worst day of the month
@@ -145,13 +152,192 @@ class MonthlyCurtailmentSummary(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ['year', 'month']
-        ordering = ['year', 'month']
+        unique_together = ['region', 'year', 'month']
+        ordering = ['region', 'year', 'month']
         verbose_name = "Monthly Curtailment Summary"
         verbose_name_plural = "Monthly Curtailment Summaries"
 
     def __str__(self):
-        return f"{self.year}-{self.month:02d}: {self.total_curtailed_mwh:.1f} MWh, €{self.total_revenue_lost_eur:.0f}"
+        return f"{self.region} {self.year}-{self.month:02d}: {self.total_curtailed_mwh:.1f} MWh, €{self.total_revenue_lost_eur:.0f}"
+class HourlyEnergyRecord(models.Model):
+    """
+    One hour of a DailyEnergySummary, used when HOURLY_STORAGE_BACKEND = 'table'.
+    Keyed like the summary (date, data_source) so rows can be written before it exists.
+    """
+    date = models.DateField()
+    data_source = models.CharField(max_length=20)
+    hour = models.TimeField()
+
+    demand = models.FloatField(null=True)     # GW
+    solar = models.FloatField(null=True)
+    wind = models.FloatField(null=True)
+    vre_total = models.FloatField(null=True)
+    net_load = models.FloatField(null=True)
+    solar_pct = models.FloatField(null=True)  # % of demand
+    wind_pct = models.FloatField(null=True)
+    vre_pct = models.FloatField(null=True)
+    price = models.FloatField(null=True)      # EUR/MWh (USD for CAISO)
+
+    class Meta:
+        unique_together = ['data_source', 'date', 'hour']
+        ordering = ['date', 'hour']
+
+    def __str__(self):
+        return f"{self.data_source} {self.date} {self.hour:%H:%M}"
+class HourlyCurtailmentRecord(models.Model):
+    """One hour of a DailyCurtailmentSummary, used when HOURLY_STORAGE_BACKEND = 'table'"""
+    date = models.DateField()
+    data_source = models.CharField(max_length=20)
+    hour = models.TimeField()
+
+    curtailed_mwh = models.FloatField(null=True)
+    redispatch_up = models.FloatField(null=True)
+    spot_price = models.FloatField(null=True)
+    revenue_lost = models.FloatField(null=True)
+
+    class Meta:
+        unique_together = ['data_source', 'date', 'hour']
+        ordering = ['date', 'hour']
+
+    def __str__(self):
+        return f"{self.data_source} {self.date} {self.hour:%H:%M}"
+class BackfillCheckpoint(models.Model):
+    """Per-date progress of a resumable backfill job (e.g. load_caiso_data)"""
+    job = models.CharField(max_length=50)
+    date = models.DateField()
+    status = models.CharField(max_length=20, choices=[
+        ('done', 'Done'),
+        ('no_data', 'No data upstream'),
+        ('failed', 'Failed'),
+    ])
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['job', 'date']
+        ordering = ['job', 'date']
+
+    def __str__(self):
+        return f"{self.job} {self.date}: {self.status}"
+class EnergyRollup(models.Model):
+    """
+    Week / month / year aggregate of DailyEnergySummary per region.
+    Stored as sums, maxima and counts so a new day can be added without
+    rereading the period; means are derived in to_dict().
+    """
+    region = models.CharField(max_length=20)
+    period = models.CharField(max_length=10, choices=[
+        ('week', 'Week'),
+        ('month', 'Month'),
+        ('year', 'Year'),
+    ])
+    period_start = models.DateField()  # Monday / 1st of month / 1 Jan
+
+    days_count = models.IntegerField(default=0)
+
+    # VRE penetration
+    peak_vre_pct_sum = models.FloatField(default=0)   # sum of daily peaks
+    peak_vre_pct_max = models.FloatField(null=True)
+    vre_pct_sum = models.FloatField(default=0)        # sum of daily mean shares
+    sustained_high_vre_hours = models.IntegerField(default=0)
+
+    # Energy (GWh)
+    total_vre_gwh = models.FloatField(default=0)
+    total_demand_gwh = models.FloatField(default=0)
+
+    # Net load ramps: daily max ramp summed, max, and bucketed
+    max_ramp_gw_sum = models.FloatField(default=0)
+    max_ramp_gw_max = models.FloatField(null=True)
+    ramp_histogram = models.JSONField(default=dict)   # {"0-1": days, "1-2": days, ...}
+
+    # Prices
+    price_hours = models.IntegerField(default=0)
+    negative_price_hours = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['region', 'period', 'period_start']
+        ordering = ['region', 'period', 'period_start']
+
+    def __str__(self):
+        return f"{self.region} {self.period} {self.period_start}: {self.days_count} days"
+
+    def to_dict(self):
+        days = self.days_count or 1
+        return {
+            'region': self.region,
+            'period': self.period,
+            'period_start': self.period_start.isoformat(),
+            'days_count': self.days_count,
+            'mean_peak_vre_pct': round(self.peak_vre_pct_sum / days, 1),
+            'max_peak_vre_pct': self.peak_vre_pct_max,
+            'mean_vre_pct': round(self.vre_pct_sum / days, 1),
+            'sustained_high_vre_hours': self.sustained_high_vre_hours,
+            'total_vre_gwh': round(self.total_vre_gwh, 2),
+            'total_demand_gwh': round(self.total_demand_gwh, 2),
+            'mean_max_ramp_gw': round(self.max_ramp_gw_sum / days, 2),
+            'max_ramp_gw': self.max_ramp_gw_max,
+            'ramp_histogram': self.ramp_histogram,
+            'price_hours': self.price_hours,
+            'negative_price_hours': self.negative_price_hours,
+        }
+
+
+class FetchJob(models.Model):
+    """
+    A deferred cold-date fetch (see FetchJobService / process_fetch_jobs).
+    `key` identifies the request; at most one queued or running job per key.
+    """
+    kind = models.CharField(max_length=30, choices=[
+        ('chart_data', 'Chart data'),
+        ('curtailment_data', 'Curtailment data'),
+        ('bess_analysis', 'BESS analysis'),
+    ])
+    key = models.CharField(max_length=200)
+    params = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, default='queued', choices=[
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ])
+    priority = models.SmallIntegerField(default=0)  # lower runs first; prefetches queue behind requests
+    attempts = models.IntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    result = models.JSONField(null=True, blank=True, encoder=JSONEncoder)  # the endpoint's payload
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'priority', 'created_at'], name='fetchjob_status_prio_created')]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'], condition=models.Q(status__in=['queued', 'running']), name='fetchjob_one_active_per_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.key}: {self.status}"
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'priority': self.priority,
+            'attempts': self.attempts,
+            'error': self.last_error or None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'result': self.result if self.status == 'done' else None,
+        }
 @dataclass
 class BESSConfig:
     """
@@ -0,0 +1,75 @@
+# renderers.py
+"""
+Alternative representations of the chart payloads.
+
+Per-day chart data carries 24+ hour dicts that repeat the same ten keys; range
+data is already columnar. Both renderers turn `hourly_data` into one array per
+metric over a shared `axis`, and leave everything else in the payload as is:
+
+- ColumnarJSONRenderer: ?format=columnar, or Accept: application/vnd.energy.columnar+json
+- ArrowIPCRenderer:     ?format=arrow,    or Accept: application/vnd.apache.arrow.stream
+  One Arrow record batch (axis + series columns); the rest of the payload is
+  JSON in the schema metadata under b'payload'.
+"""
+from typing import Dict
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+import json
+
+
+def to_columnar(data):
+    """{'hourly_data': [{hour, metric...}]} -> {'axis': [hours], 'series': {metric: [...]}}"""
+    if not isinstance(data, dict) or not isinstance(data.get('hourly_data'), list):
+        return data
+
+    rows = data['hourly_data']
+    metrics = []
+    for row in rows:
+        for name in row:
+            if name != 'hour' and name not in metrics:
+                metrics.append(name)
+
+    columnar = {name: value for name, value in data.items() if name != 'hourly_data'}
+    columnar['axis'] = [row.get('hour') for row in rows]
+    columnar['series'] = {name: [row.get(name) for row in rows] for name in metrics}
+    return columnar
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.energy.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(to_columnar(data), accepted_media_type, renderer_context)
+
+
+class ArrowIPCRenderer(BaseRenderer):
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import pyarrow as pa
+
+        if data is None:
+            return b''
+
+        data = to_columnar(data)
+        columns: Dict[str, list] = {}
+        if isinstance(data, dict) and 'axis' in data and isinstance(data.get('series'), dict):
+            columns = {'axis': data['axis'], **data['series']}
+            payload = {name: value for name, value in data.items() if name not in ('axis', 'series')}
+        else:
+            # Errors and anything else without series: metadata only
+            payload = data
+
+        table = pa.table(
+            {name: pa.array(values) for name, values in columns.items()},
+            metadata={'payload': json.dumps(payload, cls=JSONEncoder)},
+        )
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
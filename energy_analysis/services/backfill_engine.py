@@ -0,0 +1,172 @@
+# services/backfill_engine.py
+"""
+Parallel, resumable day-by-day backfill.
+
+Used by the CAISO load commands: works out which dates are still missing in a
+single query, fetches them on a bounded worker pool and writes summaries plus
+checkpoint rows in batches. Re-running the same command resumes where the last
+run stopped - no start date juggling needed.
+"""
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+from django.db import transaction
+import logging
+from ..models import BackfillCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillEngine:
+    """
+    Args:
+        job: checkpoint namespace, e.g. 'caiso_generation'
+        model: summary model with (date, data_source) unique key
+        data_source: data_source value the job writes
+        fetch: date_string -> payload or None; runs on worker threads, must not touch the ORM
+        build: (date, payload) -> unsaved model instance; runs on the calling thread
+        max_workers: concurrent upstream fetches
+        batch_size: summaries per bulk write
+        retry_empty: refetch dates previously checkpointed as 'no_data'
+        report: optional callback (date, status, detail) for progress output
+    """
+
+    def __init__(
+        self,
+        job: str,
+        model,
+        data_source: str,
+        fetch: Callable[[str], Optional[dict]],
+        build: Callable[[date, dict], object],
+        max_workers: int = 4,
+        batch_size: int = 20,
+        retry_empty: bool = False,
+        report: Optional[Callable[[date, str, str], None]] = None,
+    ):
+        self.job = job
+        self.model = model
+        self.data_source = data_source
+        self.fetch = fetch
+        self.build = build
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        self.retry_empty = retry_empty
+        self.report = report or (lambda day, status, detail: None)
+
+        self.stats = {'created': 0, 'skipped': 0, 'no_data': 0, 'errors': 0}
+        self._attempts: Dict[date, int] = {}
+        self._pending_rows = []
+        self._pending_checkpoints = []
+
+    def missing_dates(self, start: date, end: date) -> List[date]:
+        """Dates in [start, end] with no summary row and no 'no_data' checkpoint."""
+        done = set(
+            self.model.objects.filter(
+                data_source=self.data_source, date__gte=start, date__lte=end
+            ).values_list('date', flat=True)
+        )
+
+        checkpoints = BackfillCheckpoint.objects.filter(job=self.job, date__gte=start, date__lte=end)
+        self._attempts = dict(checkpoints.values_list('date', 'attempts'))
+        if not self.retry_empty:
+            done |= set(checkpoints.filter(status='no_data').values_list('date', flat=True))
+
+        days = (end - start).days + 1
+        all_dates = (start + timedelta(days=i) for i in range(days))
+        missing = [d for d in all_dates if d not in done]
+
+        self.stats['skipped'] = days - len(missing)
+        return missing
+
+    def run(self, start: date, end: date) -> Dict[str, int]:
+        """
+        Backfill [start, end]. On KeyboardInterrupt the finished part of the
+        current batch is flushed before the exception propagates.
+        """
+        dates = self.missing_dates(start, end)
+        logger.info(f"Backfill {self.job}: {len(dates)} missing dates between {start} and {end}")
+
+        if not dates:
+            return self.stats
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        in_flight = {}
+        queue = iter(dates)
+
+        try:
+            while True:
+                # Keep a bounded number of fetches in flight
+                while len(in_flight) < self.max_workers * 2:
+                    day = next(queue, None)
+                    if day is None:
+                        break
+                    in_flight[executor.submit(self.fetch, day.isoformat())] = day
+
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    day = in_flight.pop(future)
+                    self._handle_result(day, future)
+
+                if len(self._pending_checkpoints) >= self.batch_size:
+                    self._flush()
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._flush()
+            raise
+        else:
+            executor.shutdown()
+            self._flush()
+
+        return self.stats
+
+    def _handle_result(self, day: date, future):
+        attempts = self._attempts.get(day, 0) + 1
+
+        try:
+            payload = future.result()
+            if not payload:
+                self._checkpoint(day, 'no_data', attempts)
+                self.stats['no_data'] += 1
+                self.report(day, 'no_data', '')
+                return
+
+            row = self.build(day, payload)
+        except Exception as e:
+            self._checkpoint(day, 'failed', attempts, str(e))
+            self.stats['errors'] += 1
+            self.report(day, 'failed', str(e))
+            return
+
+        self._pending_rows.append(row)
+        self._checkpoint(day, 'done', attempts)
+        self.stats['created'] += 1
+        self.report(day, 'done', '')
+
+    def _checkpoint(self, day: date, status: str, attempts: int, error: str = ''):
+        self._pending_checkpoints.append(BackfillCheckpoint(
+            job=self.job, date=day, status=status, attempts=attempts, last_error=error[:1000]
+        ))
+
+    def _flush(self):
+        """Write the pending summaries and their checkpoints in one transaction."""
+        if not self._pending_checkpoints:
+            return
+
+        with transaction.atomic():
+            if self._pending_rows:
+                # Another writer may have created the same date meanwhile
+                self.model.objects.bulk_create(self._pending_rows, ignore_conflicts=True)
+            BackfillCheckpoint.objects.bulk_create(
+                self._pending_checkpoints,
+                update_conflicts=True,
+                unique_fields=['job', 'date'],
+                update_fields=['status', 'attempts', 'last_error', 'updated_at'],
+            )
+
+        logger.info(f"Backfill {self.job}: flushed {len(self._pending_rows)} summaries, "
+                    f"{len(self._pending_checkpoints)} checkpoints")
+        self._pending_rows = []
+        self._pending_checkpoints = []
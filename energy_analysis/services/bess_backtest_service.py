@@ -0,0 +1,213 @@
+"""
+BESS Backtest Service - the single-day optimizer over a whole date range
+
+Loads every day's hourly prices into one (days x 24) matrix and applies the
+same rules as BESSDecisionService._find_optimal_schedule to all days at once:
+
+1. Per day, sort hours by price (missing prices sort last and are ignored)
+2. Charge during the N cheapest hours, discharge during the N most expensive
+3. Only trade if avg discharge >= avg charge / efficiency + €2/MWh
+
+Answers "what would this battery have earned over the year?" in one request.
+With optimizer='dp' the chronological multi-cycle BESSDispatchOptimizer is
+used instead, on the same matrix.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BESSBacktestService:
+
+    MAX_RANGE_DAYS = 366 * 3
+    HOURS = 24
+    MIN_MARGIN_EUR_PER_MWH = 2.0  # same margin as the single-day optimizer
+
+    @classmethod
+    def run(cls, region: str, start: str, end: str, config, optimizer: str = 'greedy') -> Dict:
+        """
+        Backtest `config` over [start, end] with the 'greedy' or 'dp' optimizer.
+
+        Returns per-day performance plus aggregate profit, cycles and utilization.
+        Days without a stored summary are listed in missing_dates, not fetched.
+        """
+        if optimizer not in ('greedy', 'dp'):
+            raise ValueError(f"Unknown optimizer: {optimizer}")
+
+        start_date, end_date = cls.parse_range(start, end)
+        dates, prices, missing = cls.load_price_matrix(region, start_date, end_date)
+        if optimizer == 'dp':
+            from .bess_dispatch_optimizer import BESSDispatchOptimizer
+            performance = BESSDispatchOptimizer.evaluate(prices, config)
+        else:
+            performance = cls.evaluate(prices, config)
+
+        return {
+            'region': region,
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'config': config.to_dict(),
+            'optimizer': optimizer,
+            'daily': cls._daily_rows(dates, performance),
+            'aggregate': cls._aggregate(performance, config),
+            'missing_dates': [d.isoformat() for d in missing],
+        }
+
+    # =========================================================================
+    # Price matrix
+    # =========================================================================
+
+    @classmethod
+    def parse_range(cls, start: str, end: str) -> Tuple[date, date]:
+        try:
+            start_date = date.fromisoformat(start)
+            end_date = date.fromisoformat(end)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid date range: {start} to {end}")
+
+        if end_date < start_date:
+            raise ValueError("End date must not be before start date")
+        if (end_date - start_date).days + 1 > cls.MAX_RANGE_DAYS:
+            raise ValueError(f"Range too long - max {cls.MAX_RANGE_DAYS} days")
+        return start_date, end_date
+
+    @classmethod
+    def load_price_matrix(cls, region: str, start_date: date, end_date: date) -> Tuple[List[date], np.ndarray, List[date]]:
+        """
+        One query for the window -> (dates, prices[days, 24], missing dates).
+        Hours without a price are NaN; sub-hourly entries are averaged per hour.
+        """
+        from .region_service import RegionService
+        from .summary_repository import SummaryRepository
+
+        if region not in RegionService.REGION_SOURCES:
+            raise ValueError(f"Unsupported region: {region}")
+
+        # (hour, price) pairs only - no demand/generation dicts built per hour
+        prices_by_date = SummaryRepository.prices(RegionService.REGION_SOURCES[region], start_date, end_date)
+
+        all_dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        dates = [d for d in all_dates if prices_by_date.get(d)]
+        missing = [d for d in all_dates if not prices_by_date.get(d)]
+
+        sums = np.zeros((len(dates), cls.HOURS))
+        counts = np.zeros((len(dates), cls.HOURS))
+        for row, day in enumerate(dates):
+            for hour, price in prices_by_date[day]:
+                if price is None:
+                    continue
+                col = int(hour[:2])
+                sums[row, col] += price
+                counts[row, col] += 1
+
+        with np.errstate(invalid='ignore'):
+            prices = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+        return dates, prices, missing
+
+    # =========================================================================
+    # Vectorized optimizer + performance
+    # =========================================================================
+
+    @classmethod
+    def evaluate(cls, prices: np.ndarray, config) -> Dict[str, np.ndarray]:
+        """
+        Optimal single-cycle schedule for every row of `prices` at once.
+        Returns per-day arrays with the same metrics as daily_performance.
+        """
+        days = prices.shape[0]
+        usable_capacity = config.capacity_mwh * (config.max_soc - config.min_soc) / 100
+        hours_needed = int(usable_capacity / config.power_mw)
+
+        traded = np.zeros(days, dtype=bool)
+        charge_sum = np.zeros(days)
+        discharge_sum = np.zeros(days)
+
+        if hours_needed >= 1 and days:
+            valid = ~np.isnan(prices)
+            valid_hours = valid.sum(axis=1)
+
+            # Stable sort with missing prices pushed to the end, like sorted() on valid hours
+            filled = np.where(valid, prices, np.inf)
+            sorted_prices = np.take_along_axis(filled, np.argsort(filled, axis=1, kind='stable'), axis=1)
+
+            charge = sorted_prices[:, :hours_needed]
+            top = (valid_hours[:, None] - hours_needed + np.arange(hours_needed)).clip(0, prices.shape[1] - 1)
+            discharge = np.take_along_axis(sorted_prices, top, axis=1)
+
+            # Days short of 2N priced hours can't trade (their sums contain inf)
+            enough_hours = valid_hours >= hours_needed * 2
+            avg_charge = np.where(enough_hours, charge.mean(axis=1), 0)
+            avg_discharge = np.where(enough_hours, discharge.mean(axis=1), 0)
+
+            min_profitable_discharge = avg_charge / config.efficiency + cls.MIN_MARGIN_EUR_PER_MWH
+            traded = enough_hours & (avg_discharge >= min_profitable_discharge)
+
+            charge_sum = np.where(traded, charge.sum(axis=1), 0)
+            discharge_sum = np.where(traded, discharge.sum(axis=1), 0)
+
+        hours_traded = np.where(traded, hours_needed, 0)
+        cost = config.power_mw * charge_sum
+        revenue = config.power_mw * config.efficiency * discharge_sum
+        charged = config.power_mw * hours_traded
+        discharged = config.power_mw * config.efficiency * hours_traded
+        safe_charged = np.where(charged > 0, charged, 1)
+        safe_discharged = np.where(discharged > 0, discharged, 1)
+
+        return {
+            'traded': traded,
+            'gross_profit_eur': revenue - cost,
+            'revenue_eur': revenue,
+            'cost_eur': cost,
+            'energy_charged_mwh': charged,
+            'energy_discharged_mwh': discharged,
+            'avg_charge_price': np.where(charged > 0, cost / safe_charged, 0),
+            'avg_discharge_price': np.where(discharged > 0, revenue / safe_discharged, 0),
+            'cycles_completed': discharged / usable_capacity if usable_capacity > 0 else np.zeros(days),
+            'charge_hours': hours_traded,
+            'discharge_hours': hours_traded,
+            'utilization_pct': discharged / config.capacity_mwh * 100 if config.capacity_mwh > 0 else np.zeros(days),
+        }
+
+    ROUNDING = {
+        'gross_profit_eur': 2, 'revenue_eur': 2, 'cost_eur': 2,
+        'energy_charged_mwh': 1, 'energy_discharged_mwh': 1,
+        'avg_charge_price': 2, 'avg_discharge_price': 2,
+        'cycles_completed': 2, 'utilization_pct': 1,
+    }
+
+    @classmethod
+    def _daily_rows(cls, dates: List[date], performance: Dict[str, np.ndarray]) -> List[Dict]:
+        """Materialize per-day dicts only at the end"""
+        rows = []
+        for i, day in enumerate(dates):
+            row = {'date': day.isoformat(), 'traded': bool(performance['traded'][i])}
+            for field, digits in cls.ROUNDING.items():
+                row[field] = round(float(performance[field][i]), digits)
+            row['charge_hours'] = round(float(performance['charge_hours'][i]), 2)
+            row['discharge_hours'] = round(float(performance['discharge_hours'][i]), 2)
+            rows.append(row)
+        return rows
+
+    @classmethod
+    def _aggregate(cls, performance: Dict[str, np.ndarray], config) -> Dict:
+        days = len(performance['traded'])
+        discharged = float(performance['energy_discharged_mwh'].sum())
+
+        return {
+            'days_analyzed': days,
+            'days_traded': int(performance['traded'].sum()),
+            'gross_profit_eur': round(float(performance['gross_profit_eur'].sum()), 2),
+            'revenue_eur': round(float(performance['revenue_eur'].sum()), 2),
+            'cost_eur': round(float(performance['cost_eur'].sum()), 2),
+            'energy_charged_mwh': round(float(performance['energy_charged_mwh'].sum()), 1),
+            'energy_discharged_mwh': round(discharged, 1),
+            'cycles_completed': round(float(performance['cycles_completed'].sum()), 2),
+            'avg_daily_profit_eur': round(float(performance['gross_profit_eur'].mean()), 2) if days else 0,
+            'avg_utilization_pct': round(float(performance['utilization_pct'].mean()), 1) if days else 0,
+            'profit_per_mw_eur': round(float(performance['gross_profit_eur'].sum()) / config.power_mw, 2),
+        }
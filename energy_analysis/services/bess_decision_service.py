@@ -16,6 +16,7 @@ No machine learning, no complex optimization - just sorting and arithmetic.
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -31,22 +32,32 @@ class BESSDecisionService:
     due to forecast errors and market constraints.
     """
     
+    OPTIMIZERS = ('greedy', 'dp')
+
     @staticmethod
-    def analyze_day(date_string: str, config) -> Dict:
+    def analyze_day(date_string: str, config, optimizer: str = 'greedy') -> Dict:
         """
         Main entry point: find optimal BESS operations for a given day.
         
         Args:
             date_string: Date in 'YYYY-MM-DD' format
             config: BESSConfig with battery specifications
+            optimizer: 'greedy' (single cycle, sorted hours) or 'dp'
+                (chronological, multi-cycle - see BESSDispatchOptimizer)
             
         Returns:
             Dict with hourly decisions and daily performance
         """
+        if optimizer not in BESSDecisionService.OPTIMIZERS:
+            raise ValueError(f"Unknown optimizer: {optimizer}")
+
         # Step 1: Get the day's data using your existing service
         from .daily_summary_service import DailySummaryService
-        summary, _ = DailySummaryService.get_or_create_summary(date_string)
-        hourly_data = summary.hourly_data_json.get('hourly_data', [])
+        from .hourly_store import HourlyStore
+        from .summary_repository import SummaryRepository
+        # Only the hourly arrays and data_source are used - skip the metric columns
+        summary, _ = DailySummaryService.get_or_create_summary(date_string, projection=SummaryRepository.HOURLY)
+        hourly_data = HourlyStore.hourly(summary)
         
         if not hourly_data:
             return {'error': f'No data for {date_string}'}
@@ -57,6 +68,9 @@ class BESSDecisionService:
         if len(hours_with_prices) < 2:
             return {'error': 'Insufficient price data for arbitrage'}
         
+        if optimizer == 'dp':
+            return BESSDecisionService._analyze_with_dp(date_string, hourly_data, summary.data_source, config)
+        
         # Step 3: Find optimal schedule
         schedule = BESSDecisionService._find_optimal_schedule(hours_with_prices, config)
         
@@ -89,6 +103,103 @@ class BESSDecisionService:
             'optimization_note': f"Optimal single-cycle: charge {len(schedule['charge_hours'])}h, discharge {len(schedule['discharge_hours'])}h"
         }
     
+    # =========================================================================
+    # DP optimizer (chronological, multi-cycle)
+    # =========================================================================
+    
+    @staticmethod
+    def _analyze_with_dp(date_string: str, hourly_data: List[Dict], data_source: str, config) -> Dict:
+        """Same response shape as the greedy path, schedule from BESSDispatchOptimizer"""
+        from .bess_dispatch_optimizer import BESSDispatchOptimizer
+        
+        prices = np.array([
+            np.nan if hour.get('price') is None else float(hour['price'])
+            for hour in hourly_data
+        ])
+        interval_hours = BESSDecisionService._interval_hours(hourly_data)
+        schedule = BESSDispatchOptimizer.optimize(prices, config, interval_hours=interval_hours)
+        
+        decisions = BESSDecisionService._build_dp_decisions(
+            hourly_data, schedule['energy_mwh'][0], schedule['soc_pct'][0], config
+        )
+        performance = BESSDecisionService._calculate_performance(decisions, config)
+        cycles = performance['cycles_completed']
+        
+        return {
+            'date': date_string,
+            'config': config.to_dict(),
+            'hourly_decisions': decisions,
+            'daily_performance': performance,
+            'data_source': data_source,
+            'optimization_note': (
+                f"Optimal multi-cycle dispatch: {cycles} cycles" if performance['discharge_hours']
+                else 'No profitable arbitrage opportunity found'
+            )
+        }
+    
+    @staticmethod
+    def _interval_hours(hourly_data: List[Dict]) -> float:
+        """Spacing of the series (1.0 for hourly, 0.25 for 15-minute data)"""
+        minutes = sorted({
+            int(hour['hour'][:2]) * 60 + int(hour['hour'][3:5])
+            for hour in hourly_data if hour.get('hour')
+        })
+        gaps = [b - a for a, b in zip(minutes, minutes[1:]) if b > a]
+        return min(gaps) / 60 if gaps else 1.0
+    
+    @staticmethod
+    def _build_dp_decisions(hourly_data: List[Dict], energy_mwh, soc_pct, config) -> List[Dict]:
+        """
+        Interval-by-interval decisions for a DP schedule.
+        energy_mwh is battery-side (+ charge, - discharge); sold energy is after efficiency.
+        """
+        decisions = []
+        
+        for i, hour in enumerate(hourly_data):
+            price = hour.get('price')
+            energy = float(energy_mwh[i])
+            soc_before = round(float(soc_pct[i]), 1)
+            soc_after = round(float(soc_pct[i + 1]), 1)
+            
+            if energy > 0:
+                decision = {
+                    'hour': hour.get('hour'),
+                    'action': 'CHARGE',
+                    'price': round(price, 2),
+                    'energy_mwh': round(energy, 1),
+                    'cost_eur': round(energy * price, 2),
+                    'soc_before': soc_before,
+                    'soc_after': soc_after,
+                    'reasoning': [f'✓ Charge ahead of higher prices (€{price:.2f}/MWh)']
+                }
+            elif energy < 0:
+                energy_out = -energy * config.efficiency
+                decision = {
+                    'hour': hour.get('hour'),
+                    'action': 'DISCHARGE',
+                    'price': round(price, 2),
+                    'energy_mwh': round(energy_out, 1),
+                    'cost_eur': round(-energy_out * price, 2),
+                    'soc_before': soc_before,
+                    'soc_after': soc_after,
+                    'reasoning': [f'✓ Discharge into high price (€{price:.2f}/MWh)']
+                }
+            else:
+                decision = {
+                    'hour': hour.get('hour'),
+                    'action': 'HOLD',
+                    'price': round(price, 2) if price else 0,
+                    'energy_mwh': 0,
+                    'cost_eur': 0,
+                    'soc_before': soc_before,
+                    'soc_after': soc_after,
+                    'reasoning': ['⚪ Not optimal for trading' if price is not None else '⚪ No price data']
+                }
+            
+            decisions.append(decision)
+        
+        return decisions
+    
     # =========================================================================
     # STEP 2: Extract valid hours
     # =========================================================================
@@ -0,0 +1,178 @@
+"""
+BESS Dispatch Optimizer - multi-cycle scheduling with dynamic programming
+
+The greedy optimizer in BESSDecisionService pairs the N cheapest hours with the
+N most expensive ones, ignoring chronology, and allows a single cycle. This
+optimizer walks the day in time order instead:
+
+1. State of charge is discretized into levels between min_soc and max_soc
+2. Each interval the battery can move up or down by whole steps, bounded by
+   its power rating (a step is power x interval / STEPS_PER_INTERVAL)
+3. Backward induction finds the best action for every (interval, level),
+   then a forward pass from the starting level reads the schedule off
+
+Charging buys energy at the interval price; discharging sells it after the
+round-trip efficiency loss, minus the same €2/MWh margin the greedy optimizer
+demands, so marginal trades are skipped. Intervals without a price are HOLD.
+
+All days in a (days x intervals) price matrix are solved at once with numpy,
+so a year of hourly data or a day of 15-minute data takes milliseconds.
+"""
+
+from typing import Dict, Optional
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BESSDispatchOptimizer:
+
+    STEPS_PER_INTERVAL = 4          # action granularity: quarter of full power
+    MAX_LEVELS = 400                # bounds the state space (and the run time)
+    MIN_MARGIN_EUR_PER_MWH = 2.0    # same margin as the greedy optimizer
+
+    @classmethod
+    def optimize(
+        cls,
+        prices: np.ndarray,
+        config,
+        interval_hours: float = 1.0,
+        initial_soc=None,
+        final_value_eur_per_mwh: Optional[np.ndarray] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Optimal schedule for every row of `prices` (days x intervals, NaN = no price).
+
+        Args:
+            initial_soc: starting SoC % (scalar or one per row), default config.min_soc
+            final_value_eur_per_mwh: optional value per row of energy left in the
+                battery at the end of the window (default: worthless)
+
+        Returns:
+            energy_mwh: battery-side energy per interval (+ charge, - discharge)
+            soc_pct: state of charge at every interval boundary (days x intervals+1)
+        """
+        plan = cls.solve(prices, config, interval_hours, final_value_eur_per_mwh)
+        days, intervals = plan['policy'].shape[1], plan['policy'].shape[0]
+
+        if initial_soc is None:
+            initial_soc = config.min_soc
+        level = cls.soc_to_level(plan, config, np.broadcast_to(np.asarray(initial_soc, dtype=float), (days,)))
+
+        rows = np.arange(days)
+        steps = np.zeros((days, intervals), dtype=int)
+        level_path = np.zeros((days, intervals + 1), dtype=int)
+        level_path[:, 0] = level
+        for t in range(intervals):
+            steps[:, t] = plan['policy'][t, rows, level]
+            level = level + steps[:, t]
+            level_path[:, t + 1] = level
+
+        return {
+            'energy_mwh': steps * plan['level_mwh'],
+            'soc_pct': cls.level_to_soc(plan, config, level_path),
+        }
+
+    @classmethod
+    def solve(cls, prices: np.ndarray, config, interval_hours: float = 1.0, final_value_eur_per_mwh=None) -> Dict:
+        """
+        Backward induction only: the best action (in levels) for every
+        (interval, row, level). Independent of the starting SoC, so one solve
+        can serve any number of forward passes.
+        """
+        prices = np.atleast_2d(np.asarray(prices, dtype=float))
+        days, intervals = prices.shape
+
+        usable_mwh = config.capacity_mwh * (config.max_soc - config.min_soc) / 100
+        max_step_mwh = config.power_mw * interval_hours
+
+        levels = int(min(cls.MAX_LEVELS, max(1, np.ceil(usable_mwh / max_step_mwh)) * cls.STEPS_PER_INTERVAL))
+        level_mwh = usable_mwh / levels
+        max_action = max(1, int(max_step_mwh / level_mwh + 1e-9))
+
+        # HOLD first so ties resolve to doing nothing
+        actions = [0] + [sign * a for a in range(1, max_action + 1) for sign in (1, -1)]
+
+        # Value of moving one level: buy at price, sell at price * efficiency - margin
+        valid = ~np.isnan(prices)
+        filled = np.where(valid, prices, 0.0)
+        charge_cost = filled * level_mwh
+        discharge_gain = (filled - cls.MIN_MARGIN_EUR_PER_MWH) * config.efficiency * level_mwh
+
+        value = np.zeros((days, levels + 1))
+        if final_value_eur_per_mwh is not None:
+            final_value = np.broadcast_to(np.asarray(final_value_eur_per_mwh, dtype=float), (days,))
+            value = final_value[:, None] * level_mwh * np.arange(levels + 1)[None, :]
+
+        policy = np.zeros((intervals, days, levels + 1), dtype=np.int16)
+        padded = np.full((days, levels + 1 + 2 * max_action), -np.inf)
+
+        for t in range(intervals - 1, -1, -1):
+            padded[:, max_action:max_action + levels + 1] = value
+            best = np.full((days, levels + 1), -np.inf)
+            best_action = np.zeros((days, levels + 1), dtype=np.int16)
+
+            for action in actions:
+                if action == 0:
+                    reward = np.zeros((days, 1))
+                elif action > 0:
+                    reward = np.where(valid[:, t], -charge_cost[:, t] * action, -np.inf)[:, None]
+                else:
+                    reward = np.where(valid[:, t], discharge_gain[:, t] * -action, -np.inf)[:, None]
+
+                candidate = reward + padded[:, max_action + action:max_action + action + levels + 1]
+                better = candidate > best
+                best = np.where(better, candidate, best)
+                best_action = np.where(better, action, best_action)
+
+            value = best
+            policy[t] = best_action
+
+        return {'policy': policy, 'levels': levels, 'level_mwh': level_mwh}
+
+    @staticmethod
+    def soc_to_level(plan: Dict, config, soc_pct):
+        fraction = (np.asarray(soc_pct, dtype=float) - config.min_soc) / (config.max_soc - config.min_soc)
+        return np.clip(np.round(fraction * plan['levels']), 0, plan['levels']).astype(int)
+
+    @staticmethod
+    def level_to_soc(plan: Dict, config, level):
+        return config.min_soc + np.asarray(level) / plan['levels'] * (config.max_soc - config.min_soc)
+
+    @classmethod
+    def evaluate(cls, prices: np.ndarray, config, interval_hours: float = 1.0, initial_soc=None) -> Dict[str, np.ndarray]:
+        """
+        Per-day performance arrays in the same shape as BESSBacktestService.evaluate
+        """
+        schedule = cls.optimize(prices, config, interval_hours=interval_hours, initial_soc=initial_soc)
+        return cls.performance(prices, schedule['energy_mwh'], config, interval_hours)
+
+    @staticmethod
+    def performance(prices: np.ndarray, energy_mwh: np.ndarray, config, interval_hours: float = 1.0) -> Dict[str, np.ndarray]:
+        filled = np.nan_to_num(np.atleast_2d(prices))
+        charge = np.clip(energy_mwh, 0, None)
+        drain = np.clip(-energy_mwh, 0, None)
+
+        cost = (charge * filled).sum(axis=1)
+        revenue = (drain * filled).sum(axis=1) * config.efficiency
+        charged = charge.sum(axis=1)
+        discharged = drain.sum(axis=1) * config.efficiency
+        usable_capacity = config.capacity_mwh * (config.max_soc - config.min_soc) / 100
+        safe_charged = np.where(charged > 0, charged, 1)
+        safe_discharged = np.where(discharged > 0, discharged, 1)
+
+        return {
+            'traded': discharged > 0,
+            'gross_profit_eur': revenue - cost,
+            'revenue_eur': revenue,
+            'cost_eur': cost,
+            'energy_charged_mwh': charged,
+            'energy_discharged_mwh': discharged,
+            'avg_charge_price': np.where(charged > 0, cost / safe_charged, 0),
+            'avg_discharge_price': np.where(discharged > 0, revenue / safe_discharged, 0),
+            'cycles_completed': discharged / usable_capacity if usable_capacity > 0 else np.zeros(len(cost)),
+            'charge_hours': (charge > 0).sum(axis=1) * interval_hours,
+            'discharge_hours': (drain > 0).sum(axis=1) * interval_hours,
+            'utilization_pct': discharged / config.capacity_mwh * 100 if config.capacity_mwh > 0 else np.zeros(len(cost)),
+        }
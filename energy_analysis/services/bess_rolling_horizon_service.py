@@ -0,0 +1,113 @@
+"""
+BESS Rolling Horizon Service - chained days with carried state of charge
+
+Single-day analysis starts every day at min_soc and ends wherever the schedule
+leaves it, so energy bought late in the evening can never be sold the next
+morning. This simulator runs the days in sequence instead:
+
+1. Each day is optimized over a look-ahead window (default 48h) starting
+   from the state of charge the previous day ended at
+2. Only the first 24 hours of that plan are executed, then the window rolls
+
+Prices for the whole range (plus the look-ahead tail) are loaded once with
+BESSBacktestService.load_price_matrix. The backward pass of every window is
+solved in a single vectorized call, because it doesn't depend on the starting
+SoC; only the cheap forward pass runs day by day.
+"""
+
+from datetime import timedelta
+from typing import Dict
+import logging
+import numpy as np
+from .bess_backtest_service import BESSBacktestService
+from .bess_dispatch_optimizer import BESSDispatchOptimizer
+
+logger = logging.getLogger(__name__)
+
+
+class BESSRollingHorizonService:
+
+    HOURS = BESSBacktestService.HOURS
+    MIN_LOOKAHEAD_HOURS = 24
+    MAX_LOOKAHEAD_HOURS = 168
+
+    @classmethod
+    def simulate(cls, region: str, start: str, end: str, config, lookahead_hours: int = 48, initial_soc=None) -> Dict:
+        """
+        Simulate [start, end] day by day with SoC carried across midnight.
+        Days without prices hold (their SoC is carried unchanged).
+        """
+        if not cls.MIN_LOOKAHEAD_HOURS <= lookahead_hours <= cls.MAX_LOOKAHEAD_HOURS:
+            raise ValueError(
+                f"lookahead_hours must be between {cls.MIN_LOOKAHEAD_HOURS} and {cls.MAX_LOOKAHEAD_HOURS}"
+            )
+        if initial_soc is None:
+            initial_soc = config.min_soc
+        if not config.min_soc <= initial_soc <= config.max_soc:
+            raise ValueError(f"initial_soc must be between {config.min_soc} and {config.max_soc}")
+
+        start_date, end_date = BESSBacktestService.parse_range(start, end)
+        days = (end_date - start_date).days + 1
+        extra_days = -(-(lookahead_hours - cls.HOURS) // cls.HOURS)
+
+        prices = cls._contiguous_prices(region, start_date, end_date + timedelta(days=extra_days))
+        flat = prices.reshape(-1)
+
+        # One look-ahead window per simulated day
+        window_index = np.arange(days)[:, None] * cls.HOURS + np.arange(lookahead_hours)[None, :]
+        plan = BESSDispatchOptimizer.solve(flat[window_index], config)
+
+        energy, soc = cls._roll(plan, config, days, initial_soc)
+
+        day_prices = prices[:days]
+        performance = BESSDispatchOptimizer.performance(day_prices, energy, config)
+        has_prices = ~np.isnan(day_prices).all(axis=1)
+
+        dates = [start_date + timedelta(days=i) for i in range(days)]
+        daily = BESSBacktestService._daily_rows(dates, performance)
+        for i, row in enumerate(daily):
+            row['soc_start'] = round(float(soc[i]), 1)
+            row['soc_end'] = round(float(soc[i + 1]), 1)
+
+        return {
+            'region': region,
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'config': config.to_dict(),
+            'lookahead_hours': lookahead_hours,
+            'initial_soc': initial_soc,
+            'final_soc': round(float(soc[-1]), 1),
+            'daily': daily,
+            'aggregate': BESSBacktestService._aggregate(
+                {field: values[has_prices] for field, values in performance.items()}, config
+            ),
+            'missing_dates': [d.isoformat() for d, present in zip(dates, has_prices) if not present],
+        }
+
+    @classmethod
+    def _contiguous_prices(cls, region: str, start_date, end_date) -> np.ndarray:
+        """prices[day, hour] for every calendar day in the window, NaN where missing"""
+        dates, matrix, _ = BESSBacktestService.load_price_matrix(region, start_date, end_date)
+
+        prices = np.full(((end_date - start_date).days + 1, cls.HOURS), np.nan)
+        if dates:
+            prices[[(d - start_date).days for d in dates]] = matrix
+        return prices
+
+    @classmethod
+    def _roll(cls, plan: Dict, config, days: int, initial_soc: float):
+        """Execute the first 24h of each day's plan, carrying the level forward"""
+        policy = plan['policy']
+        level = int(BESSDispatchOptimizer.soc_to_level(plan, config, initial_soc))
+
+        steps = np.zeros((days, cls.HOURS), dtype=int)
+        levels_at_midnight = np.zeros(days + 1, dtype=int)
+        levels_at_midnight[0] = level
+
+        for day in range(days):
+            for hour in range(cls.HOURS):
+                steps[day, hour] = policy[hour, day, level]
+                level += steps[day, hour]
+            levels_at_midnight[day + 1] = level
+
+        return steps * plan['level_mwh'], BESSDispatchOptimizer.level_to_soc(plan, config, levels_at_midnight)
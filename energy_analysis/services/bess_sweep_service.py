@@ -0,0 +1,117 @@
+"""
+BESS Sweep Service - profit surface over a grid of battery configurations
+
+Loads the price matrix once and evaluates every (power, duration, efficiency)
+combination against it with BESSBacktestService.evaluate. Large grids can be
+spread over a process pool; each worker receives the matrix once at startup.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Dict, List, Sequence
+import logging
+import numpy as np
+from ..models import BESSConfig
+from .bess_backtest_service import BESSBacktestService
+
+logger = logging.getLogger(__name__)
+
+# Price matrix held by each pool worker (set by _init_worker)
+_worker_prices = None
+
+
+def _init_worker(prices: np.ndarray):
+    global _worker_prices
+    _worker_prices = prices
+
+
+def _evaluate_in_worker(params: Dict) -> Dict:
+    return BESSSweepService.evaluate_config(_worker_prices, params)
+
+
+class BESSSweepService:
+
+    MAX_CONFIGS = 200
+
+    @classmethod
+    def sweep(
+        cls,
+        region: str,
+        start: str,
+        end: str,
+        power_values: Sequence[int],
+        duration_values: Sequence[int],
+        efficiency_values: Sequence[float],
+        workers: int = 1,
+    ) -> Dict:
+        """
+        Evaluate every combination over [start, end].
+        Raises ValueError for an empty/oversized grid or an invalid configuration.
+        """
+        grid = [
+            {'power_mw': power, 'duration_hours': duration, 'efficiency': efficiency}
+            for power, duration, efficiency in product(power_values, duration_values, efficiency_values)
+        ]
+        if not grid:
+            raise ValueError("Sweep needs at least one power, duration and efficiency value")
+        if len(grid) > cls.MAX_CONFIGS:
+            raise ValueError(f"Too many configurations ({len(grid)}) - max {cls.MAX_CONFIGS}")
+
+        # Validate up front so a bad value fails fast instead of inside a worker
+        for params in grid:
+            BESSConfig(**params)
+
+        start_date, end_date = BESSBacktestService.parse_range(start, end)
+        dates, prices, missing = BESSBacktestService.load_price_matrix(region, start_date, end_date)
+
+        if workers > 1 and len(grid) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(prices,)) as pool:
+                results = list(pool.map(_evaluate_in_worker, grid, chunksize=max(1, len(grid) // (workers * 4))))
+        else:
+            results = [cls.evaluate_config(prices, params) for params in grid]
+
+        return {
+            'region': region,
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'days_analyzed': len(dates),
+            'missing_dates': [d.isoformat() for d in missing],
+            'results': results,
+            'surface': cls._surface(results, power_values, duration_values, efficiency_values),
+            'best': max(results, key=lambda r: r['gross_profit_eur']),
+        }
+
+    @staticmethod
+    def evaluate_config(prices: np.ndarray, params: Dict) -> Dict:
+        config = BESSConfig(**params)
+        aggregate = BESSBacktestService._aggregate(BESSBacktestService.evaluate(prices, config), config)
+        return {
+            'power_mw': config.power_mw,
+            'duration_hours': config.duration_hours,
+            'efficiency': config.efficiency,
+            'capacity_mwh': config.capacity_mwh,
+            'gross_profit_eur': aggregate['gross_profit_eur'],
+            'profit_per_mw_eur': aggregate['profit_per_mw_eur'],
+            'cycles_completed': aggregate['cycles_completed'],
+            'avg_utilization_pct': aggregate['avg_utilization_pct'],
+            'days_traded': aggregate['days_traded'],
+        }
+
+    @staticmethod
+    def _surface(results: List[Dict], power_values, duration_values, efficiency_values) -> List[Dict]:
+        """
+        Profit surface per efficiency: gross_profit_eur[duration_index][power_index]
+        """
+        lookup = {(r['power_mw'], r['duration_hours'], r['efficiency']): r['gross_profit_eur'] for r in results}
+        return [
+            {
+                'efficiency': efficiency,
+                'power_mw': list(power_values),
+                'duration_hours': list(duration_values),
+                'gross_profit_eur': [
+                    [lookup[(power, duration, efficiency)] for power in power_values]
+                    for duration in duration_values
+                ],
+            }
+            for efficiency in efficiency_values
+        ]
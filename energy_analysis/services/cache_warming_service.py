@@ -0,0 +1,178 @@
+# services/cache_warming_service.py
+"""
+Prefetching of the days a user is likely to open next.
+
+- schedule_adjacent: after chart_data / curtailment_data serves a date, queue
+  low-priority FetchJobs for the neighbouring days of the same region (needs
+  ENERGY_PREFETCH_ADJACENT and a running process_fetch_jobs worker).
+- build_day: build and store the summaries for one region/day inline; used by
+  the nightly warm_energy_cache command (see default_day).
+"""
+from datetime import date, timedelta
+from typing import Dict, List
+from django.conf import settings
+from django.core.cache import cache
+import logging
+from ..models import FetchJob
+from .fetch_job_service import FetchJobService
+from .region_service import RegionService
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+from .summary_repository import SummaryRepository
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmingService:
+
+    KINDS = ('chart_data', 'curtailment_data')
+    SCHEDULED_PREFIX = 'prefetch_scheduled'
+
+    # =========================================================================
+    # Adjacent-day prefetch
+    # =========================================================================
+
+    @classmethod
+    def schedule_adjacent(cls, kind: str, region: str, date_str: str) -> List[FetchJob]:
+        """
+        Queue prefetch jobs for the days around date_str. Best effort: never
+        raises, and a given day is only inspected once per
+        ENERGY_PREFETCH_SCHEDULE_TTL (one cache hit on repeat views).
+        """
+        if not getattr(settings, 'ENERGY_PREFETCH_ADJACENT', False):
+            return []
+        if kind not in cls.KINDS or region not in RegionService.SUPPORTED_REGIONS:
+            return []
+
+        try:
+            served = date.fromisoformat(date_str)
+        except ValueError:
+            return []
+
+        marker = f"{cls.SCHEDULED_PREFIX}:{kind}:{region}:{date_str}"
+        if not cache.add(marker, True, getattr(settings, 'ENERGY_PREFETCH_SCHEDULE_TTL', 60 * 60)):
+            return []
+
+        jobs = []
+        try:
+            for day in cls.adjacent_days(served):
+                params = {'region': region, 'date': day.isoformat()}
+                if FetchJobService.is_cold(kind, params):
+                    jobs.append(FetchJobService.enqueue(kind, params, priority=FetchJobService.PREFETCH_PRIORITY))
+        except Exception as e:
+            logger.warning(f"Prefetch scheduling failed for {kind} {region} {date_str}: {e}")
+
+        if jobs:
+            logger.info(f"Queued {len(jobs)} prefetch jobs around {region} {date_str} ({kind})")
+        return jobs
+
+    @staticmethod
+    def adjacent_days(served: date) -> List[date]:
+        """Nearest first, both directions, never past today"""
+        radius = getattr(settings, 'ENERGY_PREFETCH_RADIUS', 1)
+        today = date.today()
+        days = []
+        for offset in range(1, radius + 1):
+            for day in (served + timedelta(days=offset), served - timedelta(days=offset)):
+                if day <= today:
+                    days.append(day)
+        return days
+
+    # =========================================================================
+    # Nightly build
+    # =========================================================================
+
+    @staticmethod
+    def default_day(region: str) -> date:
+        """
+        Latest day the nightly run should build. CAISO keeps revising
+        yesterday (and on a UTC server it may not even be over in Pacific
+        time), so California stops at the day before - the first day
+        ResponseCache.is_historical lets us persist.
+        """
+        if region == 'california':
+            return date.today() - timedelta(days=2)
+        return date.today() - timedelta(days=1)
+
+    @classmethod
+    def build_day(cls, region: str, day: date) -> Dict[str, str]:
+        """
+        Make sure the energy and curtailment summaries for region/day exist.
+        Returns {'energy': status, 'curtailment': status} with status one of
+        'exists', 'created', 'no_data', 'not_settled' or 'failed'.
+        """
+        if region == 'california' and not ResponseCache.is_historical(day.isoformat()):
+            # Same rule as RegionService._persist_or_hold: recent CAISO days are never stored
+            return {'energy': 'not_settled', 'curtailment': 'not_settled'}
+
+        if region == 'california':
+            builders = {'energy': cls._build_caiso_energy, 'curtailment': cls._build_caiso_curtailment}
+        else:
+            builders = {'energy': cls._build_spain_energy, 'curtailment': cls._build_spain_curtailment}
+
+        results = {}
+        for kind, build in builders.items():
+            try:
+                results[kind] = 'created' if build(day) else 'exists'
+            except ValueError as e:
+                logger.info(f"No {kind} data for {region} {day}: {e}")
+                results[kind] = 'no_data'
+            except Exception as e:
+                logger.error(f"Warming {kind} for {region} {day} failed: {e}")
+                results[kind] = 'failed'
+        return results
+
+    @staticmethod
+    def _build_spain_energy(day: date) -> bool:
+        from .daily_summary_service import DailySummaryService
+        _, created = DailySummaryService.get_or_create_summary(day.isoformat(), projection=SummaryRepository.METRICS)
+        return created
+
+    @staticmethod
+    def _build_spain_curtailment(day: date) -> bool:
+        from .daily_curtailment_service import DailyCurtailmentService
+        _, created = DailyCurtailmentService.get_or_create_summary(
+            day.isoformat(), projection=SummaryRepository.METRICS
+        )
+        return created
+
+    @staticmethod
+    def _build_caiso_energy(day: date) -> bool:
+        """Settled days only (build_day checks) - same persistence rule as on-demand requests"""
+        from .daily_summary_service import DailySummaryService
+        from .gridstatus_service import GridStatusService
+
+        def create():
+            data = GridStatusService('caiso').fetch_day_data(day.isoformat())
+            if data is None:
+                raise ValueError(f"No CAISO data available for {day}")
+            summary = DailySummaryService.build_caiso_summary(day, data)
+            summary.save()
+            return summary
+
+        _, created = SingleFlight.get_or_create(
+            f"energy_summary:california:{day}",
+            lambda: SummaryRepository.get(SummaryRepository.ENERGY, day, ['caiso'], SummaryRepository.METRICS),
+            create,
+        )
+        return created
+
+    @staticmethod
+    def _build_caiso_curtailment(day: date) -> bool:
+        from .daily_curtailment_service import DailyCurtailmentService
+        from .gridstatus_service import GridStatusService
+
+        def create():
+            data = GridStatusService('caiso').fetch_curtailment_data(day.isoformat())
+            if data is None:
+                raise ValueError(f"No CAISO curtailment data available for {day}")
+            summary = DailyCurtailmentService.build_caiso_summary(day, data)
+            summary.save()
+            return summary
+
+        _, created = SingleFlight.get_or_create(
+            f"curtailment_summary:california:{day}",
+            lambda: SummaryRepository.get(SummaryRepository.CURTAILMENT, day, ['caiso'], SummaryRepository.METRICS),
+            create,
+        )
+        return created
@@ -0,0 +1,132 @@
+# services/chart_range_service.py
+"""
+Multi-day chart data in one request.
+
+Loads every DailyEnergySummary in the window with a single query and returns a
+columnar payload (one array per metric over a shared time axis) at hour, day or
+week resolution. Only stored days are served: cold days are reported in
+missing_dates (and optionally queued as prefetch FetchJobs), never fetched
+inline, so a cold range can't hold a worker on dozens of upstream calls.
+"""
+from datetime import date, timedelta
+from typing import Dict, List
+import logging
+import numpy as np
+import pandas as pd
+from .hourly_store import HourlyStore
+
+logger = logging.getLogger(__name__)
+
+
+class ChartRangeService:
+
+    MAX_RANGE_DAYS = 366
+    MAX_QUEUE_PER_REQUEST = 31  # cold days queued per request, the rest are only reported missing
+    RESOLUTIONS = ('hour', 'day', 'week')
+    SERIES_FIELDS = ['demand', 'solar', 'wind', 'vre_total', 'net_load', 'vre_pct', 'price']
+
+    @classmethod
+    def get_range(cls, region: str, start: str, end: str, resolution: str = 'hour',
+                  queue_missing: bool = False) -> Dict:
+        from .region_service import RegionService
+
+        if region not in RegionService.SUPPORTED_REGIONS:
+            raise ValueError(f"Unsupported region: {region}")
+        if resolution not in cls.RESOLUTIONS:
+            raise ValueError(f"Resolution must be one of {', '.join(cls.RESOLUTIONS)}")
+
+        try:
+            start_date = date.fromisoformat(start)
+            end_date = date.fromisoformat(end)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid date range: {start} to {end}")
+
+        if end_date < start_date:
+            raise ValueError("End date must not be before start date")
+        if (end_date - start_date).days + 1 > cls.MAX_RANGE_DAYS:
+            raise ValueError(f"Range too long - max {cls.MAX_RANGE_DAYS} days")
+
+        # Nothing past today can be stored yet
+        end_date = min(end_date, date.today())
+        if end_date < start_date:
+            raise ValueError("Start date must not be in the future")
+
+        sources = RegionService.REGION_SOURCES[region]
+        hourly_by_date = cls._load_hourly(sources, start_date, end_date)
+
+        all_dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        missing = [d for d in all_dates if d not in hourly_by_date]
+        queued = cls._queue_missing(region, missing) if queue_missing else []
+
+        frame = cls._to_frame(hourly_by_date)
+        axis, series = cls._resample(frame, resolution)
+
+        return {
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'resolution': resolution,
+            'axis': axis,
+            'series': series,
+            'days_loaded': len(hourly_by_date),
+            'missing_dates': [d.isoformat() for d in missing],
+            'queued_dates': [d.isoformat() for d in queued],
+        }
+
+    @classmethod
+    def _load_hourly(cls, sources: List[str], start_date: date, end_date: date) -> Dict[date, list]:
+        """One query for the whole window (two with the table hourly backend)"""
+        hourly_by_date = HourlyStore.hourly_for_range(HourlyStore.ENERGY, sources, start_date, end_date)
+        return {day: hourly_data for day, hourly_data in hourly_by_date.items() if hourly_data}
+
+    @classmethod
+    def _queue_missing(cls, region: str, dates: List[date]) -> List[date]:
+        """Low-priority fetch jobs for cold days; the range itself never goes upstream"""
+        from .fetch_job_service import FetchJobService
+
+        queued = []
+        for day in dates[:cls.MAX_QUEUE_PER_REQUEST]:
+            try:
+                FetchJobService.enqueue(
+                    'chart_data', {'region': region, 'date': day.isoformat()},
+                    priority=FetchJobService.PREFETCH_PRIORITY,
+                )
+            except Exception as e:
+                logger.warning(f"Queueing range fetch failed for {region} {day}: {e}")
+                continue
+            queued.append(day)
+        return queued
+
+    @classmethod
+    def _to_frame(cls, hourly_by_date: Dict[date, list]) -> pd.DataFrame:
+        """Flatten {date: [hour dicts]} into one frame indexed by timestamp"""
+        records = [
+            {'timestamp': f"{day.isoformat()}T{hour['hour']}", **hour}
+            for day in sorted(hourly_by_date)
+            for hour in hourly_by_date[day]
+        ]
+        if not records:
+            return pd.DataFrame(columns=cls.SERIES_FIELDS, index=pd.DatetimeIndex([], name='timestamp'))
+
+        frame = pd.DataFrame.from_records(records)
+        frame.index = pd.to_datetime(frame.pop('timestamp'))
+        return frame.reindex(columns=cls.SERIES_FIELDS).astype(float)
+
+    @classmethod
+    def _resample(cls, frame: pd.DataFrame, resolution: str):
+        """Mean per bucket; returns (axis labels, {field: values})"""
+        if resolution == 'day':
+            frame = frame.groupby(frame.index.normalize()).mean()
+            axis = frame.index.strftime('%Y-%m-%d')
+        elif resolution == 'week':
+            # Weeks start on Monday
+            week_start = (frame.index.normalize() - pd.to_timedelta(frame.index.weekday, unit='D'))
+            frame = frame.groupby(week_start).mean()
+            axis = frame.index.strftime('%Y-%m-%d')
+        else:
+            axis = frame.index.strftime('%Y-%m-%dT%H:%M')
+
+        series = {
+            field: [None if np.isnan(v) else round(float(v), 2) for v in frame[field].to_numpy()]
+            for field in cls.SERIES_FIELDS
+        }
+        return list(axis), series
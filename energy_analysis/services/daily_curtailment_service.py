@@ -1,7 +1,14 @@
 from datetime import datetime, date
-from django.db.models import Sum
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
 import logging
 from ..models import DailyCurtailmentSummary, MonthlyCurtailmentSummary, EnergyData
+from .hourly_store import HourlyStore
+from .single_flight import SingleFlight
+from .summary_repository import SummaryRepository
+from ..utils.time_ranges import TimeRange
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +20,10 @@ class DailyCurtailmentService:
     SPOT_PRICE   = 600  # EUR/MWh
 
     @classmethod
-    def get_or_create_summary(cls, date_str):
+    def get_or_create_summary(cls, date_str, projection=SummaryRepository.FULL):
         """
         Main entry point - mirrors DailySummaryService pattern.
+        projection: columns to load for an existing summary (see SummaryRepository)
         Returns (DailyCurtailmentSummary, created: bool)
         """
         try:
@@ -23,32 +31,53 @@ class DailyCurtailmentService:
         except ValueError:
             raise ValueError(f"Invalid date format: {date_str}")
 
-        try:
-            summary = DailyCurtailmentSummary.objects.get(
-                date=date_obj, 
-                data_source__in=['database', 'esios']
-            )
-            return summary, False
-        except DailyCurtailmentSummary.DoesNotExist:
-            summary = cls._create_summary(date_obj)
-            return summary, True
+        def lookup():
+            return SummaryRepository.get(SummaryRepository.CURTAILMENT, date_obj, ['database', 'esios'], projection)
+
+        return SingleFlight.get_or_create(
+            f"curtailment_summary:spain:{date_obj}", lookup, lambda: cls._create_summary(date_obj)
+        )
 
     @classmethod
     def _create_summary(cls, date_obj):
         hourly_data = cls._build_hourly_data(date_obj)
         metrics     = cls._calculate_metrics(hourly_data)
 
-        summary = DailyCurtailmentSummary.objects.create(
-            date=date_obj,
-            data_source='database',
-            hourly_data_json={'hourly_data': hourly_data},
-            **metrics
-        )
+        with transaction.atomic():
+            summary = DailyCurtailmentSummary.objects.create(
+                date=date_obj,
+                data_source='database',
+                hourly_data_json=HourlyStore.pack(
+                    HourlyStore.CURTAILMENT, date_obj, 'database', {'hourly_data': hourly_data}
+                ),
+                **metrics
+            )
         logger.info(f"Created curtailment summary for {date_obj}: "
                     f"{metrics['total_curtailed_mwh']:.1f} MWh, "
                     f"€{metrics['estimated_revenue_lost_eur']:.0f} lost")
         return summary
 
+    @classmethod
+    def build_caiso_summary(cls, date_obj, data):
+        """
+        Build an unsaved CAISO DailyCurtailmentSummary from
+        GridStatusService.fetch_curtailment_data output.
+        """
+        insights = data['daily_insights']
+
+        return DailyCurtailmentSummary(
+            date=date_obj,
+            data_source='caiso',
+            hourly_data_json=HourlyStore.pack(HourlyStore.CURTAILMENT, date_obj, 'caiso', {
+                'hourly_data': data['hourly_data'],
+                'curtailment_breakdown': data.get('curtailment_breakdown', {})
+            }),
+            total_curtailed_mwh=insights['total_curtailed_mwh'],
+            estimated_revenue_lost_eur=insights['estimated_revenue_lost_usd'],  # Store USD in EUR field
+            peak_curtailment_mwh=insights['peak_curtailment_mwh'],
+            peak_curtailment_hour=datetime.strptime(insights['peak_curtailment_hour'], '%H:%M').time(),
+        )
+
     @classmethod
     def _build_hourly_data(cls, date_obj):
         """
@@ -56,25 +85,21 @@ class DailyCurtailmentService:
         Missing hours in EnergyData = zero curtailment that hour.
         """
         # Pull all three indicators for the day in one query
-        raw = EnergyData.objects.filter(
-            timestamp__date=date_obj,
-            indicator__indicator_id__in=[cls.CURTAIL_DOWN, cls.REDISPATCH_UP, cls.SPOT_PRICE]
-        ).select_related('indicator')
+        raw = cls._day_rows(date_obj)
 
         # Bucket into dicts keyed by hour integer (0-23)
         redispatch_up = {}  # 720 - stored for future congestion analysis
         down          = {}  # 721 - actual curtailment
         price         = {}  # 600
 
-        for row in raw:
-            h   = row.timestamp.hour
-            ind = row.indicator.indicator_id
+        for timestamp, ind, value in raw:
+            h = timestamp.hour
             if ind == cls.REDISPATCH_UP:
-                redispatch_up[h] = row.value
+                redispatch_up[h] = value
             elif ind == cls.CURTAIL_DOWN:
-                down[h] = row.value
+                down[h] = value
             elif ind == cls.SPOT_PRICE:
-                price[h] = row.value
+                price[h] = value
 
         hourly_data = []
         for h in range(24):
@@ -92,6 +117,17 @@ class DailyCurtailmentService:
 
         return hourly_data
 
+    @classmethod
+    def _day_rows(cls, date_obj):
+        """(timestamp, indicator_id, value) for 720/721/600 on one day - index range scan"""
+        start, end = TimeRange.day(date_obj)
+        return EnergyData.objects.filter(
+            indicator_id__in=[cls.CURTAIL_DOWN, cls.REDISPATCH_UP, cls.SPOT_PRICE],
+            resolution='hour',
+            timestamp__gte=start,
+            timestamp__lt=end
+        ).order_by('timestamp').values_list('timestamp', 'indicator_id', 'value')
+
     @classmethod
     def _calculate_metrics(cls, hourly_data):
         """Derive summary fields from hourly array."""
@@ -111,64 +147,260 @@ class DailyCurtailmentService:
 
 class MonthlyCurtailmentService:
 
+    # ESIOS monthly percentage indicators exist for Spain only
+    PCT_INDICATORS = {
+        'total_curtailment_pct':        10462,
+        'transmission_curtailment_pct': 10458,
+        'distribution_curtailment_pct': 10459,
+    }
+
+    CACHE_PREFIX = 'curtailment_monthly'
+    CACHE_TIMEOUT = 60 * 60
+
+    # Monthly rows store unrounded sums; values are rounded only when served
+    PAYLOAD_ROUNDING = {
+        'total_curtailed_mwh': 1,
+        'total_revenue_lost_eur': 2,
+        'avg_daily_curtailed_mwh': 1,
+    }
+
+    MONTHLY_FIELDS = [
+        'year', 'month', 'total_curtailed_mwh', 'total_revenue_lost_eur', 'avg_daily_curtailed_mwh',
+        'days_with_curtailment', 'worst_day', 'worst_day_mwh', 'total_curtailment_pct',
+        'transmission_curtailment_pct', 'distribution_curtailment_pct',
+    ]
+
+    @staticmethod
+    def _sources(region):
+        from .region_service import RegionService
+        return RegionService.REGION_SOURCES[region]
+
     @classmethod
-    def build_month(cls, year, month):
+    def build_month(cls, year, month, region='spain'):
         """
-        Aggregate daily summaries into a MonthlyCurtailmentSummary.
-        Call this after all daily summaries for the month are created.
+        Aggregate the month's daily summaries for a region into a
+        MonthlyCurtailmentSummary - one SQL aggregate plus a one-row
+        lookup for the worst day.
         """
+        first_day = date(year, month, 1)
+        next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+
         dailies = DailyCurtailmentSummary.objects.filter(
-            date__year=year,
-            date__month=month
+            data_source__in=cls._sources(region),
+            date__gte=first_day,
+            date__lt=next_month
+        )
+        totals = dailies.aggregate(
+            days=Count('id'),
+            total_mwh=Sum('total_curtailed_mwh'),
+            total_revenue=Sum('estimated_revenue_lost_eur'),
+            days_with=Count('id', filter=Q(total_curtailed_mwh__gt=0)),
         )
 
-        if not dailies.exists():
-            logger.warning(f"No daily curtailment data for {year}-{month:02d}")
+        if not totals['days']:
+            logger.warning(f"No daily curtailment data for {region} {year}-{month:02d}")
+            # The month's last day may just have been deleted
+            MonthlyCurtailmentSummary.objects.filter(region=region, year=year, month=month).delete()
             return None
 
-        total_mwh     = sum(d.total_curtailed_mwh        for d in dailies)
-        total_revenue = sum(d.estimated_revenue_lost_eur for d in dailies)
-        days_with     = dailies.filter(total_curtailed_mwh__gt=0).count()
-        worst         = max(dailies, key=lambda d: d.total_curtailed_mwh)
-
-        # Pull monthly percentage indicators from EnergyData
-        pct_10462 = cls._get_monthly_pct(year, month, 10462)
-        pct_10458 = cls._get_monthly_pct(year, month, 10458)
-        pct_10459 = cls._get_monthly_pct(year, month, 10459)
+        worst = dailies.order_by('-total_curtailed_mwh', '-date').values('date', 'total_curtailed_mwh').first()
 
         summary, _ = MonthlyCurtailmentSummary.objects.update_or_create(
+            region=region,
             year=year,
             month=month,
             defaults={
-                'total_curtailed_mwh':        round(total_mwh, 1),
-                'total_revenue_lost_eur':      round(total_revenue, 2),
-                'avg_daily_curtailed_mwh':     round(total_mwh / dailies.count(), 1),
-                'days_with_curtailment':       days_with,
-                'worst_day':                   worst.date,
-                'worst_day_mwh':               worst.total_curtailed_mwh,
-                'total_curtailment_pct':       pct_10462,
-                'transmission_curtailment_pct': pct_10458,
-                'distribution_curtailment_pct': pct_10459,
+                'total_curtailed_mwh':        totals['total_mwh'],
+                'total_revenue_lost_eur':      totals['total_revenue'],
+                'avg_daily_curtailed_mwh':     totals['total_mwh'] / totals['days'],
+                'days_count':                  totals['days'],
+                'days_with_curtailment':       totals['days_with'],
+                'worst_day':                   worst['date'],
+                'worst_day_mwh':               worst['total_curtailed_mwh'],
+                **cls._monthly_pcts(year, month, region),
             }
         )
         return summary
 
+    @classmethod
+    def apply_day(cls, daily):
+        """
+        Add a newly inserted DailyCurtailmentSummary to its month in place
+        (delta apply) instead of re-aggregating the month.
+        """
+        from .region_service import RegionService
+
+        region = RegionService.region_for_source(daily.data_source)
+        year, month = daily.date.year, daily.date.month
+
+        with transaction.atomic():
+            # get_or_create, not filter().first(): the first two days of a new
+            # month arriving together must not both try to insert the row
+            monthly, created = MonthlyCurtailmentSummary.objects.select_for_update().get_or_create(
+                region=region,
+                year=year,
+                month=month,
+                defaults={
+                    'total_curtailed_mwh':     daily.total_curtailed_mwh,
+                    'total_revenue_lost_eur':  daily.estimated_revenue_lost_eur,
+                    'avg_daily_curtailed_mwh': daily.total_curtailed_mwh,
+                    'days_count':              1,
+                    'days_with_curtailment':   1 if daily.total_curtailed_mwh > 0 else 0,
+                    'worst_day':               daily.date,
+                    'worst_day_mwh':           daily.total_curtailed_mwh,
+                }
+            )
+
+            if created:
+                # ESIOS percentages are looked up once, when the month appears
+                for field, value in cls._monthly_pcts(year, month, region).items():
+                    setattr(monthly, field, value)
+                monthly.save(update_fields=list(cls.PCT_INDICATORS))
+            else:
+                # Unrounded running sums (see PAYLOAD_ROUNDING) so deltas match build_month
+                monthly.total_curtailed_mwh += daily.total_curtailed_mwh
+                monthly.total_revenue_lost_eur += daily.estimated_revenue_lost_eur
+                monthly.days_count += 1
+                monthly.avg_daily_curtailed_mwh = monthly.total_curtailed_mwh / monthly.days_count
+                if daily.total_curtailed_mwh > 0:
+                    monthly.days_with_curtailment += 1
+                if cls._is_worse_day(daily.total_curtailed_mwh, daily.date, monthly.worst_day_mwh, monthly.worst_day):
+                    monthly.worst_day = daily.date
+                    monthly.worst_day_mwh = daily.total_curtailed_mwh
+                monthly.save()
+
+    @staticmethod
+    def _is_worse_day(mwh, day, worst_mwh, worst_day):
+        """Same order as build_month's worst-day query: most curtailed, then latest date"""
+        return (mwh, day) > (worst_mwh, worst_day)
+
+    @classmethod
+    def dirty_months(cls, region='spain', years=None):
+        """
+        (year, month) whose monthly row is missing or older than its newest
+        daily row, or whose day count no longer matches. Two queries.
+        """
+        dailies = DailyCurtailmentSummary.objects.filter(data_source__in=cls._sources(region))
+        monthlies = MonthlyCurtailmentSummary.objects.filter(region=region)
+        if years:
+            dailies = dailies.filter(date__gte=date(min(years), 1, 1), date__lt=date(max(years) + 1, 1, 1))
+            monthlies = monthlies.filter(year__in=list(years))
+
+        daily_state = dailies.annotate(
+            year=ExtractYear('date'), month=ExtractMonth('date')
+        ).values('year', 'month').annotate(
+            latest=Max('updated_at'), days=Count('id')
+        ).order_by('year', 'month')
+
+        built = {
+            (m['year'], m['month']): m
+            for m in monthlies.values('year', 'month', 'updated_at', 'days_count')
+        }
+
+        dirty = []
+        for row in daily_state:
+            if years and row['year'] not in years:
+                continue
+            monthly = built.get((row['year'], row['month']))
+            if monthly is None or row['latest'] > monthly['updated_at'] or row['days'] != monthly['days_count']:
+                dirty.append((row['year'], row['month']))
+        return dirty
+
+    # =========================================================================
+    # Cached read for the curtailment_monthly endpoint
+    # =========================================================================
+
+    @classmethod
+    def get_monthly_payload(cls, region='spain', start_year=None, end_year=None):
+        """
+        Monthly rows plus SQL-summed annual totals, cached per data version.
+        The version comes from the monthly table itself (row count + newest
+        updated_at), so writes from any process - other web workers, the
+        fetch-job worker, loader/backfill commands - change the key; the
+        cache may be per-process. CACHE_TIMEOUT bounds what's left behind.
+        """
+        key = f"{cls.CACHE_PREFIX}:{cls._data_version(region)}:{region}:{start_year}:{end_year}"
+
+        payload = cache.get(key)
+        if payload is None:
+            payload = cls._build_monthly_payload(region, start_year, end_year)
+            cache.set(key, payload, cls.CACHE_TIMEOUT)
+        return payload
+
+    @staticmethod
+    def _data_version(region):
+        """One aggregate over the region's monthly rows (a few hundred at most)"""
+        state = MonthlyCurtailmentSummary.objects.filter(region=region).aggregate(
+            rows=Count('id'), latest=Max('updated_at')
+        )
+        latest = state['latest'].timestamp() if state['latest'] else 0
+        return f"{state['rows']}-{latest}"
+
+    @classmethod
+    def _build_monthly_payload(cls, region, start_year, end_year):
+        months = MonthlyCurtailmentSummary.objects.filter(region=region)
+        if start_year is not None:
+            months = months.filter(year__gte=start_year)
+        if end_year is not None:
+            months = months.filter(year__lte=end_year)
+
+        data = []
+        for m in months.order_by('year', 'month').values(*cls.MONTHLY_FIELDS):
+            m['label'] = f"{m['year']}-{m['month']:02d}"
+            m['worst_day'] = m['worst_day'].isoformat()
+            for field, digits in cls.PAYLOAD_ROUNDING.items():
+                m[field] = round(m[field], digits)
+            data.append(m)
+
+        # Annual totals for the headline stat cards
+        annual = {
+            row['year']: {
+                'total_curtailed_mwh':    round(row['total_curtailed_mwh'], 1),
+                'total_revenue_lost_eur': round(row['total_revenue_lost_eur'], 2),
+            }
+            for row in months.order_by('year').values('year').annotate(
+                total_curtailed_mwh=Sum('total_curtailed_mwh'),
+                total_revenue_lost_eur=Sum('total_revenue_lost_eur'),
+            )
+        }
+
+        return {
+            'region': region,
+            'monthly_data': data,
+            'annual_totals': annual,
+        }
+
+    @classmethod
+    def _monthly_pcts(cls, year, month, region):
+        if region != 'spain':
+            return {field: None for field in cls.PCT_INDICATORS}
+        return {field: cls._get_monthly_pct(year, month, indicator_id) for field, indicator_id in cls.PCT_INDICATORS.items()}
+
     @classmethod
     def _get_monthly_pct(cls, year, month, indicator_id):
         """Fetch the single monthly percentage value for a given indicator."""
+        start, end = TimeRange.month(year, month)
         row = EnergyData.objects.filter(
-            indicator__indicator_id=indicator_id,
-            timestamp__year=year,
-            timestamp__month=month
+            indicator_id=indicator_id,
+            timestamp__gte=start,
+            timestamp__lt=end
         ).first()
         return round(row.value, 4) if row else None
 
     @classmethod
-    def build_all(cls, years=(2024, 2025)):
-        """Convenience method to roll up all months for given years."""
-        for year in years:
-            for month in range(1, 13):
-                result = cls.build_month(year, month)
+    def build_all(cls, years=None, region=None):
+        """
+        Rebuild every dirty month (see dirty_months) for one region or all.
+        Returns the list of (region, year, month) rebuilt.
+        """
+        from .region_service import RegionService
+
+        rebuilt = []
+        for reg in [region] if region else RegionService.SUPPORTED_REGIONS:
+            for year, month in cls.dirty_months(reg, years):
+                result = cls.build_month(year, month, reg)
                 if result:
-                    logger.info(f"Built monthly summary {year}-{month:02d}: "
-                                f"{result.total_curtailed_mwh:.1f} MWh")
\ No newline at end of file
+                    rebuilt.append((reg, year, month))
+                    logger.info(f"Built monthly summary {reg} {year}-{month:02d}: "
+                                f"{result.total_curtailed_mwh:.1f} MWh")
+        return rebuilt
@@ -1,9 +1,14 @@
 from datetime import datetime, timedelta
+from django.db import transaction
 from django.db.models import Q
 import logging
 from ..models import DailyEnergySummary, EnergyData
 from ..services.esios_service import EsiosService
+from ..services.hourly_store import HourlyStore
+from ..services.single_flight import SingleFlight
+from ..services.summary_repository import SummaryRepository
 from ..utils.energy_calculations import EnergyMetricsCalculator
+from ..utils.time_ranges import TimeRange
 
 logger = logging.getLogger(__name__)
 
@@ -14,29 +19,42 @@ class DailySummaryService:
     Handles both 2024 database data and ESIOS API data
     """
     
+    # Solar, Wind, Demand, Price
+    DATABASE_INDICATORS = [1161, 1159, 1293, 600]
+    
+    METRIC_FIELDS = [
+        'peak_vre_penetration', 'peak_vre_hour', 'sustained_high_vre_hours',
+        'max_netload_ramp_gw', 'ramp_window_start', 'ramp_window_end',
+        'load_balancing_gap_hours', 'peak_demand_hour', 'shiftable_energy_gwh',
+        'flexibility_window_start', 'flexibility_window_end',
+    ]
+    
     @classmethod
-    def get_or_create_summary(cls, date_str):
+    def get_or_create_summary(cls, date_str, projection=SummaryRepository.FULL):
         """
         Main entry point - get existing summary or create new one
+        projection: columns to load for an existing summary (see SummaryRepository)
         Returns: (DailyEnergySummary instance, created: bool)
+        
+        Concurrent cold requests are coalesced by SingleFlight. Off PostgreSQL that is
+        a cache lease, so with the default LocMem cache only callers in the same
+        process wait for each other; other workers may still fetch the same date.
         """
         try:
             date_obj = datetime.fromisoformat(date_str).date()
         except ValueError:
             raise ValueError(f"Invalid date format: {date_str}")
         
-        # Try to get existing summary - filter by Spain sources only
-        try:
-            summary = DailyEnergySummary.objects.get(
-                date=date_obj, 
-                data_source__in=['database', 'esios']
-            )
-            return summary, False
-        except DailyEnergySummary.DoesNotExist:
-            # Create new summary
+        # Existing summary - filter by Spain sources only
+        def lookup():
+            return SummaryRepository.get(SummaryRepository.ENERGY, date_obj, ['database', 'esios'], projection)
+
+        def create():
             logger.info(f"Creating new DailyEnergySummary for {date_obj}")
-            summary = cls._create_new_summary(date_obj)
-            return summary, True
+            return cls._create_new_summary(date_obj)
+
+        # Concurrent cold requests for the same date share one upstream fetch
+        return SingleFlight.get_or_create(f"energy_summary:spain:{date_obj}", lookup, create)
     
     @classmethod
     def _create_new_summary(cls, date_obj):
@@ -49,28 +67,28 @@ class DailySummaryService:
     @classmethod
     def _create_from_database(cls, date_obj):
         """Create summary from 2024 database data"""
-        # Get hourly data for the three main indicators
-        energy_data = EnergyData.objects.filter(
-            timestamp__date=date_obj,
-            indicator__indicator_id__in=[1161, 1159, 1293, 600]  # Solar, Wind, Demand
-        ).select_related('indicator').order_by('timestamp')
+        # Get hourly data for the main indicators
+        rows = list(cls._database_rows(*TimeRange.day(date_obj)))
         
-        if not energy_data.exists():
+        if not rows:
             raise ValueError(f"No energy data found for {date_obj}")
         
         # Transform to hourly format
-        hourly_data = cls._transform_db_to_hourly(energy_data)
+        hourly_data = cls._hourly_from_rows(rows)
         
         # Calculate all metrics
         metrics = EnergyMetricsCalculator.calculate_all_metrics(hourly_data)
         
         # Create and save summary
-        summary = DailyEnergySummary.objects.create(
-            date=date_obj,
-            data_source='database',
-            hourly_data_json={'hourly_data': hourly_data},
-            **metrics
-        )
+        with transaction.atomic():
+            summary = DailyEnergySummary.objects.create(
+                date=date_obj,
+                data_source='database',
+                hourly_data_json=HourlyStore.pack(
+                    HourlyStore.ENERGY, date_obj, 'database', {'hourly_data': hourly_data}
+                ),
+                **metrics
+            )
         
         logger.info(f"Created DB summary for {date_obj}: Peak VRE {metrics['peak_vre_penetration']}%")
         return summary
@@ -95,12 +113,14 @@ class DailySummaryService:
             metrics = EnergyMetricsCalculator.calculate_all_metrics(hourly_data)
             
             # Create and save summary
-            summary = DailyEnergySummary.objects.create(
-                date=date_obj,
-                data_source='esios',
-                hourly_data_json=esios_response,  # Store full ESIOS response
-                **metrics
-            )
+            with transaction.atomic():
+                summary = DailyEnergySummary.objects.create(
+                    date=date_obj,
+                    data_source='esios',
+                    # Store full ESIOS response
+                    hourly_data_json=HourlyStore.pack(HourlyStore.ENERGY, date_obj, 'esios', esios_response),
+                    **metrics
+                )
             
             logger.info(f"Created ESIOS summary for {date_obj}: Peak VRE {metrics['peak_vre_penetration']}%")
             return summary
@@ -109,14 +129,69 @@ class DailySummaryService:
             logger.error(f"Failed to create ESIOS summary for {date_obj}: {e}")
             raise
     
+    @classmethod
+    def build_caiso_summary(cls, date_obj, data):
+        """
+        Build an unsaved CAISO DailyEnergySummary from GridStatusService.fetch_day_data output.
+        Metrics are mapped from the service's daily_insights. With the table
+        hourly backend the hourly rows are written immediately.
+        """
+        insights = data['daily_insights']
+        ramp_start, ramp_end = insights['ramp_window'].split('-')
+
+        return DailyEnergySummary(
+            date=date_obj,
+            data_source='caiso',
+            hourly_data_json=HourlyStore.pack(HourlyStore.ENERGY, date_obj, 'caiso', {
+                'hourly_data': data['hourly_data'],
+                'daily_insights': insights
+            }),
+            peak_vre_penetration=insights['peak_vre_pct'],
+            peak_vre_hour=cls._parse_hour(insights['peak_vre_hour']),
+            peak_demand_hour=cls._parse_hour(insights['shift_from_hour']),
+            sustained_high_vre_hours=insights['high_vre_window_hours'],
+            max_netload_ramp_gw=insights['max_ramp_gw'],
+            ramp_window_start=cls._parse_hour(ramp_start),
+            ramp_window_end=cls._parse_hour(ramp_end),
+            load_balancing_gap_hours=insights['load_balancing_gap_hours'],
+            shiftable_energy_gwh=insights['optimal_shift_amount'],
+            flexibility_window_start=cls._parse_hour(insights['flexibility_window_start']),
+            flexibility_window_end=cls._parse_hour(insights['flexibility_window_end']),
+        )
+
+    @staticmethod
+    def _parse_hour(hour_str):
+        """'HH:MM' -> time, None passes through"""
+        return datetime.strptime(hour_str, '%H:%M').time() if hour_str else None
+    
+    @classmethod
+    def _database_rows(cls, start, end):
+        """
+        (timestamp, indicator_id, value) for the summary indicators in [start, end)
+        Range + indicator_id + resolution filters are served by the covering index.
+        """
+        return EnergyData.objects.filter(
+            indicator_id__in=cls.DATABASE_INDICATORS,
+            resolution='hour',
+            timestamp__gte=start,
+            timestamp__lt=end
+        ).order_by('timestamp').values_list('timestamp', 'indicator_id', 'value')
+    
     @classmethod
     def _transform_db_to_hourly(cls, energy_data):
         """Transform database EnergyData to hourly chart format"""
+        return cls._hourly_from_rows(
+            (item.timestamp, item.indicator.indicator_id, item.value) for item in energy_data
+        )
+    
+    @classmethod
+    def _hourly_from_rows(cls, rows):
+        """(timestamp, indicator_id, value) rows for one day -> hourly chart format"""
         hourly_dict = {}
         
         # Group by hour
-        for item in energy_data:
-            hour_key = item.timestamp.strftime('%H:%M')
+        for timestamp, indicator_id, value in rows:
+            hour_key = timestamp.strftime('%H:%M')
             
             if hour_key not in hourly_dict:
                 hourly_dict[hour_key] = {
@@ -127,16 +202,16 @@ class DailySummaryService:
                 }
             
             # Convert MW to GW and assign to appropriate field
-            value_gw = round(item.value / 1000, 2)
+            value_gw = round(value / 1000, 2)
             
-            if item.indicator.indicator_id == 1293:  # Demand
+            if indicator_id == 1293:  # Demand
                 hourly_dict[hour_key]['demand'] = value_gw
-            elif item.indicator.indicator_id == 1161:  # Solar
+            elif indicator_id == 1161:  # Solar
                 hourly_dict[hour_key]['solar'] = value_gw
-            elif item.indicator.indicator_id == 1159:  # Wind
+            elif indicator_id == 1159:  # Wind
                 hourly_dict[hour_key]['wind'] = value_gw
-            elif item.indicator.indicator_id == 600:  # Price
-                hourly_dict[hour_key]['price'] = round(item.value, 2) # EUR/MWh
+            elif indicator_id == 600:  # Price
+                hourly_dict[hour_key]['price'] = round(value, 2) # EUR/MWh
         
         # Calculate derived fields and sort
         hourly_data = []
@@ -169,23 +244,87 @@ class DailySummaryService:
         if not end_date:
             end_date = datetime(2024, 12, 31).date()
         
-        current_date = start_date
-        created_count = 0
-        skipped_count = 0
-        
-        while current_date <= end_date:
-            try:
-                # Check if already exists
-                if DailyEnergySummary.objects.filter(date=current_date).exists():
-                    skipped_count += 1
-                else:
-                    cls._create_from_database(current_date)
-                    created_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Failed to create summary for {current_date}: {e}")
+        stats = cls.rebuild_database_summaries(start_date, end_date)
+        
+        logger.info(f"Backfill complete: {stats['created']} created, {stats['skipped']} skipped")
+        return stats['created'], stats['skipped']
+    
+    @classmethod
+    def rebuild_database_summaries(cls, start_date, end_date, overwrite=False, batch_size=500):
+        """
+        Set-based rebuild of 'database' summaries over [start_date, end_date]
+        
+        One timestamp-range query for every indicator row in the window, pivoted
+        per day, metrics computed in one batch, summaries written with bulk_create.
+        Days that already have a Spain summary are skipped unless overwrite=True,
+        which replaces existing 'database' rows (ESIOS days are never touched).
+        
+        Returns: dict with created, updated, skipped and no_data counts
+        """
+        existing = dict(DailyEnergySummary.objects.filter(
+            date__gte=start_date, date__lte=end_date, data_source__in=['database', 'esios']
+        ).values_list('date', 'data_source'))
+        
+        rows = cls._database_rows(*TimeRange.days(start_date, end_date))
+        
+        rows_by_day = {}
+        for timestamp, indicator_id, value in rows.iterator(chunk_size=10000):
+            rows_by_day.setdefault(timestamp.date(), []).append((timestamp, indicator_id, value))
+        
+        stats = {'created': 0, 'updated': 0, 'skipped': 0, 'no_data': 0}
+        days, hourly_lists = [], []
+        current = start_date
+        while current <= end_date:
+            source = existing.get(current)
+            if source == 'esios' or (source == 'database' and not overwrite):
+                stats['skipped'] += 1
+            elif current not in rows_by_day:
+                stats['no_data'] += 1
+            else:
+                days.append(current)
+                hourly_lists.append(cls._hourly_from_rows(rows_by_day[current]))
+            current += timedelta(days=1)
+        
+        if not days:
+            return stats
+        
+        metrics_by_day = EnergyMetricsCalculator.calculate_metrics_for_days(hourly_lists)
+        summaries = []
+        packed = []
+        for day, hourly_data, metrics in zip(days, hourly_lists, metrics_by_day):
+            if metrics is None:
+                stats['no_data'] += 1
+                continue
+            summaries.append(DailyEnergySummary(
+                date=day,
+                data_source='database',
+                total_hours=len(hourly_data),
+                **metrics
+            ))
+            packed.append((day, 'database', {'hourly_data': hourly_data}))
+            stats['updated' if day in existing else 'created'] += 1
+        
+        with transaction.atomic():
+            for summary, blob in zip(summaries, HourlyStore.pack_many(HourlyStore.ENERGY, packed)):
+                summary.hourly_data_json = blob
             
-            current_date += timedelta(days=1)
+            DailyEnergySummary.objects.bulk_create(
+                summaries,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['date', 'data_source'],
+                update_fields=cls.METRIC_FIELDS + ['hourly_data_json', 'total_hours', 'updated_at'],
+            )
+        
+        # bulk_create skips post_save, so drop cached responses and refresh rollups here
+        from .response_cache import ResponseCache
+        from .rollup_service import RollupService
+        for summary in summaries:
+            ResponseCache.invalidate('spain', summary.date.isoformat())
+        RollupService.refresh_days('spain', [summary.date for summary in summaries])
         
-        logger.info(f"Backfill complete: {created_count} created, {skipped_count} skipped")
-        return created_count, skipped_count
\ No newline at end of file
+        logger.info(
+            f"Rebuilt database summaries {start_date}..{end_date}: {stats['created']} created, "
+            f"{stats['updated']} updated, {stats['skipped']} skipped, {stats['no_data']} without data"
+        )
+        return stats
@@ -0,0 +1,121 @@
+# services/esios_scheduler.py
+"""
+Concurrent fetch scheduler for the ESIOS API.
+
+Runs several indicator/date-chunk requests at once on a thread pool while a
+shared token bucket keeps the overall request rate under the configured limit.
+Failed requests are retried with exponential backoff.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Hashable, Iterator, Optional, Tuple
+from django.conf import settings
+import random
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket - `rate` tokens per second, up to `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class EsiosFetchScheduler:
+    """
+    Runs ESIOS fetch jobs concurrently under a token-bucket rate limit.
+
+    Jobs are zero-argument callables keyed by anything hashable, e.g.
+    ('solar', chunk_start). Results are yielded as they complete so callers
+    can persist them on their own thread.
+    """
+
+    _shared_bucket = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        rate_per_second: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+    ):
+        self.max_workers = max_workers or getattr(settings, 'ESIOS_MAX_WORKERS', 4)
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, 'ESIOS_MAX_RETRIES', 3)
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else getattr(settings, 'ESIOS_BACKOFF_SECONDS', 1.0)
+
+        if rate_per_second is None and burst is None:
+            # Default limit is shared by every scheduler in the process
+            self.bucket = self._get_shared_bucket()
+        else:
+            self.bucket = TokenBucket(
+                rate_per_second or getattr(settings, 'ESIOS_RATE_LIMIT_PER_SECOND', 2.0),
+                burst or getattr(settings, 'ESIOS_RATE_LIMIT_BURST', 4),
+            )
+
+    @classmethod
+    def _get_shared_bucket(cls) -> TokenBucket:
+        with cls._shared_lock:
+            if cls._shared_bucket is None:
+                cls._shared_bucket = TokenBucket(
+                    getattr(settings, 'ESIOS_RATE_LIMIT_PER_SECOND', 2.0),
+                    getattr(settings, 'ESIOS_RATE_LIMIT_BURST', 4),
+                )
+            return cls._shared_bucket
+
+    def call(self, fn: Callable):
+        """Run a single job with rate limiting and retry/backoff."""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return fn()
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_seconds * (2 ** attempt) * (1 + random.random() / 2)
+                logger.warning(f"ESIOS request failed ({e}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def run(self, jobs: Dict[Hashable, Callable]) -> Iterator[Tuple[Hashable, object, Optional[Exception]]]:
+        """
+        Run all jobs concurrently.
+
+        Yields (key, result, error) in completion order; exactly one of
+        result/error is meaningful per job.
+        """
+        if not jobs:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+            futures = {executor.submit(self.call, fn): key for key, fn in jobs.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    yield key, future.result(), None
+                except Exception as e:
+                    yield key, None, e
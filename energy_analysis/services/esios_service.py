@@ -1,8 +1,10 @@
 import esios
 import pandas as pd
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Dict, List, Optional
 import logging
+from .esios_scheduler import EsiosFetchScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +17,9 @@ class EsiosService:
         'wind': 1159
     }
     
-    def __init__(self):
+    def __init__(self, scheduler: Optional[EsiosFetchScheduler] = None):
         self.client = None
+        self.scheduler = scheduler or EsiosFetchScheduler()
         self._initialize_client()
     
     def _initialize_client(self):
@@ -65,52 +68,67 @@ class EsiosService:
             return None
     
     def _fetch_indicators(self, start_dt: datetime, end_dt: datetime) -> Optional[pd.DataFrame]:
-        """Fetch all indicators and combine into single DataFrame"""
+        """Fetch all indicators concurrently and combine into single DataFrame"""
+        jobs = {
+            indicator_name: partial(self._fetch_indicator, indicator_name, indicator_id, start_dt, end_dt)
+            for indicator_name, indicator_id in self.INDICATORS.items()
+        }
+
+        columns = {}
+        for indicator_name, data_column, error in self.scheduler.run(jobs):
+            if error is not None:
+                logger.error(f"Failed to fetch indicator {self.INDICATORS[indicator_name]}: {error}")
+                continue
+            if data_column is not None:
+                columns[indicator_name] = data_column
+
+        if not columns:
+            return None
+
+        # Join in INDICATORS order so the frame layout doesn't depend on completion order
         combined_data = pd.DataFrame()
-        
-        for indicator_name, indicator_id in self.INDICATORS.items():
-            try:
-                logger.debug(f"Fetching indicator {indicator_id} ({indicator_name})")
-                
-                # Get the indicator endpoint
-                esios_indicator = self.client.endpoint('indicators').select(indicator_id)
-                
-                # Base API params
-                api_params = {
-                    'start': start_dt.isoformat(),
-                    'end': end_dt.isoformat(),
-                    'geo_trunc': 'electric_system',
-                    'geo_agg': 'sum'
-                }
-                
-                # Only demand needs time aggregation (5min -> hourly)
-                if indicator_name == 'demand':
-                    api_params.update({
-                        'time_trunc': 'hour',
-                        'time_agg': 'average'
-                    })
-                
-                data = esios_indicator.historical(**api_params)
-                
-                if data.empty:
-                    logger.warning(f"Empty data for indicator {indicator_id}")
-                    continue
-                
-                # Only keep the data column we need, rename it
-                data_column = data[[str(indicator_id)]].rename(columns={str(indicator_id): indicator_name})
-                
-                # Combine with other indicators
-                if combined_data.empty:
-                    combined_data = data_column
-                else:
-                    combined_data = combined_data.join(data_column, how='outer')
-                    
-            except Exception as e:
-                logger.error(f"Failed to fetch indicator {indicator_id}: {e}")
+        for indicator_name in self.INDICATORS:
+            if indicator_name not in columns:
                 continue
-        
+            if combined_data.empty:
+                combined_data = columns[indicator_name]
+            else:
+                combined_data = combined_data.join(columns[indicator_name], how='outer')
+
         return combined_data if not combined_data.empty else None
-    
+
+    def _fetch_indicator(self, indicator_name: str, indicator_id: int,
+                         start_dt: datetime, end_dt: datetime) -> Optional[pd.DataFrame]:
+        """Fetch one indicator as a single renamed column"""
+        logger.debug(f"Fetching indicator {indicator_id} ({indicator_name})")
+
+        # Get the indicator endpoint
+        esios_indicator = self.client.endpoint('indicators').select(indicator_id)
+
+        # Base API params
+        api_params = {
+            'start': start_dt.isoformat(),
+            'end': end_dt.isoformat(),
+            'geo_trunc': 'electric_system',
+            'geo_agg': 'sum'
+        }
+
+        # Only demand needs time aggregation (5min -> hourly)
+        if indicator_name == 'demand':
+            api_params.update({
+                'time_trunc': 'hour',
+                'time_agg': 'average'
+            })
+
+        data = esios_indicator.historical(**api_params)
+
+        if data.empty:
+            logger.warning(f"Empty data for indicator {indicator_id}")
+            return None
+
+        # Only keep the data column we need, rename it
+        return data[[str(indicator_id)]].rename(columns={str(indicator_id): indicator_name})
+
     def _transform_to_hourly_data(self, df: pd.DataFrame, date_string: str) -> Dict:
         """Transform pandas DataFrame to expected format"""
         hourly_data = []
@@ -0,0 +1,196 @@
+# services/fetch_job_service.py
+"""
+DB-backed queue for cold-date fetches.
+
+With background fetching on (ENERGY_BACKGROUND_FETCH or ?async=true), a
+chart_data / curtailment_data / bess_analysis request whose day isn't in the
+database yet is turned into a FetchJob and answered with 202 + job id instead
+of holding a gunicorn worker on ESIOS/gridstatus. `manage.py process_fetch_jobs`
+claims jobs with a conditional UPDATE (safe with several workers), runs the
+same service call the endpoint would, and stores the payload on the job for
+the status endpoint. Warm requests never touch the queue.
+"""
+from datetime import date, timedelta
+from typing import Dict, Optional
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+import logging
+from ..models import BESSConfig, FetchJob
+from .region_service import RegionService
+from .response_cache import ResponseCache
+from .summary_repository import SummaryRepository
+
+logger = logging.getLogger(__name__)
+
+
+class FetchJobService:
+
+    KINDS = ('chart_data', 'curtailment_data', 'bess_analysis')
+    ACTIVE = ('queued', 'running')
+
+    # FetchJob.priority: lower is claimed first
+    REQUEST_PRIORITY = 0
+    PREFETCH_PRIORITY = 10
+
+    # =========================================================================
+    # Request side
+    # =========================================================================
+
+    @staticmethod
+    def background_enabled(query_params) -> bool:
+        """?async=true|false overrides the ENERGY_BACKGROUND_FETCH default"""
+        flag = query_params.get('async')
+        if flag is not None:
+            return flag.lower() in ('1', 'true', 'yes')
+        return getattr(settings, 'ENERGY_BACKGROUND_FETCH', False)
+
+    @classmethod
+    def is_cold(cls, kind: str, params: Dict) -> bool:
+        """True if serving the request would have to go upstream"""
+        date_obj = date.fromisoformat(params['date'])
+
+        if kind == 'bess_analysis':
+            # analyze_day always reads the Spain summary
+            return not SummaryRepository.exists(
+                SummaryRepository.ENERGY, date_obj, RegionService.REGION_SOURCES['spain']
+            )
+
+        region = params['region']
+        sources = RegionService.REGION_SOURCES.get(region)
+        if sources is None:
+            return False  # let the endpoint report the bad region
+        if ResponseCache.get(kind, region, params['date']) is not None:
+            return False
+
+        summary_kind = SummaryRepository.ENERGY if kind == 'chart_data' else SummaryRepository.CURTAILMENT
+        return not SummaryRepository.exists(summary_kind, date_obj, sources)
+
+    @staticmethod
+    def job_key(kind: str, params: Dict) -> str:
+        return kind + ':' + ':'.join(f"{name}={params[name]}" for name in sorted(params))
+
+    @classmethod
+    def enqueue(cls, kind: str, params: Dict, priority: int = REQUEST_PRIORITY) -> FetchJob:
+        """
+        Queue a job, or return the one already queued/running for the same
+        request (raising its priority if a user is now waiting on a prefetch).
+        """
+        if kind not in cls.KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        key = cls.job_key(kind, params)
+        job = FetchJob.objects.filter(key=key, status__in=cls.ACTIVE).first()
+        if job is not None:
+            if job.priority > priority:
+                FetchJob.objects.filter(id=job.id, priority__gt=priority).update(priority=priority)
+                job.priority = priority
+            return job
+
+        try:
+            with transaction.atomic():
+                job = FetchJob.objects.create(kind=kind, key=key, params=params, priority=priority)
+        except IntegrityError:
+            # Another request queued it first (partial unique constraint on active keys)
+            return FetchJob.objects.filter(key=key).order_by('-id').first()
+
+        logger.info(f"Queued fetch job {job.id} ({key})")
+        return job
+
+    @classmethod
+    def status(cls, job: FetchJob) -> Dict:
+        data = job.to_dict()
+        if job.status == 'queued':
+            data['queue_position'] = FetchJob.objects.filter(status='queued').filter(
+                Q(priority__lt=job.priority) | Q(priority=job.priority, created_at__lt=job.created_at)
+            ).count() + 1
+        return data
+
+    # =========================================================================
+    # Worker side
+    # =========================================================================
+
+    @classmethod
+    def claim(cls, worker: str) -> Optional[FetchJob]:
+        """
+        Take the next queued job (by priority, then age). The status='queued'
+        condition on the UPDATE means only one worker wins a given row; losers
+        move to the next one.
+        """
+        candidates = FetchJob.objects.filter(status='queued').order_by(
+            'priority', 'created_at'
+        ).values_list('id', flat=True)[:10]
+        for job_id in candidates:
+            claimed = FetchJob.objects.filter(id=job_id, status='queued').update(
+                status='running', worker=worker, started_at=timezone.now(), attempts=F('attempts') + 1
+            )
+            if claimed:
+                return FetchJob.objects.get(id=job_id)
+        return None
+
+    @classmethod
+    def run(cls, job: FetchJob) -> FetchJob:
+        """Execute a claimed job and record the outcome"""
+        max_attempts = getattr(settings, 'FETCH_JOB_MAX_ATTEMPTS', 3)
+
+        try:
+            job.result = cls._execute(job.kind, job.params)
+            job.status = 'done'
+            job.last_error = ''
+        except ValueError as e:
+            # No data upstream / bad parameters: retrying won't help
+            job.status = 'failed'
+            job.last_error = str(e)
+        except Exception as e:
+            logger.error(f"Fetch job {job.id} ({job.key}) attempt {job.attempts} failed: {e}")
+            job.status = 'queued' if job.attempts < max_attempts else 'failed'
+            job.last_error = str(e)
+
+        if job.status != 'queued':
+            job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'last_error', 'finished_at'])
+        return job
+
+    @classmethod
+    def _execute(cls, kind: str, params: Dict) -> Dict:
+        if kind == 'bess_analysis':
+            from .bess_decision_service import BESSDecisionService
+
+            config = BESSConfig(
+                power_mw=params['power_mw'],
+                duration_hours=params['duration_hours'],
+                efficiency=params['efficiency'],
+            )
+            return BESSDecisionService.analyze_day(params['date'], config, optimizer=params['optimizer'])
+
+        region, date_str = params['region'], params['date']
+        if kind == 'chart_data':
+            payload = {'region': region, **RegionService.get_chart_data(region, date_str)}
+        else:
+            payload = {'region': region, **RegionService.get_curtailment_data(region, date_str)}
+
+        # Warm the response cache too (seen by the web workers if the cache is shared)
+        ResponseCache.set(kind, region, date_str, payload)
+        return payload
+
+    @classmethod
+    def requeue_stale(cls, stale_after_seconds: int) -> int:
+        """Put back jobs whose worker died mid-run"""
+        cutoff = timezone.now() - timedelta(seconds=stale_after_seconds)
+        stale = FetchJob.objects.filter(status='running', started_at__lt=cutoff)
+        max_attempts = getattr(settings, 'FETCH_JOB_MAX_ATTEMPTS', 3)
+
+        failed = stale.filter(attempts__gte=max_attempts).update(
+            status='failed', last_error='Worker stopped responding', finished_at=timezone.now()
+        )
+        requeued = stale.update(status='queued')
+        if failed or requeued:
+            logger.warning(f"Stale fetch jobs: {requeued} requeued, {failed} failed")
+        return requeued
+
+    @classmethod
+    def prune(cls, older_than_hours: int) -> int:
+        cutoff = timezone.now() - timedelta(hours=older_than_hours)
+        deleted, _ = FetchJob.objects.filter(status__in=['done', 'failed'], finished_at__lt=cutoff).delete()
+        return deleted
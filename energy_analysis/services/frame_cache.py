@@ -0,0 +1,167 @@
+# services/frame_cache.py
+"""
+Per-date raw DataFrame cache for upstream ISO data.
+
+Two tiers keyed by (iso, dataset, date):
+- in-process LRU, shared by every GridStatusService in the process
+- optional on-disk Parquet store (GRIDSTATUS_CACHE_DIR), so re-runs of the
+  load commands skip the download; capped at GRIDSTATUS_CACHE_MAX_DISK_FRAMES
+  files, oldest evicted first
+
+Only settled days are cached (ResponseCache.is_historical: before yesterday,
+which is also safely finished in Pacific time on a UTC server) - recent
+frames still grow or get revised.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+from django.conf import settings
+import pandas as pd
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FrameCache:
+
+    def __init__(self, max_frames: int = 64, directory: Optional[Path] = None, max_disk_frames: int = 2000):
+        self.max_frames = max_frames
+        self.directory = Path(directory) if directory else None
+        self.max_disk_frames = max_disk_frames
+        self._frames: "OrderedDict[Tuple[str, str, str], pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Files in the disk store as last seen by this process; None until first counted
+        self._disk_count: Optional[int] = None
+        self._disk_lock = threading.Lock()
+
+    def get_or_fetch(self, iso: str, dataset: str, date_string: str,
+                     loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Return the cached frame for (iso, dataset, date), calling loader() on a miss.
+        Callers get a copy so they can mutate it freely.
+        """
+        if not self._is_complete_day(date_string):
+            return loader()
+
+        key = (iso, dataset, date_string)
+
+        frame = self._get_memory(key)
+        if frame is None:
+            frame = self._read_disk(key)
+            if frame is None:
+                frame = loader()
+                if frame is None or frame.empty:
+                    # Don't pin "no data yet" - CAISO sometimes publishes late
+                    return frame
+                self._write_disk(key, frame)
+            self._put_memory(key, frame)
+
+        return frame.copy()
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+    # =========================================================================
+    # In-process LRU
+    # =========================================================================
+
+    def _get_memory(self, key) -> Optional[pd.DataFrame]:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+            return frame
+
+    def _put_memory(self, key, frame: pd.DataFrame):
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+
+    # =========================================================================
+    # On-disk Parquet store
+    # =========================================================================
+
+    def _path(self, key) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        iso, dataset, date_string = key
+        return self.directory / iso / dataset / f"{date_string}.parquet"
+
+    def _read_disk(self, key) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            logger.warning(f"Unreadable cached frame {path}: {e}")
+            return None
+
+    def _write_disk(self, key, frame: pd.DataFrame):
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            is_new = not path.exists()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            frame.to_parquet(tmp_path)
+            tmp_path.replace(path)
+        except Exception as e:
+            # Mixed-type object columns can't always be stored - memory tier still works
+            logger.warning(f"Could not write cached frame {path}: {e}")
+            return
+        if is_new:
+            self._count_disk_write()
+
+    def _count_disk_write(self):
+        """
+        Track the store size so a write only walks the directory when it may be
+        over max_disk_frames. Other processes' writes are picked up at the next prune.
+        """
+        with self._disk_lock:
+            if self._disk_count is None:
+                self._disk_count = self._prune_disk()
+            else:
+                self._disk_count += 1
+                if self._disk_count > self.max_disk_frames:
+                    self._disk_count = self._prune_disk()
+
+    def _prune_disk(self) -> int:
+        """Drop the least recently written files beyond max_disk_frames; returns the files left"""
+        try:
+            files = sorted(self.directory.glob('*/*/*.parquet'), key=lambda f: f.stat().st_mtime)
+            stale = files[:max(len(files) - self.max_disk_frames, 0)]
+            for path in stale:
+                path.unlink(missing_ok=True)
+            return len(files) - len(stale)
+        except OSError as e:
+            logger.warning(f"Could not prune frame cache {self.directory}: {e}")
+            return 0
+
+    @staticmethod
+    def _is_complete_day(date_string: str) -> bool:
+        from .response_cache import ResponseCache
+        return ResponseCache.is_historical(date_string)
+
+
+_frame_cache = None
+_frame_cache_lock = threading.Lock()
+
+
+def get_frame_cache() -> FrameCache:
+    """Process-wide cache configured from settings"""
+    global _frame_cache
+    with _frame_cache_lock:
+        if _frame_cache is None:
+            _frame_cache = FrameCache(
+                max_frames=getattr(settings, 'GRIDSTATUS_CACHE_MAX_FRAMES', 64),
+                directory=getattr(settings, 'GRIDSTATUS_CACHE_DIR', None),
+                max_disk_frames=getattr(settings, 'GRIDSTATUS_CACHE_MAX_DISK_FRAMES', 2000),
+            )
+        return _frame_cache
@@ -5,9 +5,11 @@ Normalizes data to match the existing Spain/ESIOS format for frontend compatibil
 """
 from gridstatus import CAISO
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
 import logging
+from .frame_cache import FrameCache, get_frame_cache
 
 logger = logging.getLogger(__name__)
 
@@ -19,24 +21,48 @@ class GridStatusService:
     Output format matches EsiosService so frontend works without changes.
     """
     
-    def __init__(self, iso: str = 'caiso'):
+    def __init__(self, iso: str = 'caiso', frame_cache: Optional[FrameCache] = None):
         self.iso_name = iso.lower()
         if self.iso_name == 'caiso':
             self.client = CAISO()
         else:
             raise ValueError(f"Unsupported ISO: {iso}. Currently only 'caiso' supported.")
+        self.frame_cache = frame_cache or get_frame_cache()
+    
+    # =========================================================================
+    # RAW FRAMES (cached per ISO / dataset / date)
+    # =========================================================================
+    
+    def _get_frame(self, dataset: str, date_string: str, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Fetch a raw upstream frame once and share it with every consumer."""
+        return self.frame_cache.get_or_fetch(self.iso_name, dataset, date_string, loader)
+    
+    def _fetch_fuel_mix(self, date_string: str) -> pd.DataFrame:
+        return self._get_frame('fuel_mix', date_string, lambda: self.client.get_fuel_mix(date=date_string))
+    
+    def _fetch_load(self, date_string: str) -> pd.DataFrame:
+        return self._get_frame('load', date_string, lambda: self.client.get_load(date=date_string))
+    
+    def _fetch_curtailment(self, date_string: str) -> pd.DataFrame:
+        return self._get_frame(
+            'curtailment', date_string, lambda: self.client.get_curtailment_legacy(date=date_string)
+        )
     
     # =========================================================================
     # GENERATION / LOAD DATA (for VRE & Net Load charts)
     # =========================================================================
     
-    def fetch_day_data(self, date_string: str) -> Optional[Dict]:
-        """Fetch generation + load data, compute insights."""
+    def fetch_day_data(self, date_string: str, raise_errors: bool = False) -> Optional[Dict]:
+        """
+        Fetch generation + load data, compute insights.
+        Returns None when CAISO has no data; upstream errors are logged and
+        return None too unless raise_errors is set (backfills need to tell them apart).
+        """
         try:
             logger.info(f"Fetching CAISO generation data for {date_string}")
             
-            fuel_mix = self.client.get_fuel_mix(date=date_string)
-            load = self.client.get_load(date=date_string)
+            fuel_mix = self._fetch_fuel_mix(date_string)
+            load = self._fetch_load(date_string)
             prices = self._fetch_prices(date_string)
             
             if fuel_mix.empty or load.empty:
@@ -56,13 +82,17 @@ class GridStatusService:
             
         except Exception as e:
             logger.error(f"Failed to fetch CAISO day data for {date_string}: {e}")
+            if raise_errors:
+                raise
             return None
     
     def _fetch_prices(self, date_string: str) -> Optional[pd.DataFrame]:
         """Fetch LMP prices, return None if unavailable."""
         try:
-            prices = self.client.get_lmp(date=date_string, market="REAL_TIME_5_MIN")
-            return prices
+            return self._get_frame(
+                'lmp_rt5', date_string,
+                lambda: self.client.get_lmp(date=date_string, market="REAL_TIME_5_MIN")
+            )
         except Exception as e:
             logger.warning(f"Could not fetch prices for {date_string}: {e}")
             return None
@@ -73,77 +103,64 @@ class GridStatusService:
         load: pd.DataFrame,
         prices: Optional[pd.DataFrame]
     ) -> List[Dict]:
-        """Aggregate 5-min data to hourly, matching ESIOS format."""
-        
-        fuel_mix = fuel_mix.copy()
-        load = load.copy()
-        
-        # Floor to hour (lowercase 'h' for newer pandas)
-        fuel_mix['hour'] = fuel_mix['Interval Start'].dt.floor('h')
-        load['hour'] = load['Interval Start'].dt.floor('h')
+        """
+        Aggregate 5-min data to hourly, matching ESIOS format.
+        Everything is computed column-wise; dicts are only built for the response.
+        """
+        # Mean MW per hour, joined on the hourly index
+        hourly = (
+            self._hourly_mean(fuel_mix, ['Solar', 'Wind'])
+            .join(self._hourly_mean(load, ['Load']), how='outer')
+            .sort_index()
+        )
         
-        # Aggregate generation (mean MW per hour)
-        fuel_hourly = fuel_mix.groupby('hour').agg({
-            'Solar': 'mean',
-            'Wind': 'mean'
-        }).reset_index()
+        # Convert MW to GW
+        demand = hourly['Load'].to_numpy(dtype=float) / 1000
+        # Solar can be negative at night (grid consumption) - floor at 0
+        solar = np.fmax(hourly['Solar'].to_numpy(dtype=float) / 1000, 0)
+        wind = hourly['Wind'].to_numpy(dtype=float) / 1000
+        vre_total = solar + wind
+        net_load = demand - vre_total
         
-        # Aggregate load (mean MW per hour)
-        load_hourly = load.groupby('hour').agg({
-            'Load': 'mean'
-        }).reset_index()
+        # Percentages (0 where there's no demand)
+        has_demand = demand > 0
+        safe_demand = np.where(has_demand, demand, 1)
         
-        # Aggregate prices if available (mean across all hubs)
-        price_dict = {}
-        if prices is not None and not prices.empty:
-            prices = prices.copy()
-            prices['hour'] = prices['Interval Start'].dt.floor('h')
-            price_hourly = prices.groupby('hour')['LMP'].mean()
-            price_dict = price_hourly.to_dict()
+        def pct(values):
+            return np.where(has_demand, np.round(values / safe_demand * 100, 1), 0)
         
-        # Merge generation and load
-        merged = fuel_hourly.merge(load_hourly, on='hour', how='outer')
+        # Price (USD/MWh for CAISO), mean across hubs, joined by hour
+        price = self._hourly_prices(prices).reindex(hourly.index).fillna(0).to_numpy(dtype=float)
         
-        # Build output
-        hourly_data = []
-        for _, row in merged.iterrows():
-            hour_str = row['hour'].strftime('%H:00')
-            
-            # Convert MW to GW
-            demand_gw = row['Load'] / 1000
-            # Solar can be negative at night (grid consumption) - floor at 0
-            solar_gw = max(0, row['Solar'] / 1000)
-            wind_gw = row['Wind'] / 1000
-            vre_total_gw = solar_gw + wind_gw
-            net_load_gw = demand_gw - vre_total_gw
-            
-            # Percentages
-            if demand_gw > 0:
-                solar_pct = round((solar_gw / demand_gw) * 100, 1)
-                wind_pct = round((wind_gw / demand_gw) * 100, 1)
-                vre_pct = round((vre_total_gw / demand_gw) * 100, 1)
-            else:
-                solar_pct = wind_pct = vre_pct = 0
-            
-            # Price (USD/MWh for CAISO)
-            price = round(price_dict.get(row['hour'], 0), 2)
-            
-            hourly_data.append({
-                'hour': hour_str,
-                'demand': round(demand_gw, 2),
-                'solar': round(solar_gw, 2),
-                'wind': round(wind_gw, 2),
-                'vre_total': round(vre_total_gw, 2),
-                'net_load': round(net_load_gw, 2),
-                'solar_pct': solar_pct,
-                'wind_pct': wind_pct,
-                'vre_pct': vre_pct,
-                'price': price
-            })
+        frame = pd.DataFrame({
+            'hour': hourly.index.strftime('%H:00'),
+            'demand': np.round(demand, 2),
+            'solar': np.round(solar, 2),
+            'wind': np.round(wind, 2),
+            'vre_total': np.round(vre_total, 2),
+            'net_load': np.round(net_load, 2),
+            'solar_pct': pct(solar),
+            'wind_pct': pct(wind),
+            'vre_pct': pct(vre_total),
+            'price': np.round(price, 2),
+        })
         
         # Sort by hour
-        hourly_data.sort(key=lambda x: x['hour'])
-        return hourly_data
+        return frame.sort_values('hour', kind='stable').to_dict('records')
+    
+    @staticmethod
+    def _hourly_mean(frame: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """Mean of 5-min columns per hour (lowercase 'h' for newer pandas)"""
+        hours = frame['Interval Start'].dt.floor('h').rename('hour')
+        return frame.groupby(hours)[columns].mean()
+    
+    @staticmethod
+    def _hourly_prices(prices: Optional[pd.DataFrame]) -> pd.Series:
+        """Mean LMP across all hubs per hour; empty when prices are unavailable"""
+        if prices is None or prices.empty:
+            return pd.Series(dtype=float)
+        hours = prices['Interval Start'].dt.floor('h').rename('hour')
+        return prices.groupby(hours)['LMP'].mean()
     
     def _compute_daily_insights(self, hourly_data: list) -> dict:
         """Compute daily insights from hourly data."""
@@ -200,10 +217,11 @@ class GridStatusService:
     # CURTAILMENT DATA
     # =========================================================================
     
-    def fetch_curtailment_data(self, date_string: str) -> Optional[Dict]:
+    def fetch_curtailment_data(self, date_string: str, raise_errors: bool = False) -> Optional[Dict]:
         """
         Fetch curtailment data with price overlay.
         Output matches Spain's DailyCurtailmentService format.
+        Upstream errors return None unless raise_errors is set.
         
         Returns:
             {
@@ -237,7 +255,7 @@ class GridStatusService:
             logger.info(f"Fetching CAISO curtailment for {date_string}")
             
             # Fetch curtailment (hourly, sparse)
-            curtailment = self.client.get_curtailment_legacy(date=date_string)
+            curtailment = self._fetch_curtailment(date_string)
             
             # Fetch prices
             prices = self._fetch_prices(date_string)
@@ -260,6 +278,8 @@ class GridStatusService:
             
         except Exception as e:
             logger.error(f"Failed to fetch CAISO curtailment for {date_string}: {e}")
+            if raise_errors:
+                raise
             return None
     
     def _build_curtailment_hourly(
@@ -269,46 +289,42 @@ class GridStatusService:
     ) -> List[Dict]:
         """Build 24-hour curtailment array matching Spain format."""
         
-        # Aggregate prices to hourly
-        price_dict = {}
-        if prices is not None and not prices.empty:
-            prices = prices.copy()
-            prices['hour'] = prices['Interval Start'].dt.floor('h')
-            price_hourly = prices.groupby('hour')['LMP'].mean()
-            # Convert to hour string keys
-            price_dict = {k.strftime('%H:00'): v for k, v in price_hourly.items()}
+        # Prices by hour of day
+        price = self._by_hour_of_day(self._hourly_prices(prices))
         
-        # Aggregate curtailment by hour
-        curtail_dict = {}
+        # Curtailment summed per hour, then by hour of day
+        curtailed = pd.Series(dtype=float)
         if curtailment is not None and not curtailment.empty:
-            curtailment = curtailment.copy()
             # CRITICAL: Convert string to numeric!
-            curtailment['Curtailment (MWh)'] = pd.to_numeric(
-                curtailment['Curtailment (MWh)'], errors='coerce'
-            ).fillna(0)
-            
-            curtailment['hour'] = curtailment['Interval Start'].dt.floor('h')
-            curtail_hourly = curtailment.groupby('hour')['Curtailment (MWh)'].sum()
-            curtail_dict = {k.strftime('%H:00'): v for k, v in curtail_hourly.items()}
+            mwh = pd.to_numeric(curtailment['Curtailment (MWh)'], errors='coerce').fillna(0)
+            hours = curtailment['Interval Start'].dt.floor('h').rename('hour')
+            curtailed = self._by_hour_of_day(mwh.groupby(hours).sum())
         
-        # Build 24-hour structure
-        hourly_data = []
-        for h in range(24):
-            hour_str = f'{h:02d}:00'
-            curtailed = curtail_dict.get(hour_str, 0)
-            price = price_dict.get(hour_str, 0)
-            
-            # Revenue lost only for positive prices
-            revenue_lost = curtailed * price if price > 0 else 0
-            
-            hourly_data.append({
-                'hour': hour_str,
-                'curtailed_mwh': round(float(curtailed), 1),
-                'spot_price': round(float(price), 2),
-                'revenue_lost': round(float(revenue_lost), 2)
-            })
+        curtailed = curtailed.to_numpy(dtype=float)
+        price = price.to_numpy(dtype=float)
+        
+        # Revenue lost only for positive prices
+        revenue_lost = np.where(price > 0, curtailed * price, 0)
+        
+        frame = pd.DataFrame({
+            'hour': [f'{h:02d}:00' for h in range(24)],
+            'curtailed_mwh': np.round(curtailed, 1),
+            'spot_price': np.round(price, 2),
+            'revenue_lost': np.round(revenue_lost, 2),
+        })
         
-        return hourly_data
+        return frame.to_dict('records')
+    
+    @staticmethod
+    def _by_hour_of_day(hourly: pd.Series) -> pd.Series:
+        """
+        Re-key an hourly series to hour of day 0-23, zero-filled.
+        A repeated clock hour (DST fall-back) keeps its last value.
+        """
+        if hourly.empty:
+            return pd.Series(0.0, index=range(24))
+        by_hour = hourly.groupby(hourly.index.hour).last()
+        return by_hour.reindex(range(24), fill_value=0)
     
     def _calculate_curtailment_insights(self, hourly_data: List[Dict]) -> Dict:
         """Calculate daily summary metrics."""
@@ -0,0 +1,219 @@
+# services/hourly_store.py
+"""
+Accessor for the hourly arrays behind daily summaries.
+
+Two storage backends, picked by settings.HOURLY_STORAGE_BACKEND:
+- 'json' (default): hourly_data lives in the summary's hourly_data_json blob
+- 'table': one HourlyEnergyRecord / HourlyCurtailmentRecord row per hour;
+  the blob keeps only the extras (daily_insights, curtailment_breakdown)
+
+Reads understand both layouts, so a table can be migrated day by day with
+the migrate_hourly_storage command. Services should go through this module
+rather than reaching into hourly_data_json['hourly_data'].
+"""
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.db.models import Avg, Max, Min, Sum
+import logging
+from ..models import (
+    DailyEnergySummary, DailyCurtailmentSummary,
+    HourlyEnergyRecord, HourlyCurtailmentRecord
+)
+
+logger = logging.getLogger(__name__)
+
+
+class HourlyStore:
+
+    ENERGY = 'energy'
+    CURTAILMENT = 'curtailment'
+
+    FIELDS = {
+        ENERGY: ['demand', 'solar', 'wind', 'vre_total', 'net_load', 'solar_pct', 'wind_pct', 'vre_pct', 'price'],
+        CURTAILMENT: ['curtailed_mwh', 'redispatch_up', 'spot_price', 'revenue_lost'],
+    }
+    RECORD_MODELS = {
+        ENERGY: HourlyEnergyRecord,
+        CURTAILMENT: HourlyCurtailmentRecord,
+    }
+    SUMMARY_MODELS = {
+        ENERGY: DailyEnergySummary,
+        CURTAILMENT: DailyCurtailmentSummary,
+    }
+
+    @staticmethod
+    def backend() -> str:
+        return getattr(settings, 'HOURLY_STORAGE_BACKEND', 'json')
+
+    @classmethod
+    def kind_of(cls, summary) -> str:
+        return cls.CURTAILMENT if isinstance(summary, DailyCurtailmentSummary) else cls.ENERGY
+
+    # =========================================================================
+    # WRITE
+    # =========================================================================
+
+    @classmethod
+    def pack(cls, kind: str, day: date, data_source: str, payload: dict) -> dict:
+        """
+        Return the blob to store on the summary for this payload.
+        With the table backend the hourly rows are written here and stripped
+        from the blob; call inside the same transaction as the summary write.
+        """
+        if cls.backend() != 'table' or not payload or not payload.get('hourly_data'):
+            return payload
+
+        cls.write_rows(kind, [(day, data_source, payload['hourly_data'])])
+        return {k: v for k, v in payload.items() if k != 'hourly_data'}
+
+    @classmethod
+    def pack_many(cls, kind: str, items: List[Tuple[date, str, dict]]) -> List[dict]:
+        """pack() for many (date, data_source, payload) at once - one bulk row write"""
+        if cls.backend() != 'table':
+            return [payload for _, _, payload in items]
+
+        cls.write_rows(kind, [
+            (day, data_source, payload['hourly_data'])
+            for day, data_source, payload in items if payload and payload.get('hourly_data')
+        ])
+        return [
+            {k: v for k, v in payload.items() if k != 'hourly_data'} if payload and payload.get('hourly_data') else payload
+            for _, _, payload in items
+        ]
+
+    @classmethod
+    def write_rows(cls, kind: str, days: Iterable[Tuple[date, str, List[dict]]]):
+        """Upsert hourly rows for many (date, data_source, hourly_data) at once"""
+        fields = cls.FIELDS[kind]
+        record_model = cls.RECORD_MODELS[kind]
+
+        rows = [
+            record_model(
+                date=day,
+                data_source=data_source,
+                hour=datetime.strptime(hour['hour'], '%H:%M').time(),
+                **{field: hour.get(field) for field in fields}
+            )
+            for day, data_source, hourly_data in days
+            for hour in hourly_data
+        ]
+        if not rows:
+            return
+
+        record_model.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['data_source', 'date', 'hour'],
+            update_fields=fields,
+        )
+
+    # =========================================================================
+    # READ
+    # =========================================================================
+
+    @classmethod
+    def hourly(cls, summary) -> List[dict]:
+        """Hourly dicts for one summary, whichever backend stored them"""
+        blob = summary.hourly_data_json or {}
+        if 'hourly_data' in blob:
+            return blob['hourly_data']
+
+        kind = cls.kind_of(summary)
+        return cls._read_rows(kind, [summary.data_source], summary.date, summary.date).get(summary.date, [])
+
+    @classmethod
+    def hourly_for_range(cls, kind: str, sources: List[str], start: date, end: date) -> Dict[date, List[dict]]:
+        """{date: hourly dicts} for every summary in the window - two queries at most"""
+        from .summary_repository import SummaryRepository
+
+        blobs = SummaryRepository.hourly_blobs(kind, sources, start, end)
+
+        result = {}
+        needs_rows = False
+        for day, blob in blobs:
+            if blob and blob.get('hourly_data'):
+                result[day] = blob['hourly_data']
+            else:
+                needs_rows = True
+
+        if needs_rows:
+            for day, hourly_data in cls._read_rows(kind, sources, start, end).items():
+                result.setdefault(day, hourly_data)
+
+        return result
+
+    @classmethod
+    async def ahourly(cls, summary) -> List[dict]:
+        """hourly() for async views (table rows read with the async ORM)"""
+        blob = summary.hourly_data_json or {}
+        if 'hourly_data' in blob:
+            return blob['hourly_data']
+
+        kind = cls.kind_of(summary)
+        rows = cls._rows_queryset(kind, [summary.data_source], summary.date, summary.date)
+        return cls._group_rows(kind, [row async for row in rows]).get(summary.date, [])
+
+    @classmethod
+    def _read_rows(cls, kind: str, sources: List[str], start: date, end: date) -> Dict[date, List[dict]]:
+        return cls._group_rows(kind, cls._rows_queryset(kind, sources, start, end))
+
+    @classmethod
+    def _rows_queryset(cls, kind: str, sources: List[str], start: date, end: date):
+        return cls.RECORD_MODELS[kind].objects.filter(
+            data_source__in=sources, date__gte=start, date__lte=end
+        ).order_by('date', 'hour').values_list('date', 'hour', *cls.FIELDS[kind])
+
+    @classmethod
+    def _group_rows(cls, kind: str, rows) -> Dict[date, List[dict]]:
+        fields = cls.FIELDS[kind]
+        result: Dict[date, List[dict]] = {}
+        for day, hour, *values in rows:
+            # Fields a source never had (e.g. ESIOS price) stay absent, as in the blob
+            record = {'hour': hour.strftime('%H:%M')}
+            record.update((field, value) for field, value in zip(fields, values) if value is not None)
+            result.setdefault(day, []).append(record)
+        return result
+
+    # =========================================================================
+    # SQL-side aggregation (table backend only)
+    # =========================================================================
+
+    @classmethod
+    def daily_energy_stats(cls, sources: List[str], start: date, end: date) -> Dict[date, dict]:
+        """Per-day VRE/demand aggregates computed in the database"""
+        rows = HourlyEnergyRecord.objects.filter(
+            data_source__in=sources, date__gte=start, date__lte=end
+        ).values('date').annotate(
+            avg_vre_pct=Avg('vre_pct'),
+            min_vre_pct=Min('vre_pct'),
+            peak_vre_pct=Max('vre_pct'),
+            peak_demand=Max('demand'),
+            peak_vre=Max('vre_total'),
+            total_vre_gwh=Sum('vre_total'),
+        ).order_by('date')
+
+        return {row.pop('date'): row for row in rows}
+
+    @classmethod
+    def convert(cls, kind: str, summary, to_backend: str) -> Optional[str]:
+        """
+        Move one summary's hourly data between backends.
+        Returns the backend it ended up in, or None if there was nothing to move.
+        """
+        blob = dict(summary.hourly_data_json or {})
+
+        if to_backend == 'table':
+            if not blob.get('hourly_data'):
+                return None
+            cls.write_rows(kind, [(summary.date, summary.data_source, blob.pop('hourly_data'))])
+        else:
+            if 'hourly_data' in blob:
+                return None
+            blob['hourly_data'] = cls.hourly(summary)
+            cls.RECORD_MODELS[kind].objects.filter(date=summary.date, data_source=summary.data_source).delete()
+
+        summary.hourly_data_json = blob
+        summary.save(update_fields=['hourly_data_json', 'updated_at'])
+        return to_backend
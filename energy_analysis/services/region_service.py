@@ -3,7 +3,13 @@
 Simple routing layer - picks the right service per region.
 Keeps views clean, existing services untouched.
 """
+from django.conf import settings
+from django.core.cache import cache
+from typing import Optional
 import logging
+from .hourly_store import HourlyStore
+from .single_flight import SingleFlight
+from .summary_repository import SummaryRepository
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +18,20 @@ class RegionService:
     
     SUPPORTED_REGIONS = ['california', 'spain']
     
+    # DailyEnergySummary / DailyCurtailmentSummary data_source values per region
+    REGION_SOURCES = {
+        'california': ['caiso'],
+        'spain': ['database', 'esios'],
+    }
+    
+    @classmethod
+    def region_for_source(cls, data_source: str) -> str:
+        """Reverse of REGION_SOURCES"""
+        for region, sources in cls.REGION_SOURCES.items():
+            if data_source in sources:
+                return region
+        return data_source
+    
     @classmethod
     def get_chart_data(cls, region: str, date: str) -> dict:
         """
@@ -23,14 +43,155 @@ class RegionService:
         else:
             return cls._get_spain_data(date)
     
+    @classmethod
+    def get_chart_data_range(cls, region: str, start: str, end: str, resolution: str = 'hour',
+                             queue_missing: bool = False) -> dict:
+        """Columnar chart data for the stored days of a date window (see ChartRangeService)."""
+        from .chart_range_service import ChartRangeService
+        return ChartRangeService.get_range(region, start, end, resolution, queue_missing=queue_missing)
+    
     @classmethod
     def _get_spain_data(cls, date: str) -> dict:
         """Use existing DailySummaryService"""
         from .daily_summary_service import DailySummaryService
         
         summary, created = DailySummaryService.get_or_create_summary(date)
-        hourly_data = summary.hourly_data_json['hourly_data']
+        return cls._spain_chart_payload(date, summary, HourlyStore.hourly(summary), was_cached=not created)
+    
+    @classmethod
+    def _get_california_data(cls, date: str) -> dict:
+        """
+        Use GridStatusService for CAISO, with DB caching. Settled days are
+        persisted; concurrent cold requests for a date share one fetch.
+        """
+        from datetime import datetime
+        
+        date_obj = datetime.fromisoformat(date).date()
         
+        def lookup():
+            # The chart payload is built from the hourly arrays alone
+            summary = SummaryRepository.get(SummaryRepository.ENERGY, date_obj, ['caiso'], SummaryRepository.HOURLY)
+            if summary is None:
+                return cache.get(cls._live_key('energy', date))
+            return cls._california_chart_payload(date, summary, HourlyStore.hourly(summary))
+        
+        def fetch():
+            from .gridstatus_service import GridStatusService
+            from .daily_summary_service import DailySummaryService
+            
+            data = GridStatusService('caiso').fetch_day_data(date)
+            if data is None:
+                raise ValueError(f"No CAISO data available for {date}")
+            
+            result = {
+                'date': date,
+                'hourly_data': data['hourly_data'],
+                'daily_insights': data['daily_insights'],
+                'data_source': 'caiso',
+            }
+            cls._persist_or_hold('energy', date, result,
+                                 lambda: DailySummaryService.build_caiso_summary(date_obj, data).save())
+            return result
+        
+        result, created = SingleFlight.get_or_create(f"energy_summary:california:{date_obj}", lookup, fetch)
+        return {**result, 'was_cached': not created}
+    
+    @classmethod
+    def get_curtailment_data(cls, region: str, date: str) -> dict:
+        """Returns normalized curtailment data for any region."""
+        if region == 'california':
+            return cls._get_california_curtailment(date)
+        else:
+            return cls._get_spain_curtailment(date)
+    
+    @classmethod
+    def _get_spain_curtailment(cls, date: str) -> dict:
+        """Use existing DailyCurtailmentService"""
+        from .daily_curtailment_service import DailyCurtailmentService
+        
+        summary, created = DailyCurtailmentService.get_or_create_summary(date)
+        return cls._spain_curtailment_payload(date, summary, HourlyStore.hourly(summary), was_cached=not created)
+    
+    @classmethod
+    def _get_california_curtailment(cls, date: str) -> dict:
+        """
+        Use GridStatusService for CAISO curtailment, with DB caching.
+        Same single-flight / persistence rules as _get_california_data.
+        """
+        from datetime import datetime
+        
+        date_obj = datetime.fromisoformat(date).date()
+        
+        def lookup():
+            summary = SummaryRepository.get(SummaryRepository.CURTAILMENT, date_obj, ['caiso'])
+            if summary is None:
+                return cache.get(cls._live_key('curtailment', date))
+            return cls._california_curtailment_payload(date, summary, HourlyStore.hourly(summary))
+        
+        def fetch():
+            from .gridstatus_service import GridStatusService
+            from .daily_curtailment_service import DailyCurtailmentService
+            
+            data = GridStatusService('caiso').fetch_curtailment_data(date)
+            if data is None:
+                raise ValueError(f"No CAISO curtailment data available for {date}")
+            
+            result = {
+                'date': date,
+                'hourly_data': data['hourly_data'],
+                'daily_insights': data['daily_insights'],
+                'curtailment_breakdown': data.get('curtailment_breakdown', {}),
+            }
+            cls._persist_or_hold('curtailment', date, result,
+                                 lambda: DailyCurtailmentService.build_caiso_summary(date_obj, data).save())
+            return result
+        
+        result, created = SingleFlight.get_or_create(f"curtailment_summary:california:{date_obj}", lookup, fetch)
+        return {**result, 'was_cached': not created}
+    
+    # =========================================================================
+    # Async reads of stored days (see async_views)
+    # =========================================================================
+    
+    @classmethod
+    async def aget_stored_chart_data(cls, region: str, date: str) -> Optional[dict]:
+        """get_chart_data for a day already in the database, via the async ORM; None if not stored"""
+        projection = SummaryRepository.HOURLY if region == 'california' else SummaryRepository.FULL
+        summary = await cls._afirst_summary(SummaryRepository.ENERGY, region, date, projection)
+        if summary is None:
+            return None
+        
+        hourly_data = await HourlyStore.ahourly(summary)
+        if region == 'california':
+            return {**cls._california_chart_payload(date, summary, hourly_data), 'was_cached': True}
+        return cls._spain_chart_payload(date, summary, hourly_data, was_cached=True)
+    
+    @classmethod
+    async def aget_stored_curtailment_data(cls, region: str, date: str) -> Optional[dict]:
+        """get_curtailment_data for a day already in the database; None if not stored"""
+        summary = await cls._afirst_summary(SummaryRepository.CURTAILMENT, region, date)
+        if summary is None:
+            return None
+        
+        hourly = await HourlyStore.ahourly(summary)
+        if region == 'california':
+            return {**cls._california_curtailment_payload(date, summary, hourly), 'was_cached': True}
+        return cls._spain_curtailment_payload(date, summary, hourly, was_cached=True)
+    
+    @classmethod
+    async def _afirst_summary(cls, kind: str, region: str, date: str, projection: str = SummaryRepository.FULL):
+        from datetime import datetime
+        
+        date_obj = datetime.fromisoformat(date).date()
+        sources = cls.REGION_SOURCES['california' if region == 'california' else 'spain']
+        return await SummaryRepository.aget(kind, date_obj, sources, projection)
+    
+    # =========================================================================
+    # Payloads (shared by the sync lookups and the async views)
+    # =========================================================================
+    
+    @classmethod
+    def _spain_chart_payload(cls, date: str, summary, hourly_data: list, was_cached: bool) -> dict:
         daily_insights = {
             'peak_vre_pct': summary.peak_vre_penetration,
             'peak_vre_hour': summary.peak_vre_hour.strftime('%H:%M'),
@@ -57,64 +218,20 @@ class RegionService:
             'hourly_data': hourly_data,
             'daily_insights': daily_insights,
             'data_source': summary.data_source,
-            'was_cached': not created
+            'was_cached': was_cached
         }
     
-    @classmethod
-    @classmethod
-    def _get_california_data(cls, date: str) -> dict:
-        """Use GridStatusService for CAISO, with DB caching"""
-        from ..models import DailyEnergySummary
-        from datetime import datetime
-        
-        date_obj = datetime.fromisoformat(date).date()
-        
-        # Check cache first
-        try:
-            summary = DailyEnergySummary.objects.get(date=date_obj, data_source='caiso')
-            return {
-                'date': date,
-                'hourly_data': summary.hourly_data_json['hourly_data'],
-                'daily_insights': summary.hourly_data_json.get('daily_insights', {}),
-                'data_source': 'caiso',
-                'was_cached': True
-            }
-        except DailyEnergySummary.DoesNotExist:
-            pass
-        
-        # Fetch live
-        from .gridstatus_service import GridStatusService
-        
-        svc = GridStatusService('caiso')
-        data = svc.fetch_day_data(date)
-        
-        if data is None:
-            raise ValueError(f"No CAISO data available for {date}")
-        
+    @staticmethod
+    def _california_chart_payload(date: str, summary, hourly_data: list) -> dict:
         return {
             'date': date,
-            'hourly_data': data['hourly_data'],
-            'daily_insights': data['daily_insights'],
+            'hourly_data': hourly_data,
+            'daily_insights': summary.hourly_data_json.get('daily_insights', {}),
             'data_source': 'caiso',
-            'was_cached': False
         }
     
-    @classmethod
-    def get_curtailment_data(cls, region: str, date: str) -> dict:
-        """Returns normalized curtailment data for any region."""
-        if region == 'california':
-            return cls._get_california_curtailment(date)
-        else:
-            return cls._get_spain_curtailment(date)
-    
-    @classmethod
-    def _get_spain_curtailment(cls, date: str) -> dict:
-        """Use existing DailyCurtailmentService"""
-        from .daily_curtailment_service import DailyCurtailmentService
-        
-        summary, created = DailyCurtailmentService.get_or_create_summary(date)
-        hourly = summary.hourly_data_json['hourly_data']
-        
+    @staticmethod
+    def _spain_curtailment_payload(date: str, summary, hourly: list, was_cached: bool) -> dict:
         return {
             'date': date,
             'hourly_data': hourly,
@@ -128,57 +245,44 @@ class RegionService:
                 'negative_price_curtailed_mwh': round(sum(h['curtailed_mwh'] for h in hourly if h['spot_price'] < 0), 1),
             },
             'curtailment_breakdown': {},
-            'was_cached': not created
+            'was_cached': was_cached
         }
     
-    @classmethod  
-    def _get_california_curtailment(cls, date: str) -> dict:
-        """Use GridStatusService for CAISO curtailment, with DB caching"""
-        from ..models import DailyCurtailmentSummary
-        from datetime import datetime
-        
-        date_obj = datetime.fromisoformat(date).date()
-        
-        # Check cache first
-        try:
-            summary = DailyCurtailmentSummary.objects.get(date=date_obj, data_source='caiso')
-            hourly = summary.hourly_data_json['hourly_data']
-            
-            return {
-                'date': date,
-                'hourly_data': hourly,
-                'daily_insights': {
-                    'total_curtailed_mwh': summary.total_curtailed_mwh,
-                    'estimated_revenue_lost_usd': summary.estimated_revenue_lost_eur,  # It's actually USD
-                    'peak_curtailment_mwh': summary.peak_curtailment_mwh,
-                    'peak_curtailment_hour': summary.peak_curtailment_hour.strftime('%H:%M'),
-                    'curtailment_hours': sum(1 for h in hourly if h['curtailed_mwh'] > 0),
-                    'negative_price_hours': sum(1 for h in hourly if h['spot_price'] < 0),
-                    'negative_price_curtailed_mwh': round(sum(h['curtailed_mwh'] for h in hourly if h['spot_price'] < 0), 1),
-                },
-                'curtailment_breakdown': summary.hourly_data_json.get('curtailment_breakdown', {}),
-                'was_cached': True
-            }
-        except DailyCurtailmentSummary.DoesNotExist:
-            pass
-        
-        # Fetch live
-        from .gridstatus_service import GridStatusService
-        
-        svc = GridStatusService('caiso')
-        data = svc.fetch_curtailment_data(date)
-        
-        if data is None:
-            raise ValueError(f"No CAISO curtailment data available for {date}")
-        
+    @staticmethod
+    def _california_curtailment_payload(date: str, summary, hourly: list) -> dict:
         return {
             'date': date,
-            'hourly_data': data['hourly_data'],
-            'daily_insights': data['daily_insights'],
-            'curtailment_breakdown': data.get('curtailment_breakdown', {}),
-            'was_cached': False
+            'hourly_data': hourly,
+            'daily_insights': {
+                'total_curtailed_mwh': summary.total_curtailed_mwh,
+                'estimated_revenue_lost_usd': summary.estimated_revenue_lost_eur,  # It's actually USD
+                'peak_curtailment_mwh': summary.peak_curtailment_mwh,
+                'peak_curtailment_hour': summary.peak_curtailment_hour.strftime('%H:%M'),
+                'curtailment_hours': sum(1 for h in hourly if h['curtailed_mwh'] > 0),
+                'negative_price_hours': sum(1 for h in hourly if h['spot_price'] < 0),
+                'negative_price_curtailed_mwh': round(sum(h['curtailed_mwh'] for h in hourly if h['spot_price'] < 0), 1),
+            },
+            'curtailment_breakdown': summary.hourly_data_json.get('curtailment_breakdown', {}),
         }
     
+    @staticmethod
+    def _live_key(kind: str, date: str) -> str:
+        return f"caiso_live:{kind}:{date}"
+    
+    @classmethod
+    def _persist_or_hold(cls, kind: str, date: str, result: dict, save):
+        """
+        Settled days are saved as summaries. Today/yesterday are still being
+        revised upstream, so they are only held briefly in the cache for the
+        requests that were waiting on the same fetch.
+        """
+        from .response_cache import ResponseCache
+        
+        if ResponseCache.is_historical(date):
+            save()
+        else:
+            cache.set(cls._live_key(kind, date), result, getattr(settings, 'SINGLE_FLIGHT_TIMEOUT', 60))
+    
     @staticmethod
     def _get_vre_pct_at_hour(hourly_data, target_time):
         """Helper to get VRE percentage at specific hour"""
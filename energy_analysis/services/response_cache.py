@@ -0,0 +1,171 @@
+# services/response_cache.py
+"""
+Response cache for the per-day energy endpoints.
+
+Payloads are stored in the Django cache keyed by endpoint/region/date together
+with an ETag and Last-Modified stamp, so repeat hits skip building the payload
+and browsers/CDNs can revalidate with a 304.
+
+The key also carries the stored summary's updated_at (one indexed lookup per
+request), so a rewrite from any process - the other web worker, the fetch-job
+worker, backfill/rebuild commands - moves readers to a fresh entry even when
+the cache is per-process LocMem. Same-process rewrites also drop the entry
+directly (see signals.py).
+"""
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+import hashlib
+import json
+import logging
+from .summary_repository import SummaryRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+
+    PREFIX = 'energy_response'
+    ENDPOINTS = ('chart_data', 'curtailment_data')
+
+    @classmethod
+    def key(cls, endpoint: str, region: str, date_str: str, version: Optional[float] = None) -> str:
+        return f"{cls.PREFIX}:{endpoint}:{region}:{date_str}:{version or 0}"
+
+    @classmethod
+    def get(cls, endpoint: str, region: str, date_str: str) -> Optional[dict]:
+        version = cls.data_version(endpoint, region, date_str)
+        return cache.get(cls.key(endpoint, region, date_str, version))
+
+    @classmethod
+    def set(cls, endpoint: str, region: str, date_str: str, payload: dict) -> dict:
+        """Store a payload and return the cache entry (payload, etag, last_modified)"""
+        entry = cls._entry(payload)
+        # Versioned after producing: a cold day's summary has only just been written
+        version = cls.data_version(endpoint, region, date_str)
+        cache.set(cls.key(endpoint, region, date_str, version), entry, cls.timeout_for(date_str))
+        return entry
+
+    @classmethod
+    def data_version(cls, endpoint: str, region: str, date_str: str) -> Optional[float]:
+        """updated_at of the summary behind the response; None if not stored (or bad input)"""
+        lookup = cls._version_lookup(endpoint, region, date_str)
+        return SummaryRepository.version(*lookup) if lookup else None
+
+    @classmethod
+    async def adata_version(cls, endpoint: str, region: str, date_str: str) -> Optional[float]:
+        lookup = cls._version_lookup(endpoint, region, date_str)
+        return await SummaryRepository.aversion(*lookup) if lookup else None
+
+    @staticmethod
+    def _version_lookup(endpoint: str, region: str, date_str: str):
+        from .region_service import RegionService
+
+        sources = RegionService.REGION_SOURCES.get(region)
+        try:
+            day = date.fromisoformat(date_str)
+        except (TypeError, ValueError):
+            return None
+        if sources is None:
+            return None
+        kind = SummaryRepository.ENERGY if endpoint == 'chart_data' else SummaryRepository.CURTAILMENT
+        return kind, day, sources
+
+    @classmethod
+    def _entry(cls, payload: dict) -> dict:
+        return {
+            'payload': payload,
+            'etag': cls.etag_for(payload),
+            'last_modified': timezone.now().timestamp(),
+        }
+
+    @classmethod
+    def invalidate(cls, region: str, date_str: str, endpoints=ENDPOINTS):
+        """Drop the current entries (older versions are no longer looked up and expire)"""
+        cache.delete_many([
+            cls.key(endpoint, region, date_str, cls.data_version(endpoint, region, date_str))
+            for endpoint in endpoints
+        ])
+        logger.debug(f"Invalidated cached responses for {region} {date_str}")
+
+    @staticmethod
+    def etag_for(payload: dict) -> str:
+        body = json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder)
+        return quote_etag(hashlib.sha1(body.encode()).hexdigest())
+
+    @staticmethod
+    def variant_etag(request, etag: str) -> str:
+        """
+        Distinct strong ETag per representation: the negotiated renderer's
+        format is appended for anything but plain JSON (DRF requests only -
+        the async views always serve JSON).
+        """
+        renderer_format = getattr(getattr(request, 'accepted_renderer', None), 'format', 'json')
+        if renderer_format == 'json':
+            return etag
+        return quote_etag(etag.strip('"') + '-' + renderer_format)
+
+    @staticmethod
+    def is_historical(date_str: str) -> bool:
+        """Days before yesterday are settled upstream and never change"""
+        try:
+            return date.fromisoformat(date_str) < date.today() - timedelta(days=1)
+        except ValueError:
+            return False
+
+    @classmethod
+    def timeout_for(cls, date_str: str) -> int:
+        if cls.is_historical(date_str):
+            return getattr(settings, 'ENERGY_RESPONSE_CACHE_TIMEOUT', 60 * 60 * 24 * 30)
+        return getattr(settings, 'ENERGY_RESPONSE_CACHE_RECENT_TIMEOUT', 60 * 5)
+
+    @classmethod
+    def respond(cls, request, endpoint: str, region: str, date_str: str, producer: Callable[[], dict]):
+        """
+        Serve from cache (or build via producer) with conditional-request support.
+        Exceptions from producer propagate; only successful payloads are cached.
+        """
+        entry = cls.get(endpoint, region, date_str)
+        if entry is None:
+            entry = cls.set(endpoint, region, date_str, producer())
+
+        return cls._conditional_response(request, entry, date_str, Response)
+
+    @classmethod
+    async def arespond(cls, request, endpoint: str, region: str, date_str: str, producer: Callable[[], Awaitable[dict]]):
+        """respond() for async views: producer is a coroutine function, the response a JsonResponse"""
+        version = await cls.adata_version(endpoint, region, date_str)
+        entry = await cache.aget(cls.key(endpoint, region, date_str, version))
+        if entry is None:
+            entry = cls._entry(await producer())
+            version = await cls.adata_version(endpoint, region, date_str)
+            await cache.aset(cls.key(endpoint, region, date_str, version), entry, cls.timeout_for(date_str))
+
+        return cls._conditional_response(
+            request, entry, date_str, lambda payload: JsonResponse(payload, encoder=JSONEncoder)
+        )
+
+    @classmethod
+    def _conditional_response(cls, request, entry: dict, date_str: str, response_class):
+        last_modified = int(entry['last_modified'])
+        etag = cls.variant_etag(request, entry['etag'])
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        response = not_modified if not_modified is not None else response_class(entry['payload'])
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Same payload, several representations (JSON / columnar / Arrow)
+        patch_vary_headers(response, ['Accept'])
+        if cls.is_historical(date_str):
+            patch_cache_control(response, public=True, max_age=60 * 60 * 24, immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=60, must_revalidate=True)
+        return response
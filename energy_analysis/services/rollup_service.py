@@ -0,0 +1,209 @@
+# services/rollup_service.py
+"""
+Weekly / monthly / yearly rollups of DailyEnergySummary (EnergyRollup).
+
+A newly created daily summary is added to its three periods in place
+(apply_day, wired to post_save). Rewrites, deletes and bulk writes that skip
+signals call refresh_days instead, which recomputes the touched periods from
+the daily rows. Long-horizon reads (get_rollups) only touch rollup rows.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+from django.db import transaction
+import logging
+from ..models import DailyEnergySummary, EnergyRollup
+from .hourly_store import HourlyStore
+from .summary_repository import SummaryRepository
+
+logger = logging.getLogger(__name__)
+
+
+class RollupService:
+
+    PERIODS = ('week', 'month', 'year')
+
+    # Daily max net-load ramp buckets (GW); last bucket is open-ended
+    RAMP_BUCKETS = [(0, 1), (1, 2), (2, 3), (3, 5), (5, None)]
+
+    SUM_FIELDS = [
+        'days_count', 'peak_vre_pct_sum', 'vre_pct_sum', 'sustained_high_vre_hours',
+        'total_vre_gwh', 'total_demand_gwh', 'max_ramp_gw_sum', 'price_hours', 'negative_price_hours',
+    ]
+    MAX_FIELDS = ['peak_vre_pct_max', 'max_ramp_gw_max']
+
+    # =========================================================================
+    # Period helpers
+    # =========================================================================
+
+    @staticmethod
+    def period_start(period: str, day: date) -> date:
+        if period == 'week':
+            return day - timedelta(days=day.weekday())
+        if period == 'month':
+            return day.replace(day=1)
+        return day.replace(month=1, day=1)
+
+    @staticmethod
+    def period_end(period: str, start: date) -> date:
+        """Last day of the period starting at `start`"""
+        if period == 'week':
+            return start + timedelta(days=6)
+        if period == 'month':
+            next_month = date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+            return next_month - timedelta(days=1)
+        return date(start.year, 12, 31)
+
+    @classmethod
+    def ramp_bucket(cls, ramp_gw: float) -> str:
+        for low, high in cls.RAMP_BUCKETS:
+            if high is None or ramp_gw < high:
+                return f"{low}-{high}" if high is not None else f"{low}+"
+        return f"{cls.RAMP_BUCKETS[-1][0]}+"
+
+    # =========================================================================
+    # Day contributions
+    # =========================================================================
+
+    @classmethod
+    def day_contribution(cls, peak_vre_pct: float, max_ramp_gw: float, sustained_hours: int, hourly: List[dict]) -> Dict:
+        """What one day adds to each of its rollups"""
+        vre_pcts = [h['vre_pct'] for h in hourly if h.get('vre_pct') is not None]
+        prices = [h['price'] for h in hourly if h.get('price') is not None]
+
+        return {
+            'days_count': 1,
+            'peak_vre_pct_sum': peak_vre_pct,
+            'peak_vre_pct_max': peak_vre_pct,
+            'vre_pct_sum': sum(vre_pcts) / len(vre_pcts) if vre_pcts else 0,
+            'sustained_high_vre_hours': sustained_hours,
+            'total_vre_gwh': sum(h.get('vre_total') or 0 for h in hourly),
+            'total_demand_gwh': sum(h.get('demand') or 0 for h in hourly),
+            'max_ramp_gw_sum': max_ramp_gw,
+            'max_ramp_gw_max': max_ramp_gw,
+            'ramp_bucket': cls.ramp_bucket(max_ramp_gw),
+            'price_hours': len(prices),
+            'negative_price_hours': sum(1 for p in prices if p < 0),
+        }
+
+    @classmethod
+    def _merge(cls, rollup: EnergyRollup, contribution: Dict):
+        for field in cls.SUM_FIELDS:
+            setattr(rollup, field, getattr(rollup, field) + contribution[field])
+        for field in cls.MAX_FIELDS:
+            current = getattr(rollup, field)
+            setattr(rollup, field, contribution[field] if current is None else max(current, contribution[field]))
+
+        histogram = dict(rollup.ramp_histogram or {})
+        histogram[contribution['ramp_bucket']] = histogram.get(contribution['ramp_bucket'], 0) + 1
+        rollup.ramp_histogram = histogram
+
+    # =========================================================================
+    # Incremental apply (new day)
+    # =========================================================================
+
+    @classmethod
+    def apply_day(cls, summary: DailyEnergySummary):
+        """Add a newly created summary to its week, month and year"""
+        from .region_service import RegionService
+
+        region = RegionService.region_for_source(summary.data_source)
+        contribution = cls.day_contribution(
+            summary.peak_vre_penetration, summary.max_netload_ramp_gw,
+            summary.sustained_high_vre_hours, HourlyStore.hourly(summary)
+        )
+
+        with transaction.atomic():
+            for period in cls.PERIODS:
+                rollup, _ = EnergyRollup.objects.select_for_update().get_or_create(
+                    region=region, period=period, period_start=cls.period_start(period, summary.date)
+                )
+                cls._merge(rollup, contribution)
+                rollup.save()
+
+    # =========================================================================
+    # Recompute (rewrites, deletes, bulk writes)
+    # =========================================================================
+
+    @classmethod
+    def refresh_days(cls, region: str, days: Iterable[date]) -> int:
+        """
+        Recompute every week/month/year that contains one of `days` from the
+        daily rows (one summary query, hourly data via HourlyStore). Idempotent.
+        Returns the number of rollup rows written.
+        """
+        days = set(days)
+        if not days:
+            return 0
+
+        keys = {(period, cls.period_start(period, day)) for day in days for period in cls.PERIODS}
+        span_start = min(start for _, start in keys)
+        span_end = max(cls.period_end(period, start) for period, start in keys)
+
+        rollups = cls._compute(region, span_start, span_end, keys)
+
+        with transaction.atomic():
+            # Periods whose last day was deleted
+            for period, start in keys - rollups.keys():
+                EnergyRollup.objects.filter(region=region, period=period, period_start=start).delete()
+
+            EnergyRollup.objects.bulk_create(
+                list(rollups.values()),
+                update_conflicts=True,
+                unique_fields=['region', 'period', 'period_start'],
+                update_fields=cls.SUM_FIELDS + cls.MAX_FIELDS + ['ramp_histogram', 'updated_at'],
+            )
+
+        return len(rollups)
+
+    @classmethod
+    def rebuild(cls, region: str, start: Optional[date] = None, end: Optional[date] = None) -> int:
+        """Recompute every period with daily data in [start, end] (default: all)"""
+        from .region_service import RegionService
+
+        days = SummaryRepository.dates(SummaryRepository.ENERGY, RegionService.REGION_SOURCES[region], start, end)
+        return cls.refresh_days(region, days)
+
+    @classmethod
+    def _compute(cls, region: str, span_start: date, span_end: date, keys) -> Dict:
+        from .region_service import RegionService
+
+        sources = RegionService.REGION_SOURCES[region]
+        summaries = SummaryRepository.metric_rows(
+            SummaryRepository.ENERGY,
+            ['peak_vre_penetration', 'max_netload_ramp_gw', 'sustained_high_vre_hours'],
+            sources, span_start, span_end,
+        )
+        hourly_by_date = HourlyStore.hourly_for_range(HourlyStore.ENERGY, sources, span_start, span_end)
+
+        rollups = {}
+        for day, peak_vre_pct, max_ramp_gw, sustained_hours in summaries:
+            contribution = cls.day_contribution(
+                peak_vre_pct, max_ramp_gw, sustained_hours, hourly_by_date.get(day, [])
+            )
+            for period in cls.PERIODS:
+                key = (period, cls.period_start(period, day))
+                if key not in keys:
+                    continue
+                if key not in rollups:
+                    rollups[key] = EnergyRollup(
+                        region=region, period=period, period_start=key[1], **{field: 0 for field in cls.SUM_FIELDS}
+                    )
+                cls._merge(rollups[key], contribution)
+
+        return rollups
+
+    # =========================================================================
+    # Read
+    # =========================================================================
+
+    @classmethod
+    def get_rollups(cls, region: str, period: str, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict]:
+        if period not in cls.PERIODS:
+            raise ValueError(f"period must be one of {', '.join(cls.PERIODS)}")
+
+        rollups = EnergyRollup.objects.filter(region=region, period=period)
+        if start:
+            rollups = rollups.filter(period_start__gte=cls.period_start(period, start))
+        if end:
+            rollups = rollups.filter(period_start__lte=end)
+        return [rollup.to_dict() for rollup in rollups.order_by('period_start')]
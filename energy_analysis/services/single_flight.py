@@ -0,0 +1,117 @@
+# services/single_flight.py
+"""
+Single-flight coalescing for cold-date summary creation.
+
+When several requests (possibly in different gunicorn workers) ask for the
+same uncached date, only the first one fetches upstream and writes the
+summary; the others wait on a per-key lock and then read its result.
+
+The lock is a PostgreSQL advisory lock when the database supports it, and
+otherwise a cache.add() lease - shared across workers as long as the cache
+backend is (file/Redis; the default locmem cache only coalesces per process).
+"""
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+import hashlib
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+
+    POLL_SECONDS = 0.1
+    CACHE_PREFIX = 'single_flight'
+
+    @classmethod
+    def get_or_create(cls, key: str, lookup: Callable[[], Optional[object]], create: Callable[[], object]) -> Tuple[object, bool]:
+        """
+        lookup() returns the existing result or None; create() produces it.
+        Returns (result, created). Waiters re-run lookup() once the lock is
+        theirs, so create() runs at most once per key at a time.
+        """
+        result = lookup()
+        if result is not None:
+            return result, False
+
+        with cls.lock(key):
+            # Whoever held the lock before us has probably created it
+            result = lookup()
+            if result is not None:
+                return result, False
+
+            try:
+                return create(), True
+            except IntegrityError:
+                # Lost a race with a writer that doesn't take the lock (e.g. a backfill)
+                result = lookup()
+                if result is None:
+                    raise
+                return result, False
+
+    @classmethod
+    @contextmanager
+    def lock(cls, key: str, timeout: Optional[float] = None):
+        """
+        Hold the per-key lock for the duration of the block. If it can't be
+        acquired within `timeout` seconds the block runs anyway (uncoordinated)
+        rather than failing the request.
+        """
+        if timeout is None:
+            timeout = getattr(settings, 'SINGLE_FLIGHT_TIMEOUT', 60)
+
+        if connection.vendor == 'postgresql':
+            acquire, release = cls._advisory_lock(key)
+        else:
+            acquire, release = cls._cache_lease(key, timeout)
+
+        deadline = time.monotonic() + timeout
+        acquired = acquire()
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(cls.POLL_SECONDS)
+            acquired = acquire()
+
+        if not acquired:
+            logger.warning(f"Single-flight lock {key} not acquired after {timeout}s, continuing without it")
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                release()
+
+    @classmethod
+    def _advisory_lock(cls, key: str):
+        lock_id = int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], 'big', signed=True)
+
+        def acquire():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [lock_id])
+                return cursor.fetchone()[0]
+
+        def release():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [lock_id])
+
+        return acquire, release
+
+    @classmethod
+    def _cache_lease(cls, key: str, timeout: float):
+        cache_key = f"{cls.CACHE_PREFIX}:{key}"
+        token = uuid.uuid4().hex
+        # Outlive the wait so a crashed holder can't block forever
+        lease_seconds = int(timeout) * 2 or 1
+
+        def acquire():
+            return cache.add(cache_key, token, lease_seconds)
+
+        def release():
+            if cache.get(cache_key) == token:
+                cache.delete(cache_key)
+
+        return acquire, release
@@ -0,0 +1,149 @@
+# services/summary_repository.py
+"""
+Read access to DailyEnergySummary / DailyCurtailmentSummary with explicit
+projections, so callers only pull the columns they use.
+
+hourly_data_json is by far the widest column (24+ hour dicts plus insights),
+and most reads need either the scalar metrics or the hourly arrays, rarely
+both:
+
+- METRICS: every column except hourly_data_json (defer)
+- HOURLY:  identity columns + hourly_data_json (only) - enough for HourlyStore
+- FULL:    the whole row
+- prices(): (hour, price) pairs only - straight from HourlyEnergyRecord with
+  the table backend; with the json backend prices live inside the blob, so
+  blobs are still read but nothing else is
+
+Existence and date-set checks never load model instances at all.
+"""
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..models import DailyCurtailmentSummary, DailyEnergySummary
+
+
+class SummaryRepository:
+
+    ENERGY = 'energy'
+    CURTAILMENT = 'curtailment'
+    MODELS = {
+        ENERGY: DailyEnergySummary,
+        CURTAILMENT: DailyCurtailmentSummary,
+    }
+
+    METRICS = 'metrics'
+    HOURLY = 'hourly'
+    FULL = 'full'
+
+    # What HourlyStore.hourly() and the signal handlers read from an instance
+    IDENTITY_FIELDS = ['id', 'date', 'data_source']
+
+    # =========================================================================
+    # Querysets
+    # =========================================================================
+
+    @classmethod
+    def queryset(cls, kind: str, projection: str = METRICS, sources: Optional[Iterable[str]] = None,
+                 day: Optional[date] = None, start: Optional[date] = None, end: Optional[date] = None):
+        summaries = cls.MODELS[kind].objects.all()
+
+        if sources is not None:
+            summaries = summaries.filter(data_source__in=list(sources))
+        if day is not None:
+            summaries = summaries.filter(date=day)
+        if start is not None:
+            summaries = summaries.filter(date__gte=start)
+        if end is not None:
+            summaries = summaries.filter(date__lte=end)
+
+        if projection == cls.METRICS:
+            return summaries.defer('hourly_data_json')
+        if projection == cls.HOURLY:
+            return summaries.only(*cls.IDENTITY_FIELDS, 'hourly_data_json')
+        if projection == cls.FULL:
+            return summaries
+        raise ValueError(f"Unknown projection: {projection}")
+
+    # =========================================================================
+    # Single day
+    # =========================================================================
+
+    @classmethod
+    def get(cls, kind: str, day: date, sources: Iterable[str], projection: str = FULL):
+        """The day's summary from any of `sources`, or None"""
+        return cls.queryset(kind, projection, sources=sources, day=day).first()
+
+    @classmethod
+    async def aget(cls, kind: str, day: date, sources: Iterable[str], projection: str = FULL):
+        return await cls.queryset(kind, projection, sources=sources, day=day).afirst()
+
+    @classmethod
+    def exists(cls, kind: str, day: date, sources: Iterable[str]) -> bool:
+        return cls.MODELS[kind].objects.filter(date=day, data_source__in=list(sources)).exists()
+
+    @classmethod
+    def version(cls, kind: str, day: date, sources: Iterable[str]) -> Optional[float]:
+        """The day's updated_at as a timestamp (None if not stored) - changes on every rewrite"""
+        updated_at = cls._version_queryset(kind, day, sources).first()
+        return updated_at.timestamp() if updated_at else None
+
+    @classmethod
+    async def aversion(cls, kind: str, day: date, sources: Iterable[str]) -> Optional[float]:
+        updated_at = await cls._version_queryset(kind, day, sources).afirst()
+        return updated_at.timestamp() if updated_at else None
+
+    @classmethod
+    def _version_queryset(cls, kind: str, day: date, sources: Iterable[str]):
+        return cls.MODELS[kind].objects.filter(
+            date=day, data_source__in=list(sources)
+        ).order_by('-updated_at').values_list('updated_at', flat=True)
+
+    # =========================================================================
+    # Ranges (values_list - no model instances)
+    # =========================================================================
+
+    @classmethod
+    def dates(cls, kind: str, sources: Iterable[str], start: Optional[date] = None,
+              end: Optional[date] = None) -> Set[date]:
+        return set(
+            cls.queryset(kind, cls.FULL, sources=sources, start=start, end=end).values_list('date', flat=True)
+        )
+
+    @classmethod
+    def metric_rows(cls, kind: str, fields: List[str], sources: Iterable[str], start: date, end: date):
+        """values_list('date', *fields) for the window - scalar columns only"""
+        return cls.queryset(kind, cls.FULL, sources=sources, start=start, end=end).values_list('date', *fields)
+
+    @classmethod
+    def hourly_blobs(cls, kind: str, sources: Iterable[str], start: date, end: date):
+        """values_list('date', 'hourly_data_json') for the window"""
+        return cls.queryset(kind, cls.FULL, sources=sources, start=start, end=end).values_list(
+            'date', 'hourly_data_json'
+        )
+
+    @classmethod
+    def prices(cls, sources: Iterable[str], start: date, end: date) -> Dict[date, List[Tuple[str, Optional[float]]]]:
+        """{date: [(hour 'HH:MM', price or None)]} for every energy summary in the window with hourly data"""
+        from ..models import HourlyEnergyRecord
+
+        sources = list(sources)
+        result: Dict[date, List[Tuple[str, Optional[float]]]] = {}
+        needs_rows = False
+
+        for day, blob in cls.hourly_blobs(cls.ENERGY, sources, start, end):
+            if blob and blob.get('hourly_data'):
+                result[day] = [(h['hour'], h.get('price')) for h in blob['hourly_data']]
+            else:
+                needs_rows = True
+
+        if needs_rows:
+            # Table backend: the price column alone
+            rows = HourlyEnergyRecord.objects.filter(
+                data_source__in=sources, date__gte=start, date__lte=end
+            ).order_by('date', 'hour').values_list('date', 'hour', 'price')
+            from_rows: Dict[date, List[Tuple[str, Optional[float]]]] = {}
+            for day, hour, price in rows:
+                from_rows.setdefault(day, []).append((hour.strftime('%H:%M'), price))
+            for day, pairs in from_rows.items():
+                result.setdefault(day, pairs)
+
+        return result
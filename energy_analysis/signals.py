@@ -0,0 +1,60 @@
+# signals.py
+"""Keep derived caches in step with summary writes."""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import DailyEnergySummary, DailyCurtailmentSummary
+from .services.daily_curtailment_service import MonthlyCurtailmentService
+from .services.region_service import RegionService
+from .services.response_cache import ResponseCache
+from .services.rollup_service import RollupService
+
+# Saves touching only these fields (e.g. set_total_hours, hourly storage moves) leave rollups alone
+ROLLUP_NEUTRAL_FIELDS = {'total_hours', 'hourly_data_json', 'updated_at'}
+
+
+@receiver([post_save, post_delete], sender=DailyEnergySummary)
+def invalidate_chart_responses(sender, instance, **kwargs):
+    region = RegionService.region_for_source(instance.data_source)
+    ResponseCache.invalidate(region, instance.date.isoformat(), endpoints=['chart_data'])
+
+
+@receiver([post_save, post_delete], sender=DailyCurtailmentSummary)
+def invalidate_curtailment_responses(sender, instance, **kwargs):
+    region = RegionService.region_for_source(instance.data_source)
+    ResponseCache.invalidate(region, instance.date.isoformat(), endpoints=['curtailment_data'])
+
+
+@receiver(post_save, sender=DailyEnergySummary)
+def update_energy_rollups(sender, instance, created, update_fields=None, **kwargs):
+    region = RegionService.region_for_source(instance.data_source)
+    if region not in RegionService.REGION_SOURCES:
+        return
+    if created:
+        RollupService.apply_day(instance)
+    elif update_fields is None or set(update_fields) - ROLLUP_NEUTRAL_FIELDS:
+        RollupService.refresh_days(region, [instance.date])
+
+
+@receiver(post_delete, sender=DailyEnergySummary)
+def remove_from_energy_rollups(sender, instance, **kwargs):
+    region = RegionService.region_for_source(instance.data_source)
+    if region in RegionService.REGION_SOURCES:
+        RollupService.refresh_days(region, [instance.date])
+
+
+@receiver(post_save, sender=DailyCurtailmentSummary)
+def update_monthly_curtailment(sender, instance, created, update_fields=None, **kwargs):
+    region = RegionService.region_for_source(instance.data_source)
+    if region not in RegionService.REGION_SOURCES:
+        return
+    if created:
+        MonthlyCurtailmentService.apply_day(instance)
+    elif update_fields is None or set(update_fields) - ROLLUP_NEUTRAL_FIELDS:
+        MonthlyCurtailmentService.build_month(instance.date.year, instance.date.month, region)
+
+
+@receiver(post_delete, sender=DailyCurtailmentSummary)
+def remove_from_monthly_curtailment(sender, instance, **kwargs):
+    region = RegionService.region_for_source(instance.data_source)
+    if region in RegionService.REGION_SOURCES:
+        MonthlyCurtailmentService.build_month(instance.date.year, instance.date.month, region)
@@ -1,3 +1,621 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from time import monotonic, sleep
+from types import SimpleNamespace
+from unittest import mock
+import json
+import math
+import threading
+import numpy as np
+import pyarrow as pa
+from .models import BESSConfig, DailyCurtailmentSummary, DailyEnergySummary, EnergyData, EnergyIndicator, EnergyRollup, FetchJob
+from .renderers import ArrowIPCRenderer, ColumnarJSONRenderer, to_columnar
+from .services.bess_backtest_service import BESSBacktestService
+from .services.bess_dispatch_optimizer import BESSDispatchOptimizer
+from .services.cache_warming_service import CacheWarmingService
+from .services.daily_curtailment_service import DailyCurtailmentService, MonthlyCurtailmentService
+from .services.daily_summary_service import DailySummaryService
+from .services.fetch_job_service import FetchJobService
+from .services.hourly_store import HourlyStore
+from .services.response_cache import ResponseCache
+from .services.rollup_service import RollupService
+from .services.single_flight import SingleFlight
+from .services.summary_repository import SummaryRepository
+from .utils.energy_calculations import EnergyMetricsCalculator
+from .utils.time_ranges import TimeRange
 
-# Create your tests here.
+
+class EnergyDataQueryPlanTests(TestCase):
+    """
+    The per-day EnergyData reads must be index range scans, not table scans.
+    A timestamp__date / __year filter or a join through indicator__ would
+    silently break this.
+    """
+
+    DAY = date(2024, 6, 20)
+
+    @classmethod
+    def setUpTestData(cls):
+        indicators = [
+            EnergyIndicator.objects.create(indicator_id=indicator_id, name=str(indicator_id), unit='MW')
+            for indicator_id in DailySummaryService.DATABASE_INDICATORS + [720, 721]
+        ]
+        start, _ = TimeRange.day(cls.DAY - timedelta(days=5))
+        EnergyData.objects.bulk_create([
+            EnergyData(indicator=indicator, timestamp=start + timedelta(hours=h), value=h, resolution='hour')
+            for indicator in indicators
+            for h in range(24 * 10)
+        ])
+
+    def assert_uses_index(self, queryset):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Tiny test tables would otherwise always be seq-scanned
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            elif connection.vendor != 'sqlite':
+                self.skipTest(f'No plan check for {connection.vendor}')
+
+        plan = queryset.explain()
+
+        if connection.vendor == 'postgresql':
+            self.assertIn('Index', plan, plan)
+            self.assertNotIn('Seq Scan on energy_analysis_energydata', plan, plan)
+        else:
+            # SEARCH = bounded index lookup; a full scan shows up as SCAN
+            self.assertIn('SEARCH energy_analysis_energydata USING', plan, plan)
+
+    def test_daily_summary_rows_use_index(self):
+        queryset = DailySummaryService._database_rows(*TimeRange.day(self.DAY))
+        self.assert_uses_index(queryset)
+        self.assertEqual(queryset.count(), 24 * len(DailySummaryService.DATABASE_INDICATORS))
+
+    def test_curtailment_rows_use_index(self):
+        queryset = DailyCurtailmentService._day_rows(self.DAY)
+        self.assert_uses_index(queryset)
+        self.assertEqual(queryset.count(), 24 * 3)
+
+    def test_day_range_is_half_open(self):
+        start, end = TimeRange.day(self.DAY)
+        self.assertEqual(end - start, timedelta(days=1))
+        self.assertFalse(
+            EnergyData.objects.filter(indicator_id=600, timestamp__gte=start, timestamp__lt=end)
+            .exclude(timestamp__date=self.DAY).exists()
+        )
+
+
+class FetchJobServiceTests(TestCase):
+
+    PARAMS = {'region': 'spain', 'date': '2024-06-20'}
+
+    def test_enqueue_reuses_active_job(self):
+        first = FetchJobService.enqueue('chart_data', self.PARAMS)
+        second = FetchJobService.enqueue('chart_data', dict(self.PARAMS))
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(FetchJob.objects.count(), 1)
+
+    def test_claim_is_exclusive(self):
+        job = FetchJobService.enqueue('chart_data', self.PARAMS)
+        claimed = FetchJobService.claim('worker-a')
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual(claimed.status, 'running')
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(FetchJobService.claim('worker-b'))
+
+    def test_finished_job_allows_new_one(self):
+        job = FetchJobService.enqueue('chart_data', self.PARAMS)
+        FetchJob.objects.filter(id=job.id).update(status='done')
+        self.assertNotEqual(FetchJobService.enqueue('chart_data', self.PARAMS).id, job.id)
+
+    def test_cold_detection(self):
+        self.assertTrue(FetchJobService.is_cold('chart_data', self.PARAMS))
+        self.assertFalse(FetchJobService.is_cold('chart_data', {'region': 'mars', 'date': '2024-06-20'}))
+        with self.assertRaises(ValueError):
+            FetchJobService.is_cold('chart_data', {'region': 'spain', 'date': 'not-a-date'})
+
+
+@override_settings(ENERGY_PREFETCH_ADJACENT=True, ENERGY_PREFETCH_RADIUS=1)
+class CacheWarmingServiceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_schedules_cold_neighbours_once(self):
+        jobs = CacheWarmingService.schedule_adjacent('chart_data', 'spain', '2024-06-20')
+        self.assertEqual(sorted(job.params['date'] for job in jobs), ['2024-06-19', '2024-06-21'])
+        self.assertTrue(all(job.priority == FetchJobService.PREFETCH_PRIORITY for job in jobs))
+
+        # Repeat views of the same day don't re-check or re-queue
+        self.assertEqual(CacheWarmingService.schedule_adjacent('chart_data', 'spain', '2024-06-20'), [])
+        self.assertEqual(FetchJob.objects.count(), 2)
+
+    def test_request_promotes_queued_prefetch(self):
+        CacheWarmingService.schedule_adjacent('chart_data', 'spain', '2024-06-20')
+        job = FetchJobService.enqueue('chart_data', {'region': 'spain', 'date': '2024-06-21'})
+        self.assertEqual(job.priority, FetchJobService.REQUEST_PRIORITY)
+        self.assertEqual(FetchJobService.claim('worker').id, job.id)
+
+    def test_never_prefetches_future_days(self):
+        today = date.today()
+        self.assertEqual(CacheWarmingService.adjacent_days(today), [today - timedelta(days=1)])
+
+    def test_recent_caiso_days_are_not_persisted(self):
+        yesterday = date.today() - timedelta(days=1)
+        self.assertEqual(CacheWarmingService.build_day('california', yesterday),
+                         {'energy': 'not_settled', 'curtailment': 'not_settled'})
+        self.assertTrue(ResponseCache.is_historical(CacheWarmingService.default_day('california').isoformat()))
+
+
+def create_energy_summary(day, data_source='database', peak_vre=80.0, ramp_gw=6.0, hourly_data=None):
+    """A minimal DailyEnergySummary (post_save signals run as usual)"""
+    return DailyEnergySummary.objects.create(
+        date=day, data_source=data_source,
+        peak_vre_penetration=peak_vre, peak_vre_hour=time(13), sustained_high_vre_hours=5,
+        max_netload_ramp_gw=ramp_gw, ramp_window_start=time(17), ramp_window_end=time(19),
+        load_balancing_gap_hours=6, peak_demand_hour=time(20), shiftable_energy_gwh=1.5,
+        hourly_data_json={'hourly_data': hourly_data or []},
+    )
+
+
+class SummaryRepositoryTests(TestCase):
+
+    DAY = date(2024, 6, 20)
+
+    def setUp(self):
+        create_energy_summary(self.DAY, hourly_data=[
+            {'hour': '00:00', 'demand': 25000.0, 'price': 55.0},
+            {'hour': '01:00', 'demand': 24000.0, 'price': None},
+        ])
+
+    def test_projections_defer_unused_columns(self):
+        metrics = SummaryRepository.get(SummaryRepository.ENERGY, self.DAY, ['database'], SummaryRepository.METRICS)
+        self.assertIn('hourly_data_json', metrics.get_deferred_fields())
+
+        hourly = SummaryRepository.get(SummaryRepository.ENERGY, self.DAY, ['database'], SummaryRepository.HOURLY)
+        self.assertIn('peak_vre_penetration', hourly.get_deferred_fields())
+        self.assertNotIn('hourly_data_json', hourly.get_deferred_fields())
+
+        self.assertIsNone(SummaryRepository.get(SummaryRepository.ENERGY, self.DAY, ['caiso']))
+
+    def test_prices_keeps_hours_without_price(self):
+        prices = SummaryRepository.prices(['database', 'esios'], self.DAY, self.DAY + timedelta(days=1))
+        self.assertEqual(prices, {self.DAY: [('00:00', 55.0), ('01:00', None)]})
+
+
+class ChartRendererTests(TestCase):
+
+    PAYLOAD = {
+        'date': '2024-06-20',
+        'hourly_data': [
+            {'hour': '00:00', 'demand': 25000.0, 'price': 55.0},
+            {'hour': '01:00', 'demand': 24000.0, 'solar': 0.0},
+        ],
+        'daily_insights': {'peak_vre_pct': 80.0},
+    }
+
+    def test_columnar_shape(self):
+        columnar = to_columnar(self.PAYLOAD)
+        self.assertNotIn('hourly_data', columnar)
+        self.assertEqual(columnar['axis'], ['00:00', '01:00'])
+        self.assertEqual(columnar['series'], {
+            'demand': [25000.0, 24000.0], 'price': [55.0, None], 'solar': [None, 0.0],
+        })
+        self.assertEqual(columnar['daily_insights'], {'peak_vre_pct': 80.0})
+        self.assertEqual(to_columnar({'error': 'bad date'}), {'error': 'bad date'})
+
+    def test_arrow_round_trip(self):
+        table = pa.ipc.open_stream(ArrowIPCRenderer().render(self.PAYLOAD)).read_all()
+        self.assertEqual(table.column_names, ['axis', 'demand', 'price', 'solar'])
+        self.assertEqual(table.column('price').to_pylist(), [55.0, None])
+        payload = json.loads(table.schema.metadata[b'payload'])
+        self.assertEqual(payload['date'], '2024-06-20')
+
+    def test_etag_differs_per_representation(self):
+        etag = ResponseCache.etag_for(self.PAYLOAD)
+        json_request = SimpleNamespace(accepted_renderer=JSONRenderer())
+        columnar_request = SimpleNamespace(accepted_renderer=ColumnarJSONRenderer())
+
+        self.assertEqual(ResponseCache.variant_etag(json_request, etag), etag)
+        self.assertNotEqual(ResponseCache.variant_etag(columnar_request, etag), etag)
+        self.assertEqual(ResponseCache.variant_etag(SimpleNamespace(), etag), etag)
+
+
+class RollupServiceTests(TestCase):
+
+    # Mon 2024-12-30 .. Wed 2025-01-01: one week across a month and a year boundary
+    DAYS = [date(2024, 12, 30), date(2024, 12, 31), date(2025, 1, 1)]
+
+    def setUp(self):
+        for i, day in enumerate(self.DAYS):
+            create_energy_summary(day, peak_vre=60.0 + i, ramp_gw=1.5 * (i + 1), hourly_data=[
+                {'hour': '12:00', 'demand': 30.0, 'vre_total': 20.0, 'vre_pct': 66.7, 'price': -1.0 + i},
+                {'hour': '13:00', 'demand': 28.0, 'vre_total': 21.0, 'vre_pct': 75.0, 'price': 40.0},
+            ])
+
+    def rollups(self):
+        return {period: RollupService.get_rollups('spain', period) for period in RollupService.PERIODS}
+
+    def test_period_boundaries(self):
+        rollups = self.rollups()
+        self.assertEqual([(r['period_start'], r['days_count']) for r in rollups['week']], [('2024-12-30', 3)])
+        self.assertEqual([(r['period_start'], r['days_count']) for r in rollups['month']],
+                         [('2024-12-01', 2), ('2025-01-01', 1)])
+        self.assertEqual([(r['period_start'], r['days_count']) for r in rollups['year']],
+                         [('2024-01-01', 2), ('2025-01-01', 1)])
+        self.assertEqual(rollups['week'][0]['negative_price_hours'], 1)
+        self.assertEqual(rollups['week'][0]['max_ramp_gw'], 4.5)
+
+    def test_incremental_apply_matches_rebuild(self):
+        incremental = self.rollups()
+
+        EnergyRollup.objects.all().delete()
+        RollupService.rebuild('spain')
+
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_deleting_last_day_of_period_removes_rollup(self):
+        DailyEnergySummary.objects.get(date=date(2025, 1, 1)).delete()
+
+        rollups = self.rollups()
+        self.assertEqual([r['days_count'] for r in rollups['week']], [2])
+        self.assertEqual([r['period_start'] for r in rollups['month']], ['2024-12-01'])
+        self.assertEqual([r['period_start'] for r in rollups['year']], ['2024-01-01'])
+        self.assertEqual(rollups['week'][0]['max_ramp_gw'], 3.0)
+
+
+class RebuildDatabaseSummariesTests(TestCase):
+
+    # Mon 2024-03-04 .. Fri 2024-03-08, all in one rollup week
+    DAYS = [date(2024, 3, 4) + timedelta(days=i) for i in range(5)]
+    ESIOS_DAY, EMPTY_DAY, STALE_DAY = DAYS[2], DAYS[3], DAYS[4]
+
+    @classmethod
+    def setUpTestData(cls):
+        indicators = {
+            indicator_id: EnergyIndicator.objects.create(indicator_id=indicator_id, name=str(indicator_id), unit='MW')
+            for indicator_id in DailySummaryService.DATABASE_INDICATORS
+        }
+        # Multiples of 500 MW keep the GW values exact, so batch and per-day rounding agree
+        points = []
+        for i, day in enumerate(cls.DAYS):
+            if day == cls.EMPTY_DAY:
+                continue
+            start, _ = TimeRange.day(day)
+            for h in range(24):
+                values = {
+                    1161: max(0, 6 - abs(h - 13)) * 2000,
+                    1159: 4000 + 500 * ((h + i) % 5),
+                    1293: 24000 + 1000 * max(0, 6 - abs(h - 20)),
+                    600: 60.0 - 2 * h,
+                }
+                points.extend(
+                    EnergyData(indicator=indicators[indicator_id], timestamp=start + timedelta(hours=h),
+                               value=value, resolution='hour')
+                    for indicator_id, value in values.items()
+                )
+        EnergyData.objects.bulk_create(points)
+
+    def setUp(self):
+        cache.clear()
+        create_energy_summary(self.ESIOS_DAY, data_source='esios')
+        create_energy_summary(self.STALE_DAY, ramp_gw=99.0)
+
+    def rebuild(self, overwrite=False):
+        return DailySummaryService.rebuild_database_summaries(self.DAYS[0], self.DAYS[-1], overwrite=overwrite)
+
+    def snapshot(self, day):
+        summary = DailyEnergySummary.objects.get(date=day, data_source='database')
+        fields = {name: getattr(summary, name) for name in DailySummaryService.METRIC_FIELDS}
+        return fields, HourlyStore.hourly(summary)
+
+    def assert_rollups_current(self):
+        stored = {period: RollupService.get_rollups('spain', period) for period in RollupService.PERIODS}
+        EnergyRollup.objects.all().delete()
+        RollupService.rebuild('spain')
+        self.assertEqual(stored, {period: RollupService.get_rollups('spain', period) for period in RollupService.PERIODS})
+
+    def test_stats(self):
+        self.assertEqual(self.rebuild(), {'created': 2, 'updated': 0, 'skipped': 2, 'no_data': 1})
+        self.assertEqual(self.rebuild(), {'created': 0, 'updated': 0, 'skipped': 4, 'no_data': 1})
+        self.assertEqual(self.rebuild(overwrite=True), {'created': 0, 'updated': 3, 'skipped': 1, 'no_data': 1})
+
+        # ESIOS days are never replaced
+        self.assertEqual(DailyEnergySummary.objects.get(date=self.ESIOS_DAY).data_source, 'esios')
+        self.assertFalse(DailyEnergySummary.objects.filter(date=self.EMPTY_DAY).exists())
+
+    def test_matches_get_or_create_summary(self):
+        self.rebuild(overwrite=True)
+        rebuilt = {day: self.snapshot(day) for day in (self.DAYS[0], self.DAYS[1], self.STALE_DAY)}
+
+        DailyEnergySummary.objects.filter(data_source='database').delete()
+        for day, expected in rebuilt.items():
+            _, created = DailySummaryService.get_or_create_summary(day.isoformat())
+            self.assertTrue(created)
+            self.assertEqual(self.snapshot(day), expected)
+
+    def test_refreshes_rollups_and_responses(self):
+        ResponseCache.set('chart_data', 'spain', self.STALE_DAY.isoformat(), {'stale': True})
+
+        self.rebuild(overwrite=True)
+
+        # bulk_create sends no post_save, so the rebuild has to do what the signals would
+        week = RollupService.get_rollups('spain', 'week')
+        self.assertEqual([(r['period_start'], r['days_count']) for r in week], [('2024-03-04', 4)])
+        self.assertNotEqual(week[0]['max_ramp_gw'], 99.0)
+        self.assert_rollups_current()
+        self.assertIsNone(ResponseCache.get('chart_data', 'spain', self.STALE_DAY.isoformat()))
+
+
+class BESSDispatchOptimizerTests(SimpleTestCase):
+
+    CONFIG = BESSConfig(power_mw=100, duration_hours=4, efficiency=0.87)
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_never_worse_than_greedy(self):
+        # Cheap first half, expensive second half: greedy's pairing is chronologically
+        # feasible, so the DP (which can follow the same schedule) must match or beat it
+        prices = np.hstack([self.rng.uniform(0, 40, (50, 12)), self.rng.uniform(80, 150, (50, 12))])
+
+        dp = BESSDispatchOptimizer.evaluate(prices, self.CONFIG)
+        greedy = BESSBacktestService.evaluate(prices, self.CONFIG)
+
+        self.assertTrue(np.all(dp['gross_profit_eur'] >= greedy['gross_profit_eur'] - 1e-6))
+
+    def test_respects_power_and_soc_limits(self):
+        config = self.CONFIG
+        usable_mwh = config.capacity_mwh * (config.max_soc - config.min_soc) / 100
+
+        for interval_hours, intervals in ((1.0, 24), (0.25, 96)):
+            prices = self.rng.normal(50, 40, (20, intervals))
+            schedule = BESSDispatchOptimizer.optimize(prices, config, interval_hours=interval_hours)
+            energy, soc = schedule['energy_mwh'], schedule['soc_pct']
+
+            self.assertTrue(np.all(np.abs(energy) <= config.power_mw * interval_hours + 1e-9))
+            self.assertTrue(np.all(soc >= config.min_soc - 1e-9))
+            self.assertTrue(np.all(soc <= config.max_soc + 1e-9))
+            # SoC moves exactly by the energy charged/discharged
+            np.testing.assert_allclose(
+                np.diff(soc, axis=1) / (config.max_soc - config.min_soc) * usable_mwh, energy, atol=1e-6
+            )
+
+    def test_nan_prices_hold(self):
+        prices = self.rng.uniform(-20, 150, (3, 24))
+        prices[0, ::2] = np.nan
+        prices[1, :] = np.nan
+
+        schedule = BESSDispatchOptimizer.optimize(prices, self.CONFIG)
+        performance = BESSDispatchOptimizer.performance(prices, schedule['energy_mwh'], self.CONFIG)
+
+        self.assertTrue(np.all(schedule['energy_mwh'][np.isnan(prices)] == 0))
+        self.assertTrue(np.all(np.isfinite(performance['gross_profit_eur'])))
+        self.assertEqual(performance['gross_profit_eur'][1], 0)
+        self.assertGreater(performance['gross_profit_eur'][2], 0)
+
+
+class ResponseCacheTests(TestCase):
+
+    DAY = date(2024, 6, 20)
+
+    def setUp(self):
+        cache.clear()
+        create_energy_summary(self.DAY)
+
+    def respond(self):
+        def produce():
+            summary = DailyEnergySummary.objects.get(date=self.DAY)
+            return {'peak_vre_pct': summary.peak_vre_penetration}
+
+        request = RequestFactory().get('/api/energy/chart_data/')
+        return ResponseCache.respond(request, 'chart_data', 'spain', self.DAY.isoformat(), produce)
+
+    def test_rewrite_elsewhere_changes_etag(self):
+        first = self.respond()
+        self.assertEqual(self.respond()['ETag'], first['ETag'])
+
+        # A queryset update skips signals, like a rewrite in another process
+        # whose invalidation never reaches this process's cache
+        DailyEnergySummary.objects.filter(date=self.DAY).update(
+            peak_vre_penetration=90.0, updated_at=timezone.now()
+        )
+
+        rewritten = self.respond()
+        self.assertNotEqual(rewritten['ETag'], first['ETag'])
+        self.assertEqual(rewritten.data, {'peak_vre_pct': 90.0})
+
+
+@mock.patch('energy_analysis.services.single_flight.connection', SimpleNamespace(vendor='sqlite'))
+@mock.patch.object(SingleFlight, 'POLL_SECONDS', 0.01)
+class SingleFlightLeaseTests(SimpleTestCase):
+    """The cache.add() lease used when the database has no advisory locks"""
+
+    KEY = 'energy_summary:spain:2025-03-01'
+
+    def setUp(self):
+        cache.clear()
+
+    def test_one_caller_builds_while_others_wait(self):
+        store, lookups, builds = {}, [], []
+        building, finish = threading.Event(), threading.Event()
+
+        def lookup():
+            lookups.append(1)
+            return store.get('summary')
+
+        def create():
+            builds.append(1)
+            building.set()
+            finish.wait(5)
+            store['summary'] = 'summary'
+            return 'summary'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(SingleFlight.get_or_create(self.KEY, lookup, create)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+
+        self.assertTrue(building.wait(5))
+        # Builder: lookup before and after taking the lease; waiters: one lookup each, then poll
+        deadline = monotonic() + 5
+        while len(lookups) < 5 and monotonic() < deadline:
+            sleep(0.01)
+        self.assertEqual(len(lookups), 5)
+
+        finish.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(sorted(results), [('summary', False)] * 3 + [('summary', True)])
+        self.assertIsNone(cache.get(f"{SingleFlight.CACHE_PREFIX}:{self.KEY}"))
+
+    @override_settings(SINGLE_FLIGHT_TIMEOUT=0.2)
+    def test_waiter_proceeds_uncoordinated_after_timeout(self):
+        builds = []
+
+        def create():
+            builds.append(1)
+            return 'summary'
+
+        with SingleFlight.lock(self.KEY, timeout=5) as held:
+            self.assertTrue(held)
+            lease = cache.get(f"{SingleFlight.CACHE_PREFIX}:{self.KEY}")
+
+            started = monotonic()
+            with self.assertLogs('energy_analysis.services.single_flight', 'WARNING'):
+                result = SingleFlight.get_or_create(self.KEY, lambda: None, create)
+
+            self.assertGreaterEqual(monotonic() - started, 0.2)
+            self.assertEqual(result, ('summary', True))
+            self.assertEqual(builds, [1])
+            # The waiter never held the lease, so it must not release the holder's
+            self.assertEqual(cache.get(f"{SingleFlight.CACHE_PREFIX}:{self.KEY}"), lease)
+
+
+class MonthlyCurtailmentServiceTests(TestCase):
+
+    # Values chosen so per-delta rounding would drift (x.x4 each) and the worst day ties
+    DAYS = [
+        (date(2024, 6, 1), 10.04, 1.234),
+        (date(2024, 6, 2), 30.04, 2.345),
+        (date(2024, 6, 3), 20.04, 3.456),
+        (date(2024, 6, 4), 30.04, 4.567),
+        (date(2024, 6, 5), 0.0, 0.0),
+    ]
+
+    def setUp(self):
+        # post_save applies each new day to its month (apply_day)
+        for day, mwh, revenue in self.DAYS:
+            DailyCurtailmentSummary.objects.create(
+                date=day, data_source='database', total_curtailed_mwh=mwh, estimated_revenue_lost_eur=revenue,
+                peak_curtailment_mwh=mwh / 4, peak_curtailment_hour=time(14),
+            )
+
+    def payload(self):
+        return MonthlyCurtailmentService._build_monthly_payload('spain', 2024, 2024)
+
+    def test_incremental_apply_matches_build_month(self):
+        incremental = self.payload()
+
+        MonthlyCurtailmentService.build_month(2024, 6, 'spain')
+        self.assertEqual(self.payload(), incremental)
+
+        month = incremental['monthly_data'][0]
+        self.assertEqual(month['total_curtailed_mwh'], 90.2)
+        self.assertEqual(month['total_revenue_lost_eur'], 11.6)
+        self.assertEqual(month['days_with_curtailment'], 4)
+        # Ties go to the later day on both paths
+        self.assertEqual(month['worst_day'], '2024-06-04')
+
+
+def reference_day_metrics(hourly_data):
+    """
+    The per-day metric rules as they were before the numpy batch rewrite,
+    kept as an oracle for EnergyMetricsCalculator.calculate_batch_metrics
+    """
+    def parse(label):
+        return datetime.strptime(label, '%H:%M').time()
+
+    vre_pct = [h['vre_pct'] for h in hourly_data]
+    demand = [h['demand'] for h in hourly_data]
+    net_load = [h['demand'] - h['vre_total'] for h in hourly_data]
+
+    peak_vre_idx = vre_pct.index(max(vre_pct))
+    peak_demand_idx = demand.index(max(demand))
+
+    max_ramp, ramp_start = 0, 0
+    for i in range(len(net_load) - 1):
+        if abs(net_load[i + 1] - net_load[i]) > max_ramp:
+            max_ramp, ramp_start = abs(net_load[i + 1] - net_load[i]), i
+
+    vre_hour, demand_hour = parse(hourly_data[peak_vre_idx]['hour']).hour, parse(hourly_data[peak_demand_idx]['hour']).hour
+    avg_vre_pct = sum(vre_pct) / len(vre_pct)
+    high_vre = [h for h in hourly_data if h['vre_pct'] > avg_vre_pct]
+
+    return {
+        'peak_vre_penetration': round(max(vre_pct), 1),
+        'peak_vre_hour': parse(hourly_data[peak_vre_idx]['hour']),
+        'sustained_high_vre_hours': sum(1 for pct in vre_pct if pct > 70),
+        'max_netload_ramp_gw': round(max_ramp, 2),
+        'ramp_window_start': parse(hourly_data[ramp_start]['hour']),
+        'ramp_window_end': parse(hourly_data[ramp_start + 1]['hour']),
+        'load_balancing_gap_hours': demand_hour - vre_hour if demand_hour >= vre_hour else 24 - vre_hour + demand_hour,
+        'peak_demand_hour': parse(hourly_data[peak_demand_idx]['hour']),
+        'shiftable_energy_gwh': round(sum(max(0, h['vre_total'] - h['demand']) * 0.15 for h in high_vre), 2),
+        'flexibility_window_start': parse(high_vre[0]['hour']) if high_vre else None,
+        'flexibility_window_end': parse(high_vre[-1]['hour']) if high_vre else None,
+    }
+
+
+class EnergyMetricsBatchTests(SimpleTestCase):
+
+    @staticmethod
+    def day(solar_peak, skip_hours=(), overrides=None):
+        hourly = []
+        for h in range(24):
+            if h in skip_hours:
+                continue
+            solar = max(0.0, solar_peak * math.sin(math.pi * (h - 6) / 12)) if 6 < h < 18 else 0.0
+            wind = 3000.0 + 250.0 * (h % 5)
+            demand = 24000.0 + 4000.0 * math.sin(math.pi * (h - 8) / 14)
+            # Whole MW keeps 15% of the excess at two decimals, so rounding can't hinge on summation order
+            solar, demand = float(round(solar)), float(round(demand))
+            hourly.append({'hour': f'{h:02d}:00', 'demand': demand, 'solar': solar,
+                           'wind': wind, 'vre_total': solar + wind,
+                           'vre_pct': round((solar + wind) / demand * 100, 1)})
+        for hour in hourly:
+            hour.update((overrides or {}).get(hour['hour'], {}))
+        return hourly
+
+    def days(self):
+        return [
+            # Ties: same peak VRE share at 11:00 and 13:00, same peak demand at 18:00 and 19:00
+            self.day(30000.0, overrides={
+                '11:00': {'vre_pct': 150.0}, '13:00': {'vre_pct': 150.0},
+                '18:00': {'demand': 29000.0}, '19:00': {'demand': 29000.0},
+            }),
+            # Missing hours, including one inside the solar peak
+            self.day(20000.0, skip_hours=(3, 4, 12, 23)),
+            # Low-VRE winter day: nothing above 70%
+            self.day(2000.0),
+        ]
+
+    def test_batch_matches_per_day(self):
+        days = self.days()
+        batch = EnergyMetricsCalculator.calculate_metrics_for_days(days)
+
+        for hourly_data, batch_metrics in zip(days, batch):
+            self.assertEqual(batch_metrics, EnergyMetricsCalculator.calculate_all_metrics(hourly_data))
+            self.assertEqual(batch_metrics, reference_day_metrics(hourly_data))
+
+    def test_ties_pick_first_hour(self):
+        metrics = EnergyMetricsCalculator.calculate_metrics_for_days(self.days())[0]
+        self.assertEqual(metrics['peak_vre_hour'], time(11))
+        self.assertEqual(metrics['peak_demand_hour'], time(18))
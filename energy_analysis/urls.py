@@ -1,10 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import EnergyDataViewSet
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'energy', EnergyDataViewSet, basename='energy')
 
 urlpatterns = [
     path('api/', include(router.urls)),
+
+    # ASGI-only async variants of the per-day endpoints (see async_views)
+    path('api/async/energy/chart_data/', async_views.chart_data, name='async-chart-data'),
+    path('api/async/energy/curtailment_data/', async_views.curtailment_data, name='async-curtailment-data'),
+    path('api/async/energy/bess_analysis/', async_views.bess_analysis, name='async-bess-analysis'),
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from datetime import datetime, time
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +11,9 @@ class EnergyMetricsCalculator:
     All methods are static and don't depend on Django models
     """
     
+    HIGH_VRE_THRESHOLD_PCT = 70
+    SHIFTABLE_FACTOR = 0.15  # Conservative share of excess VRE that could be shifted
+    
     @staticmethod
     def calculate_all_metrics(hourly_data):
         """
@@ -34,17 +38,13 @@ class EnergyMetricsCalculator:
         if not vre_values:
             vre_values = [hour['solar'] + hour['wind'] for hour in hourly_data]
         
-        # Calculate individual metrics
-        visibility_metrics = EnergyMetricsCalculator._calculate_visibility_metrics(hourly_data, vre_percentages)
-        analytics_metrics = EnergyMetricsCalculator._calculate_analytics_metrics(hourly_data, demand_values, vre_values)
-        flexibility_metrics = EnergyMetricsCalculator._calculate_flexibility_metrics(hourly_data, vre_percentages, demand_values)
-        
-        # Combine all metrics
-        all_metrics = {
-            **visibility_metrics,
-            **analytics_metrics,
-            **flexibility_metrics
-        }
+        # One-day batch
+        all_metrics = EnergyMetricsCalculator.calculate_batch_metrics(
+            [hour['hour'] for hour in hourly_data],
+            np.array([demand_values], dtype=float),
+            np.array([vre_percentages], dtype=float),
+            np.array([vre_values], dtype=float),
+        )[0]
         
         logger.debug(f"Calculated metrics: Peak VRE {all_metrics['peak_vre_penetration']}%, "
                     f"Max ramp {all_metrics['max_netload_ramp_gw']}GW")
@@ -52,104 +52,131 @@ class EnergyMetricsCalculator:
         return all_metrics
     
     @staticmethod
-    def _calculate_visibility_metrics(hourly_data, vre_percentages):
-        
-        # Peak VRE penetration and timing
-        peak_vre_pct = max(vre_percentages)
-        peak_vre_index = vre_percentages.index(peak_vre_pct)
-        peak_vre_hour_str = hourly_data[peak_vre_index]['hour']
+    def calculate_metrics_for_days(hourly_lists):
+        """
+        Metrics for many days of hourly dicts at once.
+        Pivots the lists onto a shared hour axis (missing hours become NaN)
+        and runs calculate_batch_metrics; returns one metrics dict per day.
+        """
+        hours = sorted({hour['hour'] for hourly_data in hourly_lists for hour in hourly_data})
+        column = {label: i for i, label in enumerate(hours)}
         
-        # Convert hour string to time object
-        peak_vre_hour = datetime.strptime(peak_vre_hour_str, '%H:%M').time()
+        shape = (len(hourly_lists), len(hours))
+        demand, vre_pct, vre_total = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
         
-        # Sustained high VRE hours (>70%)
-        sustained_high_vre_hours = sum(1 for pct in vre_percentages if pct > 70)
+        for row, hourly_data in enumerate(hourly_lists):
+            for hour in hourly_data:
+                col = column[hour['hour']]
+                demand[row, col] = hour['demand']
+                vre_pct[row, col] = hour['vre_pct']
+                vre_total[row, col] = hour['vre_total'] if 'vre_total' in hour else hour['solar'] + hour['wind']
         
-        return {
-            'peak_vre_penetration': round(peak_vre_pct, 1),
-            'peak_vre_hour': peak_vre_hour,
-            'sustained_high_vre_hours': sustained_high_vre_hours
-        }
+        return EnergyMetricsCalculator.calculate_batch_metrics(hours, demand, vre_pct, vre_total)
     
     @staticmethod
-    def _calculate_analytics_metrics(hourly_data, demand_values, vre_values):
-        """Calculate Tatari-style analytics metrics"""
+    def calculate_batch_metrics(hours, demand, vre_pct, vre_total):
+        """
+        Calculate all DailyEnergySummary metrics for many days at once
         
-        # Calculate net load (demand - VRE) for each hour
-        net_load = []
-        for i, hour in enumerate(hourly_data):
-            net_load_value = demand_values[i] - vre_values[i]
-            net_load.append(net_load_value)
-        
-        # Find maximum 2-hour net load ramp
-        max_ramp = 0
-        ramp_start_idx = 0
-        ramp_end_idx = 1
-        
-        for i in range(len(net_load) - 1):
-            ramp = abs(net_load[i + 1] - net_load[i])
-            if ramp > max_ramp:
-                max_ramp = ramp
-                ramp_start_idx = i
-                ramp_end_idx = i + 1
-        
-        # Convert indices to time objects
-        ramp_start_hour = datetime.strptime(hourly_data[ramp_start_idx]['hour'], '%H:%M').time()
-        ramp_end_hour = datetime.strptime(hourly_data[ramp_end_idx]['hour'], '%H:%M').time()
-        
-        return {
-            'max_netload_ramp_gw': round(max_ramp, 2),
-            'ramp_window_start': ramp_start_hour,
-            'ramp_window_end': ramp_end_hour
-        }
+        Args:
+            hours: 'HH:MM' labels for the columns, shared by every day
+            demand, vre_pct, vre_total: (days x hours) arrays, NaN where an hour is missing
+        
+        Returns:
+            list: one metrics dict per day (None for days without any data)
+        
+        Same rules as the per-day calculation: first hour wins ties, >70% counts
+        as sustained high VRE, ramps compare consecutive present hours, the
+        flexibility window spans hours above the day's mean VRE share.
+        """
+        demand = np.atleast_2d(np.asarray(demand, dtype=float))
+        vre_pct = np.atleast_2d(np.asarray(vre_pct, dtype=float))
+        vre_total = np.atleast_2d(np.asarray(vre_total, dtype=float))
+        
+        # Parse each label once instead of once per metric per day
+        hour_times = [datetime.strptime(label, '%H:%M').time() for label in hours]
+        hour_ints = np.array([t.hour for t in hour_times])
+        
+        present = ~np.isnan(vre_pct) & ~np.isnan(demand)
+        has_data = present.any(axis=1)
+        rows = np.arange(len(demand))
+        
+        # --- Visibility: peak VRE and sustained high VRE ---
+        masked_vre_pct = np.where(present, vre_pct, -np.inf)
+        peak_vre_idx = masked_vre_pct.argmax(axis=1)
+        peak_vre_pct = masked_vre_pct[rows, peak_vre_idx]
+        sustained = (present & (vre_pct > EnergyMetricsCalculator.HIGH_VRE_THRESHOLD_PCT)).sum(axis=1)
+        
+        # --- Analytics: largest hour-to-hour net load ramp ---
+        ramp_starts, ramp_ends, max_ramps = EnergyMetricsCalculator._batch_ramps(demand - vre_total, present)
+        
+        # --- Flexibility: peak gap, shiftable energy, window ---
+        peak_demand_idx = np.where(present, demand, -np.inf).argmax(axis=1)
+        demand_hour = hour_ints[peak_demand_idx]
+        vre_hour = hour_ints[peak_vre_idx]
+        gap_hours = np.where(demand_hour >= vre_hour, demand_hour - vre_hour, 24 - vre_hour + demand_hour)
+        
+        counts = np.maximum(present.sum(axis=1), 1)
+        avg_vre_pct = np.where(present, vre_pct, 0).sum(axis=1) / counts
+        high_vre = present & (vre_pct > avg_vre_pct[:, None])
+        excess = np.clip(np.nan_to_num(vre_total - demand), 0, None)
+        shiftable = (np.where(high_vre, excess, 0) * EnergyMetricsCalculator.SHIFTABLE_FACTOR).sum(axis=1)
+        
+        any_high = high_vre.any(axis=1)
+        window_start_idx = high_vre.argmax(axis=1)
+        window_end_idx = high_vre.shape[1] - 1 - high_vre[:, ::-1].argmax(axis=1)
+        
+        results = []
+        for day in rows:
+            if not has_data[day]:
+                results.append(None)
+                continue
+            
+            results.append({
+                'peak_vre_penetration': round(float(peak_vre_pct[day]), 1),
+                'peak_vre_hour': hour_times[peak_vre_idx[day]],
+                'sustained_high_vre_hours': int(sustained[day]),
+                'max_netload_ramp_gw': round(float(max_ramps[day]), 2),
+                'ramp_window_start': hour_times[ramp_starts[day]],
+                'ramp_window_end': hour_times[ramp_ends[day]],
+                'load_balancing_gap_hours': int(gap_hours[day]),
+                'peak_demand_hour': hour_times[peak_demand_idx[day]],
+                'shiftable_energy_gwh': round(float(shiftable[day]), 2),
+                'flexibility_window_start': hour_times[window_start_idx[day]] if any_high[day] else None,
+                'flexibility_window_end': hour_times[window_end_idx[day]] if any_high[day] else None,
+            })
+        
+        return results
     
     @staticmethod
-    def _calculate_flexibility_metrics(hourly_data, vre_percentages, demand_values):
-        """Calculate TIA-style flexibility metrics"""
-        
-        # Find peak demand and peak VRE hours
-        peak_demand_idx = demand_values.index(max(demand_values))
-        peak_vre_idx = vre_percentages.index(max(vre_percentages))
-        
-        peak_demand_hour = datetime.strptime(hourly_data[peak_demand_idx]['hour'], '%H:%M').time()
-        peak_vre_hour = datetime.strptime(hourly_data[peak_vre_idx]['hour'], '%H:%M').time()
-        
-        # Calculate time gap between peaks (in hours)
-        demand_hour_int = peak_demand_hour.hour
-        vre_hour_int = peak_vre_hour.hour
-        
-        # Handle day wraparound
-        if demand_hour_int >= vre_hour_int:
-            gap_hours = demand_hour_int - vre_hour_int
-        else:
-            gap_hours = (24 - vre_hour_int) + demand_hour_int
-        
-        # Calculate shiftable energy (conservative estimate)
-        # Energy available during high VRE hours that could be shifted to peak demand time
-        avg_vre_pct = sum(vre_percentages) / len(vre_percentages)
-        high_vre_hours = [hour for hour, pct in zip(hourly_data, vre_percentages) if pct > avg_vre_pct]
-        
-        # Estimate shiftable energy as 15% of excess VRE generation during high hours
-        shiftable_energy = 0
-        for hour in high_vre_hours:
-            excess_vre = max(0, hour['vre_total'] - hour['demand'])
-            shiftable_energy += excess_vre * 0.15  # Conservative 15% factor
-        
-        # Find flexibility window (consecutive high VRE hours)
-        flexibility_window_start = None
-        flexibility_window_end = None
-        
-        if high_vre_hours:
-            flexibility_window_start = datetime.strptime(high_vre_hours[0]['hour'], '%H:%M').time()
-            flexibility_window_end = datetime.strptime(high_vre_hours[-1]['hour'], '%H:%M').time()
-        
-        return {
-            'load_balancing_gap_hours': gap_hours,
-            'peak_demand_hour': peak_demand_hour,
-            'shiftable_energy_gwh': round(shiftable_energy, 2),
-            'flexibility_window_start': flexibility_window_start,
-            'flexibility_window_end': flexibility_window_end
-        }
+    def _batch_ramps(net_load, present):
+        """
+        Largest absolute change between consecutive present hours, per day.
+        Returns (start column, end column, ramp); flat days report the first two hours.
+        """
+        days, columns = net_load.shape
+        
+        # Push present hours to the front of each row so gaps don't break the chain
+        order = np.argsort(~present, axis=1, kind='stable')
+        compact = np.take_along_axis(net_load, order, axis=1)
+        n_present = present.sum(axis=1)
+        
+        if columns < 2:
+            zeros = np.zeros(days, dtype=int)
+            return zeros, zeros, np.zeros(days)
+        
+        ramps = np.abs(np.diff(compact, axis=1))
+        ramps = np.where(np.arange(columns - 1)[None, :] < (n_present - 1)[:, None], ramps, -np.inf)
+        
+        best = ramps.argmax(axis=1)
+        max_ramp = ramps[np.arange(days), best]
+        
+        # Strictly greater than zero to move off the first pair
+        best = np.where(max_ramp > 0, best, 0)
+        max_ramp = np.where(max_ramp > 0, max_ramp, 0)
+        
+        rows = np.arange(days)
+        return order[rows, best], order[rows, best + 1], max_ramp
     
     @staticmethod
     def calculate_daily_totals(hourly_data):
@@ -0,0 +1,230 @@
+from datetime import date
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EnergyDataPartitioner:
+    """
+    Monthly range partitioning of EnergyData on PostgreSQL
+
+    The table is partitioned by timestamp, one partition per calendar month
+    plus a DEFAULT partition that catches anything outside the created range.
+    Queries need no changes: the half-open timestamp ranges used by the
+    services (see TimeRange) let the planner prune to the partition(s) that
+    cover the requested day or month.
+
+    Postgres requires the partition key in every unique constraint, so the
+    primary key becomes (id, timestamp); ids stay unique via the sequence.
+    All methods take a connection and must run inside a transaction.
+    """
+
+    TABLE = 'energy_analysis_energydata'
+    LEGACY = 'energy_analysis_energydata_legacy'
+    DEFAULT_PARTITION = 'energy_analysis_energydata_pdefault'
+
+    # =========================================================================
+    # Inspection
+    # =========================================================================
+
+    @classmethod
+    def is_partitioned(cls, connection) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relkind FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relname = %s AND n.nspname = current_schema()",
+                [cls.TABLE]
+            )
+            row = cursor.fetchone()
+        return bool(row) and row[0] == 'p'
+
+    @classmethod
+    def partitions(cls, connection):
+        """[(name, bound expression, estimated rows)] ordered by name"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = %s::regclass ORDER BY c.relname",
+                [cls.TABLE]
+            )
+            return cursor.fetchall()
+
+    @classmethod
+    def partition_name(cls, year: int, month: int) -> str:
+        return f"{cls.TABLE}_p{year:04d}{month:02d}"
+
+    @staticmethod
+    def month_bounds(year: int, month: int):
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return start, end
+
+    @staticmethod
+    def months(first: date, last: date):
+        """(year, month) from first's month through last's month"""
+        year, month = first.year, first.month
+        while (year, month) <= (last.year, last.month):
+            yield year, month
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    # =========================================================================
+    # Conversion (run once)
+    # =========================================================================
+
+    @classmethod
+    def convert(cls, connection, months_ahead: int = 3) -> bool:
+        """
+        Swap the monolithic table for a partitioned one, copying every row.
+        Returns False if the table is already partitioned.
+        """
+        if cls.is_partitioned(connection):
+            return False
+
+        with connection.cursor() as cursor:
+            constraints, indexes = cls._capture_definitions(cursor)
+
+            cursor.execute(f'ALTER TABLE {cls.TABLE} RENAME TO {cls.LEGACY}')
+
+            # Serial (non-identity) ids keep drawing from the legacy sequence
+            cursor.execute(
+                "SELECT a.attidentity, pg_get_serial_sequence(%s, 'id') FROM pg_attribute a "
+                "WHERE a.attrelid = %s::regclass AND a.attname = 'id'",
+                [cls.LEGACY, cls.LEGACY]
+            )
+            identity, legacy_sequence = cursor.fetchone()
+
+            cursor.execute(
+                f'CREATE TABLE {cls.TABLE} (LIKE {cls.LEGACY} INCLUDING DEFAULTS INCLUDING IDENTITY) '
+                f'PARTITION BY RANGE ("timestamp")'
+            )
+            if not identity and legacy_sequence:
+                cursor.execute(f'ALTER SEQUENCE {legacy_sequence} OWNED BY {cls.TABLE}.id')
+
+            cursor.execute(f'SELECT MIN("timestamp"), MAX(id) FROM {cls.LEGACY}')
+            first_timestamp, max_id = cursor.fetchone()
+
+        first_month = first_timestamp.date() if first_timestamp else date.today()
+        cls.create_partitions(connection, first_month, months_ahead=months_ahead)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'INSERT INTO {cls.TABLE} SELECT * FROM {cls.LEGACY}')
+            copied = cursor.rowcount
+            cursor.execute(f'DROP TABLE {cls.LEGACY}')
+
+            # Constraint and index names are free again now
+            for name, definition, kind in constraints:
+                if kind == 'p':
+                    definition = 'PRIMARY KEY (id, "timestamp")'
+                cursor.execute(f'ALTER TABLE {cls.TABLE} ADD CONSTRAINT {name} {definition}')
+            for definition in indexes:
+                cursor.execute(definition)
+
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s, %s)",
+                [cls.TABLE, max_id or 1, max_id is not None]
+            )
+
+        logger.info(f"Partitioned {cls.TABLE}: {copied} rows copied into monthly partitions")
+        return True
+
+    @classmethod
+    def _capture_definitions(cls, cursor):
+        """Constraints (PK, unique, FK) and standalone indexes of the current table"""
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid), contype FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f') "
+            "ORDER BY contype = 'f', conname",
+            [cls.TABLE]
+        )
+        constraints = cursor.fetchall()
+
+        cursor.execute(
+            "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "WHERE i.indrelid = %s::regclass "
+            "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)",
+            [cls.TABLE]
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        return constraints, indexes
+
+    # =========================================================================
+    # Partition maintenance
+    # =========================================================================
+
+    @classmethod
+    def create_partitions(cls, connection, first: date, last: date = None, months_ahead: int = 3) -> list:
+        """
+        Make sure monthly partitions exist from first's month through
+        last's month (default: months_ahead months past today), plus the
+        DEFAULT partition. Rows already sitting in DEFAULT are moved into
+        the new partition. Returns the names of created partitions.
+        """
+        if last is None:
+            today = date.today()
+            last = date(today.year + (today.month - 1 + months_ahead) // 12, (today.month - 1 + months_ahead) % 12 + 1, 1)
+
+        existing = {name for name, _, _ in cls.partitions(connection)}
+        created = []
+
+        with connection.cursor() as cursor:
+            if cls.DEFAULT_PARTITION not in existing:
+                cursor.execute(f'CREATE TABLE {cls.DEFAULT_PARTITION} PARTITION OF {cls.TABLE} DEFAULT')
+
+            for year, month in cls.months(first, last):
+                name = cls.partition_name(year, month)
+                if name in existing:
+                    continue
+
+                start, end = cls.month_bounds(year, month)
+                bounds = f"FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+
+                cursor.execute(
+                    f'SELECT EXISTS (SELECT 1 FROM {cls.DEFAULT_PARTITION} '
+                    f'WHERE "timestamp" >= %s AND "timestamp" < %s)',
+                    [start, end]
+                )
+                if cursor.fetchone()[0]:
+                    # A new range can't overlap rows in DEFAULT: move them first
+                    cursor.execute(f'CREATE TABLE {name} (LIKE {cls.TABLE} INCLUDING DEFAULTS)')
+                    cursor.execute(
+                        f'WITH moved AS (DELETE FROM {cls.DEFAULT_PARTITION} '
+                        f'WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+                        f'INSERT INTO {name} SELECT * FROM moved',
+                        [start, end]
+                    )
+                    cursor.execute(f'ALTER TABLE {cls.TABLE} ATTACH PARTITION {name} FOR VALUES {bounds}')
+                else:
+                    cursor.execute(f'CREATE TABLE {name} PARTITION OF {cls.TABLE} FOR VALUES {bounds}')
+                created.append(name)
+
+        if created:
+            logger.info(f"Created {len(created)} EnergyData partitions: {created[0]} .. {created[-1]}")
+        return created
+
+    @classmethod
+    def detach_before(cls, connection, cutoff: date, drop: bool = False) -> list:
+        """
+        Detach monthly partitions that end on or before `cutoff`.
+        Detached tables keep their data for archiving (pg_dump) unless drop=True.
+        """
+        detached = []
+
+        with connection.cursor() as cursor:
+            for name, _, _ in cls.partitions(connection):
+                suffix = name[len(cls.TABLE) + 2:]
+                if not name.startswith(f'{cls.TABLE}_p') or not suffix.isdigit() or len(suffix) != 6:
+                    continue  # DEFAULT or a partition this class didn't create
+                year, month = int(name[-6:-2]), int(name[-2:])
+                if cls.month_bounds(year, month)[1] > cutoff:
+                    continue
+
+                cursor.execute(f'ALTER TABLE {cls.TABLE} DETACH PARTITION {name}')
+                if drop:
+                    cursor.execute(f'DROP TABLE {name}')
+                detached.append(name)
+
+        if detached:
+            logger.info(f"{'Dropped' if drop else 'Detached'} {len(detached)} EnergyData partitions")
+        return detached
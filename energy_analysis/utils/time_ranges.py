@@ -0,0 +1,27 @@
+from datetime import date, datetime, time, timedelta
+from django.utils import timezone
+
+
+class TimeRange:
+    """
+    Half-open [start, end) datetime bounds for filtering EnergyData.timestamp
+
+    Filtering with timestamp__gte/__lt keeps the bare column in the WHERE
+    clause, so the (indicator, resolution, timestamp) index can be used;
+    timestamp__date / __year / __month wrap it in a cast and force a scan.
+    """
+
+    @staticmethod
+    def day(day: date):
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        return start, start + timedelta(days=1)
+
+    @staticmethod
+    def days(first: date, last: date):
+        """From the start of `first` to the end of `last`"""
+        return TimeRange.day(first)[0], TimeRange.day(last)[1]
+
+    @staticmethod
+    def month(year: int, month: int):
+        next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return TimeRange.day(date(year, month, 1))[0], TimeRange.day(next_month)[0]
@@ -1,55 +1,109 @@
 # views.py
 from rest_framework import viewsets
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from django.conf import settings
 from django.db.models import Q
 from datetime import datetime
-from .models import EnergyData, DailyEnergySummary
+from .models import EnergyData
 from .serializers import EnergyDataSerializer
 from rest_framework.decorators import action
 from .services.daily_summary_service import DailySummaryService
 from .utils.data_quality import EnergyDataValidator
+from .utils.time_ranges import TimeRange
+from .services.hourly_store import HourlyStore
+from .services.summary_repository import SummaryRepository
+from .services.response_cache import ResponseCache
+from .services.fetch_job_service import FetchJobService
+from .services.cache_warming_service import CacheWarmingService
 import logging
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .services.bess_decision_service import BESSDecisionService
+from .services.bess_backtest_service import BESSBacktestService
+from .services.bess_sweep_service import BESSSweepService
+from .services.bess_rolling_horizon_service import BESSRollingHorizonService
 from .models import BESSConfig
 from .services.daily_curtailment_service import DailyCurtailmentService, MonthlyCurtailmentService
-from .models import DailyCurtailmentSummary, MonthlyCurtailmentSummary
+from .models import FetchJob
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+from django.utils.cache import patch_vary_headers
+from .renderers import ArrowIPCRenderer, ColumnarJSONRenderer
 
 logger = logging.getLogger(__name__)
 
+# JSON by default; ?format=columnar|arrow (or Accept) for compact chart series
+CHART_RENDERERS = api_settings.DEFAULT_RENDERER_CLASSES + [ColumnarJSONRenderer, ArrowIPCRenderer]
+
 class EnergyDataViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = EnergyDataSerializer
     
     def get_queryset(self):
         queryset = EnergyData.objects.all()
         
-        # Filter by date if provided
+        # Filter by date if provided (half-open range so the index applies)
         date = self.request.query_params.get('date', None)
         if date:
-            queryset = queryset.filter(timestamp__date=date)
+            try:
+                start, end = TimeRange.day(datetime.fromisoformat(date).date())
+            except ValueError:
+                raise ValidationError({'date': f'Invalid date: {date}'})
+            queryset = queryset.filter(timestamp__gte=start, timestamp__lt=end)
         
         # Filter by indicators (VRE + Demand)
         indicators = self.request.query_params.get('indicators', '1161,1159,1293')
         indicator_list = [int(x) for x in indicators.split(',')]
-        queryset = queryset.filter(indicator__indicator_id__in=indicator_list)
+        queryset = queryset.filter(indicator_id__in=indicator_list)
         
         return queryset.order_by('timestamp')
     
-    @action(detail=False, methods=['get'])
+    def _defer_if_cold(self, request, kind, params):
+        """
+        202 + job id when background fetching is on and the day isn't stored yet;
+        None means serve the request inline. Raises ValueError on a bad date.
+        """
+        if not FetchJobService.background_enabled(request.query_params):
+            return None
+        if not FetchJobService.is_cold(kind, params):
+            return None
+
+        job = FetchJobService.enqueue(kind, params)
+        response = Response({
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': reverse('energy-fetch-job', kwargs={'job_id': job.id}, request=request),
+        }, status=202)
+        response['Retry-After'] = '2'
+        return response
+    
+    @action(detail=False, methods=['get'], url_path=r'jobs/(?P<job_id>\d+)')
+    def fetch_job(self, request, job_id=None):
+        """Status of a deferred fetch; includes the endpoint's payload once done."""
+        job = FetchJob.objects.filter(id=job_id).first()
+        if job is None:
+            return Response({'error': f'Unknown job: {job_id}'}, status=404)
+        return Response(FetchJobService.status(job))
+    
+    @action(detail=False, methods=['get'], renderer_classes=CHART_RENDERERS)
     def chart_data(self, request):
-        """Get chart data for any date and region."""
+        """Get chart data for any date and region (?format=columnar|arrow for compact series)."""
         from .services.region_service import RegionService
         
         date = request.query_params.get('date', '2024-06-20')
         region = request.query_params.get('region', 'california')
         
         try:
-            data = RegionService.get_chart_data(region, date)
-            return Response({
-                'region': region,
-                **data
-            })
+            response = self._defer_if_cold(request, 'chart_data', {'region': region, 'date': date})
+            if response is None:
+                response = ResponseCache.respond(
+                    request, 'chart_data', region, date,
+                    lambda: {'region': region, **RegionService.get_chart_data(region, date)}
+                )
+
+            # Neighbouring days are the likely next clicks
+            CacheWarmingService.schedule_adjacent('chart_data', region, date)
+            return response
         except ValueError as e:
             logger.error(f"Chart data validation error for {date}: {e}")
             return Response({'error': str(e)}, status=400)
@@ -65,25 +119,109 @@ class EnergyDataViewSet(viewsets.ReadOnlyModelViewSet):
                     return hour_data['vre_pct']
             return 0
 
+    @action(detail=False, methods=['get'], renderer_classes=CHART_RENDERERS)
+    def chart_data_range(self, request):
+        """
+        Chart data for a date window in one request.
+        Query params: start, end (YYYY-MM-DD), region, resolution=hour|day|week,
+        format=columnar|arrow (optional, see renderers.py)
+        Only stored days are returned; cold days are listed in missing_dates and,
+        with background fetching on, queued as prefetch jobs (queued_dates).
+        """
+        from .services.region_service import RegionService
+
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        region = request.query_params.get('region', 'california')
+        resolution = request.query_params.get('resolution', 'hour')
+
+        if not start or not end:
+            return Response({'error': 'start and end are required'}, status=400)
+
+        try:
+            # Cold days are only reported (or queued as prefetch jobs), never fetched inline
+            data = RegionService.get_chart_data_range(
+                region, start, end, resolution,
+                queue_missing=FetchJobService.background_enabled(request.query_params),
+            )
+            response = Response({
+                'region': region,
+                **data
+            })
+            patch_vary_headers(response, ['Accept'])
+            return response
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Chart range error for {start}..{end} ({region}): {e}")
+            return Response({'error': 'Failed to fetch energy data'}, status=500)
+
+    @action(detail=False, methods=['get'])
+    def rollups(self, request):
+        """
+        Weekly / monthly / yearly energy statistics from EnergyRollup.
+        Query params: region, period (week|month|year), start, end (YYYY-MM-DD, optional)
+        """
+        from .services.region_service import RegionService
+        from .services.rollup_service import RollupService
+
+        region = request.query_params.get('region', 'spain')
+        period = request.query_params.get('period', 'month')
+
+        if region not in RegionService.SUPPORTED_REGIONS:
+            return Response({'error': f'Unsupported region: {region}'}, status=400)
+
+        try:
+            start = request.query_params.get('start')
+            end   = request.query_params.get('end')
+            data = RollupService.get_rollups(
+                region, period,
+                start=datetime.fromisoformat(start).date() if start else None,
+                end=datetime.fromisoformat(end).date() if end else None,
+            )
+            return Response({'region': region, 'period': period, 'rollups': data})
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Rollup error for {region} {period}: {e}")
+            return Response({'error': 'Failed to fetch rollups'}, status=500)
+
     @action(detail=False, methods=['get'])
     def bess_analysis(self, request):
         date           = request.query_params.get('date', '2024-05-11')
         power_mw       = int(request.query_params.get('power_mw', 100))
         duration_hours = int(request.query_params.get('duration_hours', 4))
         efficiency     = float(request.query_params.get('efficiency', 0.87))
+        optimizer      = request.query_params.get('optimizer', 'greedy')
+
+        if optimizer not in BESSDecisionService.OPTIMIZERS:
+            return Response({'error': f"optimizer must be one of {', '.join(BESSDecisionService.OPTIMIZERS)}"}, status=400)
 
         logger.info("BESS request  date=%s  power=%s MW  duration=%s h  efficiency=%s",
                     date, power_mw, duration_hours, efficiency)
 
+        try:
+            deferred = self._defer_if_cold(request, 'bess_analysis', {
+                'date': date, 'power_mw': power_mw, 'duration_hours': duration_hours,
+                'efficiency': efficiency, 'optimizer': optimizer,
+            })
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        if deferred is not None:
+            return deferred
+
         # 1.  show what the DB really contains
         data_source = request.query_params.get('data_source', 'database')
-        summary = DailyEnergySummary.objects.get(date=date, data_source=data_source)
-        sample  = summary.hourly_data_json["hourly_data"][0]
-        logger.info("DB raw sample (00:00): %s", sample)   # demand, solar, wind, price, ...
+        summary = SummaryRepository.get(
+            SummaryRepository.ENERGY, datetime.fromisoformat(date).date(), [data_source], SummaryRepository.HOURLY
+        )
+        if summary is not None:
+            sample = HourlyStore.hourly(summary)[0]
+            logger.info("DB raw sample (00:00): %s", sample)   # demand, solar, wind, price, ...
 
         # 2.  run the analysis
         config  = BESSConfig(power_mw=power_mw, duration_hours=duration_hours, efficiency=efficiency)
-        analysis = BESSDecisionService.analyze_day(date, config)
+        analysis = BESSDecisionService.analyze_day(date, config, optimizer=optimizer)
 
         for i, decision in enumerate(analysis['hourly_decisions'][:5]):
             print(f"Hour {decision['hour']}: {decision['action']} - {decision['energy_mwh']} MWh")
@@ -100,6 +238,96 @@ class EnergyDataViewSet(viewsets.ReadOnlyModelViewSet):
 
         return Response(analysis)
     
+    @action(detail=False, methods=['get'])
+    def bess_backtest(self, request):
+        """
+        Backtest one BESS configuration over a date range.
+        Query params: start, end (YYYY-MM-DD), region, power_mw, duration_hours, efficiency,
+        optimizer (greedy|dp)
+        """
+        start  = request.query_params.get('start')
+        end    = request.query_params.get('end')
+        region = request.query_params.get('region', 'spain')
+
+        if not start or not end:
+            return Response({'error': 'start and end are required'}, status=400)
+
+        try:
+            config = BESSConfig(
+                power_mw=int(request.query_params.get('power_mw', 100)),
+                duration_hours=int(request.query_params.get('duration_hours', 4)),
+                efficiency=float(request.query_params.get('efficiency', 0.87)),
+            )
+            optimizer = request.query_params.get('optimizer', 'greedy')
+            return Response(BESSBacktestService.run(region, start, end, config, optimizer=optimizer))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"BESS backtest error for {start}..{end} ({region}): {e}")
+            return Response({'error': 'Failed to run BESS backtest'}, status=500)
+
+    @action(detail=False, methods=['get'])
+    def bess_rolling(self, request):
+        """
+        Chained-day BESS simulation with state of charge carried across midnight.
+        Query params: start, end, region, power_mw, duration_hours, efficiency,
+        lookahead_hours (default 48), initial_soc
+        """
+        start  = request.query_params.get('start')
+        end    = request.query_params.get('end')
+        region = request.query_params.get('region', 'spain')
+
+        if not start or not end:
+            return Response({'error': 'start and end are required'}, status=400)
+
+        try:
+            config = BESSConfig(
+                power_mw=int(request.query_params.get('power_mw', 100)),
+                duration_hours=int(request.query_params.get('duration_hours', 4)),
+                efficiency=float(request.query_params.get('efficiency', 0.87)),
+            )
+            initial_soc = request.query_params.get('initial_soc')
+            result = BESSRollingHorizonService.simulate(
+                region, start, end, config,
+                lookahead_hours=int(request.query_params.get('lookahead_hours', 48)),
+                initial_soc=float(initial_soc) if initial_soc is not None else None,
+            )
+            return Response(result)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"BESS rolling simulation error for {start}..{end} ({region}): {e}")
+            return Response({'error': 'Failed to run BESS simulation'}, status=500)
+
+    @action(detail=False, methods=['get'])
+    def bess_sweep(self, request):
+        """
+        Profit surface over a grid of BESS configurations.
+        Query params: start, end, region, and comma-separated power_mw, duration_hours, efficiency
+        """
+        start  = request.query_params.get('start')
+        end    = request.query_params.get('end')
+        region = request.query_params.get('region', 'spain')
+
+        if not start or not end:
+            return Response({'error': 'start and end are required'}, status=400)
+
+        try:
+            power_values      = [int(v) for v in request.query_params.get('power_mw', '50,100,150,200').split(',')]
+            duration_values   = [int(v) for v in request.query_params.get('duration_hours', '2,4,6').split(',')]
+            efficiency_values = [float(v) for v in request.query_params.get('efficiency', '0.87').split(',')]
+
+            result = BESSSweepService.sweep(
+                region, start, end, power_values, duration_values, efficiency_values,
+                workers=getattr(settings, 'BESS_SWEEP_WORKERS', 1),
+            )
+            return Response(result)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"BESS sweep error for {start}..{end} ({region}): {e}")
+            return Response({'error': 'Failed to run BESS sweep'}, status=500)
+
     @action(detail=False, methods=['get'])
     def curtailment_data(self, request):
         """Get curtailment data for any date and region."""
@@ -109,11 +337,16 @@ class EnergyDataViewSet(viewsets.ReadOnlyModelViewSet):
         region = request.query_params.get('region', 'california')
         
         try:
-            data = RegionService.get_curtailment_data(region, date)
-            return Response({
-                'region': region,
-                **data
-            })
+            response = self._defer_if_cold(request, 'curtailment_data', {'region': region, 'date': date})
+            if response is None:
+                response = ResponseCache.respond(
+                    request, 'curtailment_data', region, date,
+                    lambda: {'region': region, **RegionService.get_curtailment_data(region, date)}
+                )
+
+            # Neighbouring days are the likely next clicks
+            CacheWarmingService.schedule_adjacent('curtailment_data', region, date)
+            return response
         except ValueError as e:
             return Response({'error': str(e)}, status=400)
         except Exception as e:
@@ -123,40 +356,26 @@ class EnergyDataViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def curtailment_monthly(self, request):
         """
-        Monthly curtailment aggregates for both years - feeds the annual bar chart.
-        Returns all available months sorted chronologically.
+        Monthly curtailment aggregates - feeds the annual bar chart.
+        Query params: region (default spain), start_year, end_year (optional)
+        Returns months sorted chronologically plus annual totals.
         """
+        from .services.region_service import RegionService
+
+        region = request.query_params.get('region', 'spain')
+        if region not in RegionService.SUPPORTED_REGIONS:
+            return Response({'error': f'Unsupported region: {region}'}, status=400)
+
         try:
-            months = MonthlyCurtailmentSummary.objects.all().order_by('year', 'month')
-
-            data = [{
-                'year':                       m.year,
-                'month':                      m.month,
-                'label':                      f"{m.year}-{m.month:02d}",
-                'total_curtailed_mwh':        m.total_curtailed_mwh,
-                'total_revenue_lost_eur':     m.total_revenue_lost_eur,
-                'avg_daily_curtailed_mwh':    m.avg_daily_curtailed_mwh,
-                'days_with_curtailment':      m.days_with_curtailment,
-                'worst_day':                  m.worst_day.isoformat(),
-                'worst_day_mwh':              m.worst_day_mwh,
-                'total_curtailment_pct':      m.total_curtailment_pct,
-                'transmission_curtailment_pct': m.transmission_curtailment_pct,
-                'distribution_curtailment_pct': m.distribution_curtailment_pct,
-            } for m in months]
-
-            # Annual totals for the headline stat cards
-            annual = {}
-            for m in months:
-                y = m.year
-                if y not in annual:
-                    annual[y] = {'total_curtailed_mwh': 0, 'total_revenue_lost_eur': 0}
-                annual[y]['total_curtailed_mwh']    += m.total_curtailed_mwh
-                annual[y]['total_revenue_lost_eur'] += m.total_revenue_lost_eur
-
-            return Response({
-                'monthly_data': data,
-                'annual_totals': annual,
-            })
+            start_year = request.query_params.get('start_year')
+            end_year   = request.query_params.get('end_year')
+            start_year = int(start_year) if start_year else None
+            end_year   = int(end_year) if end_year else None
+        except ValueError:
+            return Response({'error': 'start_year and end_year must be integers'}, status=400)
+
+        try:
+            return Response(MonthlyCurtailmentService.get_monthly_payload(region, start_year, end_year))
 
         except Exception as e:
             logger.error(f"Monthly curtailment error: {e}")
@@ -96,6 +96,25 @@ interface HourlyData {
     }
   }
   
+  // ?format=columnar response: one array per metric over a shared hour axis
+  interface ColumnarChartData extends Omit<ChartData, 'hourly_data'> {
+    axis: string[]
+    series: Record<string, (number | null)[]>
+  }
+
+  // Rebuild the per-hour rows the chart components expect
+  function fromColumnar(data: ColumnarChartData): ChartData {
+    const { axis, series, ...rest } = data
+    const hourly_data = axis.map((hour, i) => {
+      const row: Record<string, string | number | null> = { hour }
+      for (const [metric, values] of Object.entries(series)) {
+        row[metric] = values[i]
+      }
+      return row as unknown as HourlyData
+    })
+    return { ...rest, hourly_data }
+  }
+
   export const useEnergyStore = defineStore('energy', {
     state: () => ({
       chartData: null as ChartData | null,
@@ -145,8 +164,10 @@ interface HourlyData {
       this.loading = true
       
       try {
-        const response = await api.get(`/energy/chart_data/?date=${targetDate}&region=${this.selectedRegion}`)
-        this.chartData = response.data
+        const response = await api.get<ColumnarChartData>(
+          `/energy/chart_data/?date=${targetDate}&region=${this.selectedRegion}&format=columnar`
+        )
+        this.chartData = fromColumnar(response.data)
         
         // Update selectedDate only after successful fetch
         this.selectedDate = targetDate
@@ -193,5 +193,68 @@ cloudinary.config(
     secure=True
 )
 
+# CACHE CONFIGURATION
+# ------------------------------------------------------------------------------
+# Local memory by default; point DJANGO_CACHE_BACKEND at
+# django.core.cache.backends.filebased.FileBasedCache or
+# django.core.cache.backends.redis.RedisCache to share entries across workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'energy-analysis'),
+    }
+}
+
+# chart_data / curtailment_data response cache lifetimes (seconds)
+ENERGY_RESPONSE_CACHE_TIMEOUT = int(os.getenv('ENERGY_RESPONSE_CACHE_TIMEOUT', str(60 * 60 * 24 * 30)))
+ENERGY_RESPONSE_CACHE_RECENT_TIMEOUT = int(os.getenv('ENERGY_RESPONSE_CACHE_RECENT_TIMEOUT', '300'))
+
+# ENERGY DATA UPSTREAM CONFIGURATION
+# ------------------------------------------------------------------------------
+# Shared token bucket for ESIOS API requests (per process)
+ESIOS_RATE_LIMIT_PER_SECOND = float(os.getenv('ESIOS_RATE_LIMIT_PER_SECOND', '2'))
+ESIOS_RATE_LIMIT_BURST = int(os.getenv('ESIOS_RATE_LIMIT_BURST', '4'))
+ESIOS_MAX_WORKERS = int(os.getenv('ESIOS_MAX_WORKERS', '4'))
+ESIOS_MAX_RETRIES = int(os.getenv('ESIOS_MAX_RETRIES', '3'))
+ESIOS_BACKOFF_SECONDS = float(os.getenv('ESIOS_BACKOFF_SECONDS', '1'))
+
+# Raw gridstatus frames: in-process LRU size, plus an opt-in on-disk Parquet store
+# (unset = memory only) capped at GRIDSTATUS_CACHE_MAX_DISK_FRAMES files
+GRIDSTATUS_CACHE_MAX_FRAMES = int(os.getenv('GRIDSTATUS_CACHE_MAX_FRAMES', '64'))
+GRIDSTATUS_CACHE_DIR = os.getenv('GRIDSTATUS_CACHE_DIR') or None
+GRIDSTATUS_CACHE_MAX_DISK_FRAMES = int(os.getenv('GRIDSTATUS_CACHE_MAX_DISK_FRAMES', '2000'))
+
+# Process pool size for the bess_sweep endpoint (1 = evaluate in the request thread)
+BESS_SWEEP_WORKERS = int(os.getenv('BESS_SWEEP_WORKERS', '1'))
+
+# Where daily summaries keep their hourly arrays: 'json' (blob on the summary row)
+# or 'table' (HourlyEnergyRecord / HourlyCurtailmentRecord rows)
+HOURLY_STORAGE_BACKEND = os.getenv('HOURLY_STORAGE_BACKEND', 'json')
+
+# Monthly range partitioning of EnergyData (PostgreSQL only, applied by migration 0010
+# or `manage.py energydata_partitions convert`); partitions are kept N months ahead
+ENERGYDATA_PARTITIONING = os.getenv('ENERGYDATA_PARTITIONING', 'False').lower() == 'true'
+ENERGYDATA_PARTITION_MONTHS_AHEAD = int(os.getenv('ENERGYDATA_PARTITION_MONTHS_AHEAD', '3'))
+
+# How long a request waits for another worker that is already building the same
+# cold-date summary (seconds) before fetching on its own
+SINGLE_FLIGHT_TIMEOUT = int(os.getenv('SINGLE_FLIGHT_TIMEOUT', '60'))
+
+# Cold chart_data / curtailment_data / bess_analysis requests return 202 + a job id
+# (also per request with ?async=true) and are fetched by `manage.py process_fetch_jobs`
+ENERGY_BACKGROUND_FETCH = os.getenv('ENERGY_BACKGROUND_FETCH', 'False').lower() == 'true'
+FETCH_JOB_MAX_ATTEMPTS = int(os.getenv('FETCH_JOB_MAX_ATTEMPTS', '3'))
+FETCH_JOB_STALE_SECONDS = int(os.getenv('FETCH_JOB_STALE_SECONDS', '600'))
+FETCH_JOB_RETENTION_HOURS = int(os.getenv('FETCH_JOB_RETENTION_HOURS', '24'))
+
+# After chart_data / curtailment_data, queue low-priority fetch jobs for the days within
+# ENERGY_PREFETCH_RADIUS of the served date (needs a process_fetch_jobs worker)
+ENERGY_PREFETCH_ADJACENT = os.getenv('ENERGY_PREFETCH_ADJACENT', 'False').lower() == 'true'
+ENERGY_PREFETCH_RADIUS = int(os.getenv('ENERGY_PREFETCH_RADIUS', '1'))
+ENERGY_PREFETCH_SCHEDULE_TTL = int(os.getenv('ENERGY_PREFETCH_SCHEDULE_TTL', '3600'))
+
+# Async views (api/async/energy/...): max upstream/analysis calls in worker threads per process
+ASYNC_UPSTREAM_CONCURRENCY = int(os.getenv('ASYNC_UPSTREAM_CONCURRENCY', '8'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file